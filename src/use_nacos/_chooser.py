@@ -1,12 +1,19 @@
 """Weighted random chooser for instance selection.
 
 This module implements a weighted random selection algorithm for
-choosing among multiple service instances based on their weights.
+choosing among multiple service instances based on their weights. Picks use
+Vose's alias method and take constant time once the tables are built.
 """
 
+import math
 import random
 from typing import Any, List, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
 
 class Chooser:
     """Weighted random chooser for instance selection.
@@ -31,50 +38,73 @@ class Chooser:
         self.host_with_weight = host_with_weight
         self.items: List[Any] = []
         self.weights: List[float] = []
+        self._prob: List[float] = []
+        self._alias: List[int] = []
+        self._cumulative: Any = None
 
     def refresh(self) -> None:
-        """Compute cumulative weights for random selection.
+        """Build the alias tables for random selection.
 
-        This method must be called before random_with_weight().
+        This method must be called before random_with_weight(). It runs in
+        O(n) and can be called again after ``host_with_weight`` changed;
+        every pick afterwards is O(1).
 
         Raises:
             ValueError: If the cumulative weights don't sum to 1.
         """
-        origin_weight_sum = 0.0
+        self.items = []
+        self.weights = []
+        self._prob = []
+        self._alias = []
+        self._cumulative = None
+
+        origin_weights = []
         # Preparing the valid items list and calculating the original weights sum
         for item, weight in self.host_with_weight:
+            if weight is None or math.isnan(weight):
+                weight = 1.0
+            elif math.isinf(weight):
+                weight = 10000.0
             if weight <= 0:
                 continue
-            if float("inf") == weight:
-                weight = 10000.0
-            elif float("nan") == weight:
-                weight = 1.0
-            origin_weight_sum += weight
+            origin_weights.append(weight)
             self.items.append(item)
 
         if not self.items:
             return
 
-        # Computing the exact weights for each item
-        exact_weights = []
-        for _, weight in self.host_with_weight:
-            if weight > 0:
-                exact_weights.append(weight / origin_weight_sum)
-
-        # Initializing the cumulative weights array
+        # Cumulative weights, kept for callers that inspect them
+        origin_weight_sum = sum(origin_weights)
         random_range = 0.0
-        for single_weight in exact_weights:
-            random_range = random_range + single_weight
+        for weight in origin_weights:
+            random_range += weight / origin_weight_sum
             self.weights.append(random_range)
 
         # Checking the final weight
         double_precision_delta = 0.0001
-        if abs(self.weights[-1] - 1) < double_precision_delta:
-            return
-        raise ValueError(
-            "Cumulative Weight calculate wrong, the sum of probabilities "
-            "does not equal 1."
-        )
+        if abs(self.weights[-1] - 1) >= double_precision_delta:
+            raise ValueError(
+                "Cumulative Weight calculate wrong, the sum of probabilities "
+                "does not equal 1."
+            )
+
+        # Vose's alias method: split every slot between its own item and at
+        # most one other item, so a pick is one table lookup
+        n = len(origin_weights)
+        scaled = [weight * n / origin_weight_sum for weight in origin_weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1 up to rounding errors
+        self._prob = prob
+        self._alias = alias
 
     def random_with_weight(self) -> Any:
         """Select an item using weighted random selection.
@@ -85,37 +115,55 @@ class Chooser:
         Note:
             refresh() must be called before this method.
         """
-        # Generating a random number between 0 and 1
-        random_value = random.random()
-
-        # Using binary search to find the index for the random value
-        index = self._find_index(self.weights, random_value)
-
+        # One random number picks both the slot and the side of the slot
+        value = random.random() * len(self._prob)
+        index = int(value)
+        if value - index >= self._prob[index]:
+            index = self._alias[index]
         return self.items[index]
 
-    @staticmethod
-    def _find_index(weights: List[float], value: float) -> int:
-        """Find the index where the value should be placed.
+    def choose_many(self, k: int) -> List[Any]:
+        """Select ``k`` items at once, with the same distribution as single picks.
 
-        Uses binary search to find the correct position in the
-        cumulative weights array.
+        Uses NumPy's ``searchsorted`` over the cumulative weights when NumPy
+        is installed, so no Python code runs per pick. Otherwise the alias
+        tables are sampled in a single tight loop.
 
         Args:
-            weights: Cumulative weights array.
-            value: Random value to find position for.
+            k: Number of picks.
 
         Returns:
-            Index where the value falls in the weight ranges.
+            The picked items, in pick order.
+
+        Raises:
+            ValueError: If ``k`` is negative.
+            IndexError: If there is no item to choose from.
+
+        Note:
+            refresh() must be called before this method.
         """
-        # Perform a binary search manually since weights are not just keys
-        low = 0
-        high = len(weights) - 1
-        while low <= high:
-            mid = (low + high) // 2
-            if weights[mid] < value:
-                low = mid + 1
-            elif weights[mid] > value:
-                high = mid - 1
-            else:
-                return mid  # This is the exact match case
-        return low  # This is the case where value should be inserted
+        if k < 0:
+            raise ValueError(f"Number of picks must not be negative: {k}")
+        if not self.items:
+            raise IndexError("Cannot choose from an empty chooser")
+        if np is None:
+            # The alias pick of random_with_weight, inlined with local names
+            items, prob, alias = self.items, self._prob, self._alias
+            n = len(prob)
+            rand = random.random
+            picks = []
+            for _ in range(k):
+                value = rand() * n
+                index = int(value)
+                if value - index >= prob[index]:
+                    index = alias[index]
+                picks.append(items[index])
+            return picks
+        if self._cumulative is None:
+            self._cumulative = np.asarray(self.weights)
+        cumulative = self._cumulative
+        values = np.random.random(k) * cumulative[-1]
+        indexes = np.searchsorted(cumulative, values, side="right")
+        # Guard against rounding at the top of the range
+        np.minimum(indexes, len(self.items) - 1, out=indexes)
+        return list(map(self.items.__getitem__, indexes.tolist()))
@@ -0,0 +1,432 @@
+"""Heartbeats of ephemeral instances, sent by one scheduler per endpoint.
+
+Nacos v1 drops an ephemeral instance that stops beating. Instead of a thread
+(or task) per instance, the beats of all instances of an endpoint wait in
+one deadline heap and are sent by a single scheduler. Beat payloads are
+built once, when the heartbeat is added, and each beat reply steers the next
+beat of its instance:
+
+- ``clientBeatInterval`` replaces the instance's beat interval;
+- ``lightBeatEnabled`` lets later beats leave out the ``beat`` JSON, which
+  the server only needs to create the instance;
+- ``code`` 20404 means the server lost the instance, which is then
+  registered again.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+#: Beat reply code of an instance the server does not know
+RESOURCE_NOT_FOUND = 20404
+
+
+class Beat:
+    """The heartbeat of one instance.
+
+    Attributes:
+        query: Query of a full beat, with the ``beat`` JSON.
+        light_query: Query of a light beat.
+        registration: Keyword arguments to register the instance again.
+        interval: Seconds between beats.
+        light: Whether the server accepts light beats.
+        deadline: Monotonic time of the next beat.
+        stop_event: Handle of the heartbeat, with ``is_set()`` and ``set()``
+            to tell and mark that it stopped.
+        skip_exception: Keep beating after a failed beat.
+    """
+
+    __slots__ = (
+        "query",
+        "light_query",
+        "registration",
+        "interval",
+        "light",
+        "deadline",
+        "stop_event",
+        "skip_exception",
+    )
+
+    def __init__(
+        self,
+        query: Dict[str, Any],
+        light_query: Dict[str, Any],
+        registration: Dict[str, Any],
+        interval: float,
+        stop_event: Any,
+        skip_exception: bool = True,
+    ) -> None:
+        self.query = query
+        self.light_query = light_query
+        self.registration = registration
+        self.interval = interval
+        self.light = False
+        self.deadline = time.monotonic()
+        self.stop_event = stop_event
+        self.skip_exception = skip_exception
+
+    def current_query(self) -> Dict[str, Any]:
+        """Return the query of the next beat."""
+        return self.light_query if self.light else self.query
+
+    def __repr__(self) -> str:
+        return (
+            f"Beat({self.query['serviceName']}, "
+            f"{self.query['ip']}:{self.query['port']})"
+        )
+
+
+class HeartbeatHandle(threading.Event):
+    """Handle of a heartbeat sent by ``HeartbeatScheduler``.
+
+    Like ``AsyncHeartbeatHandle``, ``cancel()`` stops the heartbeat and
+    ``is_set()`` tells whether it stopped: the event is set once the
+    heartbeat is cancelled, fails with ``skip_exception=False`` or is
+    closed with its endpoint.
+    """
+
+    def __init__(self, scheduler: "HeartbeatScheduler") -> None:
+        super().__init__()
+        self._scheduler = scheduler
+
+    def cancel(self) -> None:
+        """Stop the heartbeat."""
+        self.set()
+        # Let the scheduler drop the beat, and stop if it was the last one
+        self._scheduler._wake()
+
+
+class AsyncHeartbeatHandle(asyncio.Future):
+    """Handle of a heartbeat sent by ``AsyncHeartbeatScheduler``.
+
+    A future, like the task per heartbeat it replaces: ``cancel()`` stops
+    the heartbeat, and awaiting the handle waits until the heartbeat
+    stopped. It resolves to None when closed with its endpoint, and to the
+    error of a failed beat with ``skip_exception=False``. Like
+    ``HeartbeatHandle``, ``is_set()`` tells whether it stopped.
+    """
+
+    def is_set(self) -> bool:
+        """Return whether the heartbeat stopped."""
+        return self.done()
+
+    def set(self) -> None:
+        """Mark the heartbeat stopped."""
+        if not self.done():
+            self.set_result(None)
+
+
+class _HeartbeatStore:
+    """Beats and their deadlines, shared by both schedulers."""
+
+    def __init__(self) -> None:
+        self._schedule: List[Tuple[float, int, Beat]] = []
+        #: Beats taken from the schedule and not done yet
+        self._sending: Set[Beat] = set()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._counters = {"sent": 0, "failed": 0, "reregistered": 0}
+
+    def add(self, beat: Beat) -> None:
+        """Schedule a heartbeat, whose first beat is due at once."""
+        self._push(beat)
+        self._wake()
+
+    def _push(self, beat: Beat) -> None:
+        with self._lock:
+            heapq.heappush(self._schedule, (beat.deadline, next(self._order), beat))
+
+    def _wake(self) -> None:
+        raise NotImplementedError
+
+    def _next_due(self) -> Tuple[Optional[Beat], float]:
+        """Pop the next due beat, dropping stopped ones on the way.
+
+        Returns:
+            The due beat and 0, or None and the seconds until the next one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._schedule:
+                deadline, _, beat = self._schedule[0]
+                if beat.stop_event.is_set():
+                    heapq.heappop(self._schedule)
+                elif deadline > now:
+                    return None, deadline - now
+                else:
+                    heapq.heappop(self._schedule)
+                    self._sending.add(beat)
+                    return beat, 0.0
+        return None, float("inf")
+
+    def _done(
+        self,
+        beat: Beat,
+        reply: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        """Apply the outcome of a beat and schedule the next one.
+
+        Returns:
+            Whether the instance must be registered again.
+        """
+        with self._lock:
+            self._sending.discard(beat)
+        reregister = False
+        if error is not None:
+            self._count("failed")
+            logger.error("Heartbeat error. beat=%r, error=%s", beat, error)
+            if not beat.skip_exception:
+                self._fail(beat, error)
+                return False
+        else:
+            self._count("sent")
+            if isinstance(reply, dict):
+                interval = reply.get("clientBeatInterval")
+                if isinstance(interval, (int, float)) and interval > 0:
+                    beat.interval = interval / 1_000
+                beat.light = bool(reply.get("lightBeatEnabled"))
+                if reply.get("code") == RESOURCE_NOT_FOUND:
+                    reregister = True
+                    beat.light = False
+        if beat.stop_event.is_set():
+            # Cancelled or closed while the beat was sent
+            return False
+        beat.deadline = time.monotonic() + beat.interval
+        self._push(beat)
+        return reregister
+
+    def _fail(self, beat: Beat, error: BaseException) -> None:
+        """Stop a heartbeat after a failed beat."""
+        beat.stop_event.set()
+
+    def _stop_all(self) -> None:
+        """Stop every heartbeat, including those with a beat being sent."""
+        with self._lock:
+            for _, _, beat in self._schedule:
+                beat.stop_event.set()
+            for beat in self._sending:
+                beat.stop_event.set()
+            self._schedule.clear()
+            self._sending.clear()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of heartbeats and beat counters.
+
+        Returns:
+            ``instances`` beating, and the counters of beats ``sent`` and
+            ``failed`` and of instances ``reregistered`` after the server
+            lost them.
+        """
+        with self._lock:
+            beats = itertools.chain(
+                (beat for _, _, beat in self._schedule), self._sending
+            )
+            instances = sum(1 for beat in beats if not beat.stop_event.is_set())
+            return {"instances": instances, **self._counters}
+
+
+class HeartbeatScheduler(_HeartbeatStore):
+    """Heartbeats of all instances, sent by one background thread.
+
+    Like the thread per heartbeat it replaces, the thread is not a daemon:
+    it keeps the process alive while any heartbeat is running, and ends
+    once the last one is cancelled or the scheduler is closed.
+
+    Example:
+        >>> scheduler = HeartbeatScheduler(send_beat, endpoint.register)
+        >>> scheduler.add(beat)
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Any],
+        register: Callable[..., Any],
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            send: Sends a beat with the given query and returns the reply.
+            register: Registers an instance again, called with a beat's
+                ``registration``.
+        """
+        super().__init__()
+        self.send = send
+        self.register = register
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _wake(self) -> None:
+        with self._lock:
+            if self._thread is None and self._schedule:
+                self._thread = threading.Thread(
+                    target=self._run, name="use-nacos-heartbeat"
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        """Send due beats until no heartbeat is left."""
+        while True:
+            beat, delay = self._next_due()
+            if beat is not None:
+                self._beat(beat)
+                continue
+            if delay == float("inf"):
+                with self._lock:
+                    if not self._schedule:
+                        self._thread = None
+                        return
+                continue
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def _beat(self, beat: Beat) -> None:
+        try:
+            reply = self.send(beat.current_query())
+        except Exception as exc:
+            self._done(beat, error=exc)
+            return
+        if self._done(beat, reply):
+            try:
+                self.register(**beat.registration)
+                self._count("reregistered")
+            except Exception as exc:
+                logger.error("Re-register error. beat=%r, error=%s", beat, exc)
+
+    def close(self) -> None:
+        """Stop every heartbeat, which ends the scheduler thread.
+
+        A beat in flight is finished first. Heartbeats added later start a
+        new thread.
+        """
+        self._stop_all()
+        self._wakeup.set()
+
+
+class AsyncHeartbeatScheduler(_HeartbeatStore):
+    """Heartbeats of all instances, sent by one background asyncio task.
+
+    Due beats are sent concurrently, at most ``max_concurrency`` at a time,
+    so a slow reply does not hold up the beats of other instances.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[Any]],
+        register: Callable[..., Awaitable[Any]],
+        max_concurrency: int = 16,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            send: Coroutine function that sends a beat with the given query
+                and returns the reply.
+            register: Coroutine function that registers an instance again,
+                called with a beat's ``registration``.
+            max_concurrency: Most beats in flight at once. Defaults to 16.
+        """
+        super().__init__()
+        self.send = send
+        self.register = register
+        self.max_concurrency = max_concurrency
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+    def add(self, beat: Beat) -> None:
+        """Schedule a heartbeat, whose first beat is due at once."""
+        # Heartbeats added after close() start a new scheduler task
+        self._closed = False
+        super().add(beat)
+
+    def _wake(self) -> None:
+        if self._closed:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Added outside the event loop; the task picks it up once started
+            return
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._task = asyncio.ensure_future(self._scheduler())
+        self._wakeup.set()  # type: ignore[union-attr]
+
+    async def _beat(self, beat: Beat, slots: asyncio.Semaphore) -> None:
+        try:
+            try:
+                reply = await self.send(beat.current_query())
+            except Exception as exc:
+                self._done(beat, error=exc)
+                return
+            if self._done(beat, reply):
+                try:
+                    await self.register(**beat.registration)
+                    self._count("reregistered")
+                except Exception as exc:
+                    logger.error("Re-register error. beat=%r, error=%s", beat, exc)
+        finally:
+            slots.release()
+            # The next beat may be due before the one the scheduler waits
+            # for; a beat cancelled by close() must not restart it
+            if not self._closed:
+                self._wake()
+
+    async def _scheduler(self) -> None:
+        wakeup = self._wakeup
+        slots = self._slots
+        while True:
+            beat, delay = self._next_due()
+            if beat is None:
+                try:
+                    await asyncio.wait_for(
+                        wakeup.wait(),  # type: ignore[union-attr]
+                        None if delay == float("inf") else delay,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()  # type: ignore[union-attr]
+                continue
+            await slots.acquire()  # type: ignore[union-attr]
+            task = asyncio.ensure_future(
+                self._beat(beat, slots)  # type: ignore[arg-type]
+            )
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def _fail(self, beat: Beat, error: BaseException) -> None:
+        if not beat.stop_event.done():
+            beat.stop_event.set_exception(error)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of heartbeats and beat counters.
+
+        Returns:
+            The counters of ``HeartbeatScheduler.stats``, and the beats
+            ``in_flight``.
+        """
+        return {**super().stats(), "in_flight": len(self._in_flight)}
+
+    def close(self) -> None:
+        """Cancel the scheduler task, the beats in flight and every heartbeat."""
+        self._closed = True
+        self._stop_all()
+        for task in list(self._in_flight):
+            task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,229 @@
+"""Receiver for Nacos v1 naming UDP pushes.
+
+Clients that pass ``udpPort`` and ``clientIP`` to ``instance/list`` are
+subscribed to the service: whenever its instances change, the server sends a
+datagram holding the new instance list to that port and expects an ack. A
+push packet is JSON, gzip compressed when large::
+
+    {"type": "dom", "lastRefTime": 1234, "data": "<instance/list reply>"}
+
+A push replaces the cached instance list, so receivers only accept packets
+from the server's own addresses and bind the interface the server is
+reached through, instead of every interface.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import socket
+import threading
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+#: Largest datagram the server sends
+MAX_PACKET_SIZE = 64 * 1024
+
+
+def decode_push(packet: bytes) -> Dict[str, Any]:
+    """Decode a push packet, decompressing it if it is gzipped."""
+    if packet[:2] == b"\x1f\x8b":
+        packet = gzip.decompress(packet)
+    return json.loads(packet.decode("utf-8").strip())
+
+
+def handle_push(packet: bytes, on_push: Callable[[Dict[str, Any]], Any]) -> bytes:
+    """Process a push packet and build the ack to send back.
+
+    Args:
+        packet: The datagram received from the server.
+        on_push: Called with the decoded instance list of ``dom`` and
+            ``service`` pushes.
+
+    Returns:
+        The encoded ack.
+    """
+    push = decode_push(packet)
+    push_type = push.get("type")
+    if push_type in ("dom", "service"):
+        on_push(json.loads(push["data"]))
+        ack_type = "push-ack"
+    elif push_type == "dump":
+        ack_type = "dump-ack"
+    else:
+        ack_type = "unknown-ack"
+    ack = {"type": ack_type, "lastRefTime": push.get("lastRefTime"), "data": ""}
+    return json.dumps(ack).encode("utf-8")
+
+
+def _server_host(server_addr: str) -> Tuple[str, int]:
+    url = urlsplit(server_addr if "//" in server_addr else f"//{server_addr}")
+    return url.hostname or "127.0.0.1", url.port or 8848
+
+
+def local_ip(server_addr: str) -> str:
+    """Return the local address the Nacos server can reach this host at."""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # Connecting a UDP socket sends nothing, it only picks a route
+        probe.connect(_server_host(server_addr))
+        return probe.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        probe.close()
+
+
+def server_ips(server_addr: str) -> Set[str]:
+    """Resolve the addresses the Nacos server sends pushes from."""
+    host, port = _server_host(server_addr)
+    try:
+        infos = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_DGRAM)
+    except OSError as exc:
+        logger.warning(
+            "Failed to resolve server, no push is accepted. host=%s, error=%s",
+            host,
+            exc,
+        )
+        return set()
+    return {info[4][0] for info in infos}
+
+
+def _accepts(accept_from: Optional[AbstractSet[str]], addr: Tuple[str, int]) -> bool:
+    if accept_from is None or addr[0] in accept_from:
+        return True
+    logger.debug("Dropped push from untrusted address. addr=%s", addr)
+    return False
+
+
+class PushReceiver:
+    """Receive pushes on a UDP port in a daemon thread.
+
+    Attributes:
+        client_ip: Address announced to the server as ``clientIP``.
+        port: Bound UDP port, announced to the server as ``udpPort``.
+        accept_from: Source addresses pushes are accepted from, or None to
+            accept any.
+    """
+
+    def __init__(
+        self,
+        on_push: Callable[[Dict[str, Any]], Any],
+        client_ip: str,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        accept_from: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Bind the UDP socket and start receiving.
+
+        Args:
+            on_push: Called with the instance list of every push.
+            client_ip: Address announced to the server.
+            host: Address to bind. Defaults to all interfaces.
+            port: Port to bind. Defaults to a free port.
+            accept_from: Source addresses to accept pushes from; packets
+                from any other address are dropped unanswered. Defaults to
+                accepting any.
+        """
+        self.on_push = on_push
+        self.client_ip = client_ip
+        self.accept_from = None if accept_from is None else frozenset(accept_from)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        # Wake up regularly to notice close()
+        self._socket.settimeout(0.5)
+        self.port: int = self._socket.getsockname()[1]
+
+        stop_event = threading.Event()
+        stop_event.cancel = stop_event.set  # type: ignore[attr-defined]
+        self._stop_event = stop_event
+        thread = threading.Thread(
+            target=self._receive, name="use-nacos-push-receiver", daemon=True
+        )
+        thread.start()
+
+    def _receive(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                packet, addr = self._socket.recvfrom(MAX_PACKET_SIZE)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if not _accepts(self.accept_from, addr):
+                continue
+            try:
+                self._socket.sendto(handle_push(packet, self.on_push), addr)
+            except Exception as exc:
+                logger.warning("Failed to handle push. addr=%s, error=%s", addr, exc)
+
+    def close(self) -> None:
+        """Stop receiving and release the port."""
+        self._stop_event.cancel()  # type: ignore[attr-defined]
+        self._socket.close()
+
+
+class AsyncPushReceiver(asyncio.DatagramProtocol):
+    """Receive pushes on a UDP port through an asyncio datagram endpoint.
+
+    Create it with ``await AsyncPushReceiver.start(...)``.
+    """
+
+    def __init__(
+        self,
+        on_push: Callable[[Dict[str, Any]], Any],
+        client_ip: str,
+        accept_from: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.on_push = on_push
+        self.client_ip = client_ip
+        self.accept_from = None if accept_from is None else frozenset(accept_from)
+        self.port = 0
+        self._transport: Optional[asyncio.DatagramTransport] = None
+
+    @classmethod
+    async def start(
+        cls,
+        on_push: Callable[[Dict[str, Any]], Any],
+        client_ip: str,
+        host: str = "0.0.0.0",
+        port: int = 0,
+        accept_from: Optional[Iterable[str]] = None,
+    ) -> "AsyncPushReceiver":
+        """Bind the UDP endpoint on the running loop.
+
+        Args:
+            on_push: Called with the instance list of every push.
+            client_ip: Address announced to the server.
+            host: Address to bind. Defaults to all interfaces.
+            port: Port to bind. Defaults to a free port.
+            accept_from: Source addresses to accept pushes from. Defaults to
+                accepting any.
+        """
+        loop = asyncio.get_running_loop()
+        _, receiver = await loop.create_datagram_endpoint(
+            lambda: cls(on_push, client_ip, accept_from), local_addr=(host, port)
+        )
+        return receiver
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+        self.port = transport.get_extra_info("sockname")[1]
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        if not _accepts(self.accept_from, addr):
+            return
+        try:
+            self._transport.sendto(  # type: ignore[union-attr]
+                handle_push(data, self.on_push), addr
+            )
+        except Exception as exc:
+            logger.warning("Failed to handle push. addr=%s, error=%s", addr, exc)
+
+    def close(self) -> None:
+        """Stop receiving and release the port."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
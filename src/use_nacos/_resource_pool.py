@@ -0,0 +1,235 @@
+"""Per-endpoint pool of per-address resources for instance requests.
+
+``instance.request`` keeps a resource per instance address, such as the
+limiter of concurrent requests to that host. In autoscaled deployments
+instances come and go, so the pool is bounded, drops resources that sit
+idle, and drops the resources of addresses that left the instance cache.
+
+A resource with leases out is pinned: it is never evicted, and discarding
+its address only marks it, so requests to that address keep sharing it
+until the last lease is returned. A limiter therefore keeps limiting while
+requests hold it, instead of being replaced by a fresh one.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+#: (ip, port) of an instance
+Address = Tuple[str, int]
+
+R = TypeVar("R")
+
+#: Async clients being closed, so their close tasks are not collected early
+_closing: Set["asyncio.Task[None]"] = set()
+
+
+def aclose_later(client: Any) -> None:
+    """Close an async client in the background of the running loop."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop to close it on; the connections die with the client
+        return
+    task = loop.create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+class PooledResource(Generic[R]):
+    """A resource lent out by ``ResourcePool.acquire``."""
+
+    __slots__ = ("resource", "address", "in_use", "last_used", "retired")
+
+    def __init__(self, resource: R, address: Address) -> None:
+        self.resource = resource
+        self.address = address
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        #: Dropped from the pool once its last lease is returned
+        self.retired = False
+
+
+class ResourcePool(Generic[R]):
+    """Bounded, thread-safe pool of resources keyed by address.
+
+    Example:
+        >>> pool = ResourcePool(lambda: threading.BoundedSemaphore(20))
+        >>> lease = pool.acquire(("10.0.0.1", 8080))
+        >>> try:
+        ...     with lease.resource:
+        ...         send_request()
+        ... finally:
+        ...     pool.release(lease)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], R],
+        close: Optional[Callable[[R], Any]] = None,
+        max_size: int = 256,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            factory: Creates a resource.
+            close: Releases a resource dropped from the pool. Defaults to
+                doing nothing.
+            max_size: Most resources kept. When full, the least recently
+                used resource without leases out is dropped to make room;
+                leased resources may take the pool past ``max_size`` until
+                they are returned. Defaults to 256.
+            idle_timeout: Seconds after which an unused resource is
+                dropped. Defaults to 300.
+        """
+        self.factory = factory
+        self.close_resource = close
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._resources: "OrderedDict[Address, PooledResource[R]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + idle_timeout
+        self._counters = {
+            "created": 0,
+            "reused": 0,
+            "evicted_idle": 0,
+            "evicted_full": 0,
+            "removed": 0,
+        }
+
+    def acquire(self, address: Address) -> PooledResource[R]:
+        """Lend the resource of ``address``, creating it if needed.
+
+        Every ``acquire`` must be matched by a ``release`` of the lease.
+        """
+        with self._lock:
+            entry = self._resources.get(address)
+            if entry is not None:
+                self._resources.move_to_end(address)
+                self._counters["reused"] += 1
+            else:
+                entry = PooledResource(self.factory(), address)
+                self._resources[address] = entry
+                self._counters["created"] += 1
+            entry.in_use += 1
+            entry.last_used = time.monotonic()
+            dropped = self._sweep(entry.last_used)
+            excess = len(self._resources) - self.max_size
+            if excess > 0:
+                full = []
+                for lru in self._resources.values():
+                    if len(full) == excess:
+                        break
+                    if not lru.in_use:
+                        full.append(lru)
+                for lru in full:
+                    del self._resources[lru.address]
+                self._counters["evicted_full"] += len(full)
+                dropped.extend(full)
+        self._close(dropped)
+        return entry
+
+    def release(self, entry: PooledResource[R]) -> None:
+        """Take back a lent resource, dropping it if it was discarded."""
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            drop = entry.retired and entry.in_use == 0
+            if drop and self._resources.get(entry.address) is entry:
+                del self._resources[entry.address]
+        if drop:
+            self._close([entry])
+
+    def _sweep(self, now: float) -> List[PooledResource[R]]:
+        """Pop resources idle for longer than ``idle_timeout``.
+
+        Runs at most every ``idle_timeout / 4`` seconds. Must hold the lock.
+        """
+        if now < self._next_sweep:
+            return []
+        self._next_sweep = now + self.idle_timeout / 4
+        idle = [
+            address
+            for address, entry in self._resources.items()
+            if entry.in_use == 0 and now - entry.last_used > self.idle_timeout
+        ]
+        self._counters["evicted_idle"] += len(idle)
+        return [self._resources.pop(address) for address in idle]
+
+    def _close(self, entries: Iterable[PooledResource[R]]) -> None:
+        if self.close_resource is not None:
+            for entry in entries:
+                self.close_resource(entry.resource)
+
+    def discard(self, addresses: Iterable[Address]) -> int:
+        """Drop the resources of addresses that are gone.
+
+        Resources with leases out stay pinned until the last one is
+        returned, so requests still reaching the address share them.
+
+        Returns:
+            The number of resources removed or marked for removal.
+        """
+        idle = []
+        with self._lock:
+            removed = 0
+            for address in addresses:
+                entry = self._resources.get(address)
+                if entry is None or entry.retired:
+                    continue
+                removed += 1
+                if entry.in_use:
+                    entry.retired = True
+                else:
+                    idle.append(self._resources.pop(address))
+            self._counters["removed"] += removed
+        self._close(idle)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool size and counters.
+
+        Returns:
+            ``size`` and ``max_size``, ``in_use`` resources with leases
+            out, and counters of resources ``created``, ``reused``, and
+            dropped because idle (``evicted_idle``), because the pool was
+            full (``evicted_full``) or because their address left the
+            instance cache (``removed``).
+        """
+        with self._lock:
+            return {
+                "size": len(self._resources),
+                "max_size": self.max_size,
+                "in_use": sum(1 for entry in self._resources.values() if entry.in_use),
+                **self._counters,
+            }
+
+    def close(self) -> None:
+        """Drop every resource; leased ones are closed when returned.
+
+        Later acquisitions get new resources, so closing also resets the
+        pool, e.g. after the size of new limiters changed.
+        """
+        with self._lock:
+            entries = list(self._resources.values())
+            self._resources.clear()
+            idle = []
+            for entry in entries:
+                entry.retired = True
+                if not entry.in_use:
+                    idle.append(entry)
+        self._close(idle)
@@ -0,0 +1,531 @@
+"""Local cache of service instance lists.
+
+``instance/list`` replies carry ``cacheMillis``, the time the server
+considers the list fresh. ``ServiceInfoCache`` keeps each service's list in
+memory for that long and refreshes it in the background shortly before it
+expires, so instance selection never waits on the server. If a refresh
+fails, the last known list keeps being served.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ._chooser import Chooser
+
+logger = logging.getLogger(__name__)
+
+#: (service_name, namespace_id, group_name, clusters)
+ServiceKey = Tuple[str, Optional[str], Optional[str], Optional[str]]
+#: (ip, port) of an instance
+Address = Tuple[str, int]
+
+#: Freshness assumed when a reply carries no ``cacheMillis``
+DEFAULT_CACHE_MILLIS = 10_000
+#: Never refresh the same service more often than this
+MIN_CACHE_MILLIS = 1_000
+#: Delay before retrying a failed refresh, doubled on each further failure
+RETRY_MILLIS = 1_000
+#: Group of services looked up without one
+DEFAULT_GROUP = "DEFAULT_GROUP"
+#: IDs the public namespace is looked up by
+PUBLIC_NAMESPACES = (None, "", "public")
+
+
+class ServiceInfo:
+    """One version of a service's instance list.
+
+    A new ``ServiceInfo`` is created only when the hosts change, so objects
+    derived from the hosts can be cached on it for the life of the version.
+
+    Attributes:
+        key: The service the list belongs to.
+        hosts: Every instance returned by the server.
+        version: Incremented each time the hosts change.
+        cache_millis: Freshness of the list announced by the server.
+        expires: Monotonic time after which the list is stale.
+        failures: Refreshes failed in a row since the last success.
+    """
+
+    __slots__ = (
+        "key",
+        "hosts",
+        "version",
+        "cache_millis",
+        "expires",
+        "refresh_at",
+        "last_access",
+        "last_ref_time",
+        "failures",
+        "_healthy_hosts",
+        "_chooser",
+    )
+
+    def __init__(self, key: ServiceKey, hosts: List[dict], version: int) -> None:
+        self.key = key
+        self.hosts = hosts
+        self.version = version
+        self.cache_millis = DEFAULT_CACHE_MILLIS
+        self.expires = 0.0
+        self.refresh_at = 0.0
+        self.last_access = time.monotonic()
+        self.last_ref_time = 0
+        self.failures = 0
+        self._healthy_hosts: Optional[List[dict]] = None
+        self._chooser: Optional[Chooser] = None
+
+    @property
+    def healthy_hosts(self) -> List[dict]:
+        """Instances that are healthy, enabled and have a positive weight."""
+        if self._healthy_hosts is None:
+            self._healthy_hosts = [
+                host
+                for host in self.hosts
+                if host.get("healthy", True)
+                and host.get("enabled", True)
+                and (host.get("weight") or 0) > 0
+            ]
+        return self._healthy_hosts
+
+    @property
+    def chooser(self) -> Chooser:
+        """Weighted selector over the healthy hosts, built once per version."""
+        if self._chooser is None:
+            chooser = Chooser(
+                [(host, host.get("weight")) for host in self.healthy_hosts]
+            )
+            chooser.refresh()
+            self._chooser = chooser
+        return self._chooser
+
+
+def service_key(
+    service_name: str,
+    namespace_id: Optional[str] = None,
+    group_name: Optional[str] = None,
+    clusters: Optional[str] = None,
+) -> ServiceKey:
+    """Build the cache key of a service."""
+    return (service_name, namespace_id, group_name, clusters)
+
+
+class _ServiceInfoStore:
+    """Service lists and their refresh schedule, shared by both caches."""
+
+    def __init__(self, refresh_ratio: float = 0.8, idle_timeout: float = 300.0):
+        """Initialize the store.
+
+        Args:
+            refresh_ratio: Fraction of ``cacheMillis`` after which a list is
+                refreshed in the background. Defaults to 0.8.
+            idle_timeout: Seconds without lookups after which a service is
+                dropped instead of refreshed. Defaults to 300.
+        """
+        self.refresh_ratio = refresh_ratio
+        self.idle_timeout = idle_timeout
+        self._infos: Dict[ServiceKey, ServiceInfo] = {}
+        #: (due, sequence, key); the sequence keeps keys from being compared
+        self._schedule: List[Tuple[float, int, ServiceKey]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        #: Called with the addresses no cached service lists any more
+        self.on_addresses_removed: Optional[Callable[[Set[Address]], Any]] = None
+
+    def peek(self, key: ServiceKey) -> Optional[ServiceInfo]:
+        """Return the cached list of a service without refreshing it."""
+        with self._lock:
+            return self._infos.get(key)
+
+    def update(self, key: ServiceKey, data: Dict[str, Any]) -> ServiceInfo:
+        """Store an ``instance/list`` reply (or push) for a service.
+
+        Returns:
+            The service's current ``ServiceInfo``; the previous one is kept
+            when the hosts did not change.
+        """
+        hosts = data.get("hosts") or []
+        cache_millis = max(
+            data.get("cacheMillis") or DEFAULT_CACHE_MILLIS, MIN_CACHE_MILLIS
+        )
+        now = time.monotonic()
+        removed: Set[Address] = set()
+        with self._lock:
+            info = self._infos.get(key)
+            if info is None or info.hosts != hosts:
+                version = info.version + 1 if info is not None else 1
+                last_access = info.last_access if info is not None else now
+                previous = info
+                info = ServiceInfo(key, hosts, version)
+                info.last_access = last_access
+                self._infos[key] = info
+                if previous is not None:
+                    removed = self._gone(previous.hosts)
+            info.cache_millis = cache_millis
+            info.last_ref_time = data.get("lastRefTime") or 0
+            info.failures = 0
+            info.expires = now + cache_millis / 1000
+            info.refresh_at = now + cache_millis / 1000 * self.refresh_ratio
+            self._reschedule(key, info.refresh_at)
+        self._wake()
+        self._notify_removed(removed)
+        return info
+
+    def apply_push(self, data: Dict[str, Any]) -> List[ServiceInfo]:
+        """Store an instance list pushed by the server.
+
+        A push names the service as ``group@@service`` plus its clusters but
+        not its namespace. It is applied when the matching lookups all
+        belong to one namespace; when the same service is cached in several
+        namespaces, the push cannot be told apart, so those lookups are
+        re-listed instead. Pushes older than the cached list, which UDP may
+        deliver out of order, are ignored.
+
+        Returns:
+            The updated ``ServiceInfo`` of each matching lookup.
+        """
+        group, _, name = data.get("name", "").rpartition("@@")
+        group = group or DEFAULT_GROUP
+        clusters = data.get("clusters") or ""
+        last_ref_time = data.get("lastRefTime") or 0
+        with self._lock:
+            keys = [
+                key
+                for key in self._infos
+                if key[0].rpartition("@@")[2] == name
+                and (key[2] or DEFAULT_GROUP) == group
+                and (key[3] or "") == clusters
+            ]
+            namespaces = {"" if key[1] in PUBLIC_NAMESPACES else key[1] for key in keys}
+            if len(namespaces) <= 1:
+                keys = [
+                    key
+                    for key in keys
+                    if self._infos[key].last_ref_time <= last_ref_time
+                ]
+        if len(namespaces) > 1:
+            logger.debug(
+                "Ignored push of a service cached in several namespaces. "
+                "service=%s, namespaces=%s",
+                name,
+                sorted(namespaces),
+            )
+            self.refresh_soon(keys)
+            return []
+        return [self.update(key, data) for key in keys]
+
+    def refresh_soon(self, keys: Optional[Iterable[ServiceKey]] = None) -> None:
+        """Refresh cached services at once, in the background.
+
+        Args:
+            keys: Services to refresh. Defaults to every cached service.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key in list(self._infos) if keys is None else keys:
+                info = self._infos.get(key)
+                if info is None:
+                    continue
+                info.refresh_at = now
+                self._reschedule(key, now)
+        self._wake()
+
+    def _reschedule(self, key: ServiceKey, due: float) -> None:
+        """Schedule a refresh of ``key`` at ``due``. Must hold the lock."""
+        heapq.heappush(self._schedule, (due, next(self._sequence), key))
+
+    def _gone(self, hosts: List[dict]) -> Set[Address]:
+        """Return the addresses of ``hosts`` no cached service lists.
+
+        Must hold the lock.
+        """
+        gone = {(host["ip"], host["port"]) for host in hosts}
+        for info in self._infos.values():
+            if not gone:
+                break
+            gone.difference_update((host["ip"], host["port"]) for host in info.hosts)
+        return gone
+
+    def _notify_removed(self, removed: Set[Address]) -> None:
+        if removed and self.on_addresses_removed is not None:
+            self.on_addresses_removed(removed)
+
+    def invalidate(self, key: ServiceKey) -> None:
+        """Forget a service, so the next lookup fetches it again."""
+        with self._lock:
+            self._infos.pop(key, None)
+
+    def _fresh(self, key: ServiceKey) -> Tuple[Optional[ServiceInfo], bool]:
+        """Return a service's cached list and whether it is still fresh."""
+        now = time.monotonic()
+        with self._lock:
+            info = self._infos.get(key)
+            if info is None:
+                return None, False
+            info.last_access = now
+            return info, now < info.expires
+
+    def _next_due(self) -> Tuple[Optional[ServiceKey], float]:
+        """Pop the next service due for refresh.
+
+        Returns:
+            ``(key, 0)`` for a due service, or ``(None, delay)`` with the
+            seconds until the next one (``inf`` when nothing is scheduled).
+        """
+        now = time.monotonic()
+        removed: Set[Address] = set()
+        due_key: Optional[ServiceKey] = None
+        delay = float("inf")
+        with self._lock:
+            while self._schedule:
+                due, _, key = self._schedule[0]
+                if due > now:
+                    delay = due - now
+                    break
+                heapq.heappop(self._schedule)
+                info = self._infos.get(key)
+                # Skip entries superseded by a later update
+                if info is None or info.refresh_at != due:
+                    continue
+                if now - info.last_access > self.idle_timeout:
+                    del self._infos[key]
+                    removed.update(self._gone(info.hosts))
+                    continue
+                due_key = key
+                break
+        self._notify_removed(removed)
+        if due_key is not None:
+            return due_key, 0.0
+        return None, delay
+
+    def _retry_later(self, key: ServiceKey, exc: Exception) -> None:
+        """Reschedule a failed refresh, keeping the stale list in service.
+
+        Retries back off exponentially from ``RETRY_MILLIS`` up to the
+        service's ``cacheMillis``. Only the first failure in a row is logged
+        as a warning, so an unreachable server does not flood the log.
+        """
+        failures = 1
+        with self._lock:
+            info = self._infos.get(key)
+            if info is not None:
+                info.failures += 1
+                failures = info.failures
+                retry_millis = min(
+                    RETRY_MILLIS * 2 ** min(failures - 1, 30), info.cache_millis
+                )
+                info.refresh_at = time.monotonic() + retry_millis / 1000
+                self._reschedule(key, info.refresh_at)
+        logger.log(
+            logging.WARNING if failures == 1 else logging.DEBUG,
+            "Failed to refresh service instances, serving cached list. "
+            "service=%s, failures=%s, error=%s",
+            key[0],
+            failures,
+            exc,
+        )
+
+    def _wake(self) -> None:
+        """Tell the refresher that the schedule changed."""
+
+
+class ServiceInfoCache(_ServiceInfoStore):
+    """Service instance lists refreshed by one background thread.
+
+    Example:
+        >>> cache = ServiceInfoCache(partial(endpoint.list, healthy_only=False))
+        >>> cache.get("my-service").healthy_hosts
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., Dict[str, Any]],
+        refresh_ratio: float = 0.8,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            fetch: Called as ``fetch(service_name, namespace_id, group_name,
+                clusters)`` to get an ``instance/list`` reply.
+            refresh_ratio: Fraction of ``cacheMillis`` after which a list is
+                refreshed in the background. Defaults to 0.8.
+            idle_timeout: Seconds without lookups after which a service is
+                dropped instead of refreshed. Defaults to 300.
+        """
+        super().__init__(refresh_ratio, idle_timeout)
+        self.fetch = fetch
+        self._wakeup = threading.Event()
+        self._stop_event: Optional[threading.Event] = None
+
+    def get(
+        self,
+        service_name: str,
+        namespace_id: Optional[str] = None,
+        group_name: Optional[str] = None,
+        clusters: Optional[str] = None,
+    ) -> ServiceInfo:
+        """Return a service's instance list, fetching it if missing or stale.
+
+        Raises:
+            Exception: Whatever ``fetch`` raises when there is no cached
+                list to fall back to.
+        """
+        key = service_key(service_name, namespace_id, group_name, clusters)
+        if self._stop_event is None:
+            # Closed, or not started yet: cached lists still need refreshing
+            self._wake()
+        info, fresh = self._fresh(key)
+        if fresh:
+            return info  # type: ignore[return-value]
+        try:
+            return self.update(key, self.fetch(*key))
+        except Exception as exc:
+            if info is None:
+                raise
+            self._retry_later(key, exc)
+            return info
+
+    def _wake(self) -> None:
+        with self._lock:
+            if self._stop_event is None:
+                self._start()
+            wakeup = self._wakeup
+        wakeup.set()
+
+    def _start(self) -> None:
+        """Start a refresher thread. The caller holds the lock."""
+        stop_event = threading.Event()
+        stop_event.cancel = stop_event.set  # type: ignore[attr-defined]
+        self._stop_event = stop_event
+        # Each thread gets its own wakeup, so one stopped by close() cannot
+        # swallow a wakeup meant for its successor
+        wakeup = self._wakeup = threading.Event()
+
+        def _refresher() -> None:
+            while not stop_event.is_set():
+                key, delay = self._next_due()
+                if key is None:
+                    wakeup.wait(None if delay == float("inf") else delay)
+                    wakeup.clear()
+                    continue
+                try:
+                    self.update(key, self.fetch(*key))
+                except Exception as exc:
+                    self._retry_later(key, exc)
+
+        thread = threading.Thread(
+            target=_refresher, name="use-nacos-service-info", daemon=True
+        )
+        thread.start()
+
+    def close(self) -> None:
+        """Stop the background refresher.
+
+        The cache stays usable: a later update starts a new refresher.
+        """
+        with self._lock:
+            stop_event, self._stop_event = self._stop_event, None
+        if stop_event is not None:
+            stop_event.cancel()  # type: ignore[attr-defined]
+            self._wakeup.set()
+
+
+class AsyncServiceInfoCache(_ServiceInfoStore):
+    """Service instance lists refreshed by one background asyncio task."""
+
+    def __init__(
+        self,
+        fetch: Callable[..., Awaitable[Dict[str, Any]]],
+        refresh_ratio: float = 0.8,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            fetch: Coroutine function called as ``fetch(service_name,
+                namespace_id, group_name, clusters)`` to get an
+                ``instance/list`` reply.
+            refresh_ratio: Fraction of ``cacheMillis`` after which a list is
+                refreshed in the background. Defaults to 0.8.
+            idle_timeout: Seconds without lookups after which a service is
+                dropped instead of refreshed. Defaults to 300.
+        """
+        super().__init__(refresh_ratio, idle_timeout)
+        self.fetch = fetch
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(
+        self,
+        service_name: str,
+        namespace_id: Optional[str] = None,
+        group_name: Optional[str] = None,
+        clusters: Optional[str] = None,
+    ) -> ServiceInfo:
+        """Return a service's instance list, fetching it if missing or stale.
+
+        Raises:
+            Exception: Whatever ``fetch`` raises when there is no cached
+                list to fall back to.
+        """
+        key = service_key(service_name, namespace_id, group_name, clusters)
+        info, fresh = self._fresh(key)
+        if fresh:
+            return info  # type: ignore[return-value]
+        try:
+            return self.update(key, await self.fetch(*key))
+        except Exception as exc:
+            if info is None:
+                raise
+            self._retry_later(key, exc)
+            return info
+
+    def _wake(self) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Updated outside the event loop; the task will catch up
+            return
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._refresher())
+        self._wakeup.set()  # type: ignore[union-attr]
+
+    async def _refresher(self) -> None:
+        wakeup = self._wakeup
+        while True:
+            key, delay = self._next_due()
+            if key is None:
+                try:
+                    await asyncio.wait_for(
+                        wakeup.wait(),  # type: ignore[union-attr]
+                        None if delay == float("inf") else delay,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()  # type: ignore[union-attr]
+                continue
+            try:
+                self.update(key, await self.fetch(*key))
+            except Exception as exc:
+                self._retry_later(key, exc)
+
+    def close(self) -> None:
+        """Cancel the background refresher."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
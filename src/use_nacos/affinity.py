@@ -0,0 +1,96 @@
+"""Cluster, zone and co-location affinity for instance selection.
+
+``Affinity`` narrows a service's instances to the closest tier that is
+healthy enough: the caller's cluster, then instances whose metadata names
+the caller's zone, then instances on the caller's own IP. A tier is skipped
+when it has no instances, or when less than ``min_healthy_share`` of its
+instances are healthy, so traffic spills over to the next tier instead of
+piling onto the few healthy instances left. When no tier qualifies, every
+healthy instance is used.
+
+The tiers depend only on the instance list, so they are resolved once per
+list version and picks keep their constant cost.
+
+Example:
+    >>> client.instance.set_affinity(Affinity(cluster="hz-a", zone="cn-hangzhou-a"))
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ._service_info import ServiceInfo, ServiceKey
+
+#: Tiers in order of preference
+TIERS = ("cluster", "zone", "ip")
+
+
+class Affinity:
+    """Prefer the instances closest to the caller."""
+
+    def __init__(
+        self,
+        cluster: Optional[str] = None,
+        zone: Optional[str] = None,
+        ip: Optional[str] = None,
+        zone_key: str = "zone",
+        min_healthy_share: float = 0.5,
+    ) -> None:
+        """Initialize the rules. Tiers left as None are not used.
+
+        Args:
+            cluster: The caller's cluster, matched against ``clusterName``.
+            zone: The caller's zone, matched against the ``zone_key``
+                metadata of each instance.
+            ip: The caller's IP, for instances on the same host.
+            zone_key: Metadata key holding an instance's zone. Defaults to
+                "zone".
+            min_healthy_share: Share of a tier's instances that must be
+                healthy for the tier to be used. Defaults to 0.5.
+        """
+        self.cluster = cluster
+        self.zone = zone
+        self.ip = ip
+        self.zone_key = zone_key
+        self.min_healthy_share = min_healthy_share
+        #: Service -> (full list, tier used, list of the tier)
+        self._views: Dict[ServiceKey, Tuple[ServiceInfo, str, ServiceInfo]] = {}
+        self._lock = threading.Lock()
+
+    def _matches(self, tier: str, host: Dict[str, Any]) -> bool:
+        if tier == "cluster":
+            return host.get("clusterName") == self.cluster
+        if tier == "zone":
+            return (host.get("metadata") or {}).get(self.zone_key) == self.zone
+        return host.get("ip") == self.ip
+
+    def _resolve(self, info: ServiceInfo) -> Tuple[str, ServiceInfo]:
+        """Pick the first tier of ``info`` that is healthy enough."""
+        healthy = {id(host) for host in info.healthy_hosts}
+        for tier in TIERS:
+            if getattr(self, tier) is None:
+                continue
+            hosts = [host for host in info.hosts if self._matches(tier, host)]
+            alive = sum(1 for host in hosts if id(host) in healthy)
+            if alive and alive >= self.min_healthy_share * len(hosts):
+                return tier, ServiceInfo(info.key, hosts, info.version)
+        return "all", info
+
+    def select(self, info: ServiceInfo) -> ServiceInfo:
+        """Return the instances of the closest qualifying tier of ``info``."""
+        cached = self._views.get(info.key)
+        if cached is not None and cached[0] is info:
+            return cached[2]
+        with self._lock:
+            tier, view = self._resolve(info)
+            self._views[info.key] = (info, tier, view)
+        return view
+
+    def tiers(self) -> Dict[str, str]:
+        """Return the tier each service is picked from.
+
+        Returns:
+            Service name -> "cluster", "zone", "ip", or "all" when no tier
+            qualified.
+        """
+        with self._lock:
+            return {key[0]: tier for key, (_, tier, _) in self._views.items()}
@@ -0,0 +1,231 @@
+"""Load-balancing strategies for ``instance.request``.
+
+A strategy picks the instance each request is sent to and is told how the
+request went: ``request`` calls ``on_start`` before sending and
+``on_finish`` with the measured latency afterwards. Every strategy keeps
+these per-address counters; the adaptive ones use them to route around slow
+or busy instances.
+
+Example:
+    >>> client.instance.set_strategy("p2c")
+    >>> client.instance.set_strategy(RoundRobinStrategy(), service_name="orders")
+"""
+
+import math
+import random
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ._service_info import ServiceInfo, ServiceKey
+from .exception import EmptyHealthyInstanceError
+
+#: (ip, port) of an instance
+Address = Tuple[str, int]
+
+
+def address_of(instance: Dict[str, Any]) -> Address:
+    """Return the address an instance is tracked under."""
+    return instance["ip"], instance["port"]
+
+
+class _AddressStats:
+    """What a strategy has observed about one instance."""
+
+    __slots__ = ("outstanding", "latency", "requests", "failures")
+
+    def __init__(self) -> None:
+        self.outstanding = 0
+        #: EWMA of the request latency in seconds, None before the first one
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+
+class BalanceStrategy:
+    """Base class of load-balancing strategies.
+
+    Subclasses implement ``choose``; the request feedback is recorded here.
+    """
+
+    #: Weight of the newest sample in the latency EWMA
+    alpha = 0.3
+    #: Latency in seconds recorded for a failed request, if it took less
+    error_penalty = 1.0
+
+    def __init__(self) -> None:
+        self._stats: Dict[Address, _AddressStats] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, info: ServiceInfo) -> Dict[str, Any]:
+        """Pick the instance of ``info`` to send a request to.
+
+        Raises:
+            EmptyHealthyInstanceError: If no healthy instances are available.
+        """
+        raise NotImplementedError
+
+    def _stats_of(self, instance: Dict[str, Any]) -> _AddressStats:
+        address = address_of(instance)
+        stats = self._stats.get(address)
+        if stats is None:
+            stats = self._stats[address] = _AddressStats()
+        return stats
+
+    def on_start(self, instance: Dict[str, Any]) -> None:
+        """Record a request sent to ``instance``."""
+        with self._lock:
+            self._stats_of(instance).outstanding += 1
+
+    def on_finish(
+        self, instance: Dict[str, Any], elapsed: float, failed: bool = False
+    ) -> None:
+        """Record the outcome of a request sent to ``instance``.
+
+        Args:
+            instance: The instance the request was sent to.
+            elapsed: Seconds the request took.
+            failed: Whether the request raised or got a 5xx response.
+        """
+        if failed:
+            elapsed = max(elapsed, self.error_penalty)
+        with self._lock:
+            stats = self._stats_of(instance)
+            stats.outstanding = max(stats.outstanding - 1, 0)
+            stats.requests += 1
+            stats.failures += failed
+            if stats.latency is None:
+                stats.latency = elapsed
+            else:
+                stats.latency += self.alpha * (elapsed - stats.latency)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return the observed counters per ``ip:port``."""
+        with self._lock:
+            return {
+                f"{ip}:{port}": {
+                    "outstanding": stats.outstanding,
+                    "latency": stats.latency,
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                }
+                for (ip, port), stats in self._stats.items()
+            }
+
+    @staticmethod
+    def _healthy(info: ServiceInfo) -> List[Dict[str, Any]]:
+        items = info.chooser.items
+        if not items:
+            raise EmptyHealthyInstanceError("No healthy instance found")
+        return items
+
+
+class WeightedRandomStrategy(BalanceStrategy):
+    """Pick instances at random in proportion to their weight."""
+
+    def choose(self, info: ServiceInfo) -> Dict[str, Any]:
+        self._healthy(info)
+        return info.chooser.random_with_weight()
+
+
+class RoundRobinStrategy(BalanceStrategy):
+    """Smooth weighted round-robin, as in nginx.
+
+    Each instance gets its weight's share of every cycle, and picks of the
+    same instance are spread over the cycle instead of sent in bursts.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        #: Service -> (list version, current weights)
+        self._current: Dict[ServiceKey, Tuple[int, List[float]]] = {}
+
+    def choose(self, info: ServiceInfo) -> Dict[str, Any]:
+        items = self._healthy(info)
+        cumulative = info.chooser.weights
+        with self._lock:
+            version, current = self._current.get(info.key, (0, []))
+            if version != info.version or len(current) != len(items):
+                current = [0.0] * len(items)
+                self._current[info.key] = (info.version, current)
+            best, previous = 0, 0.0
+            for index, total in enumerate(cumulative):
+                current[index] += total - previous
+                previous = total
+                if current[index] > current[best]:
+                    best = index
+            # Weights are normalized, so they sum to 1
+            current[best] -= 1.0
+        return items[best]
+
+
+class LeastOutstandingStrategy(BalanceStrategy):
+    """Pick the instance with the fewest requests in flight per unit weight.
+
+    Ties are broken at random so idle services spread their load.
+    """
+
+    def choose(self, info: ServiceInfo) -> Dict[str, Any]:
+        items = self._healthy(info)
+        cumulative = info.chooser.weights
+        best: List[Dict[str, Any]] = []
+        best_load = float("inf")
+        previous = 0.0
+        with self._lock:
+            for item, total in zip(items, cumulative):
+                stats = self._stats.get(address_of(item))
+                load = ((stats.outstanding if stats else 0) + 1) / (total - previous)
+                previous = total
+                # Weights come from normalized sums, so compare loosely
+                if math.isclose(load, best_load, rel_tol=1e-9):
+                    best.append(item)
+                elif load < best_load:
+                    best, best_load = [item], load
+        return random.choice(best)
+
+
+class PowerOfTwoChoicesStrategy(BalanceStrategy):
+    """Draw two instances by weight and keep the one expected to answer first.
+
+    The expected cost of an instance is its EWMA latency times one more than
+    its requests in flight. Instances without latency samples cost nothing,
+    so new instances are tried at once.
+    """
+
+    def _cost(self, instance: Dict[str, Any]) -> float:
+        stats = self._stats.get(address_of(instance))
+        if stats is None or stats.latency is None:
+            return 0.0
+        return stats.latency * (stats.outstanding + 1)
+
+    def choose(self, info: ServiceInfo) -> Dict[str, Any]:
+        self._healthy(info)
+        first = info.chooser.random_with_weight()
+        second = info.chooser.random_with_weight()
+        with self._lock:
+            return first if self._cost(first) <= self._cost(second) else second
+
+
+#: Strategy names accepted by ``set_strategy``
+STRATEGIES = {
+    "weighted_random": WeightedRandomStrategy,
+    "round_robin": RoundRobinStrategy,
+    "least_outstanding": LeastOutstandingStrategy,
+    "p2c": PowerOfTwoChoicesStrategy,
+}
+
+
+def get_strategy(strategy: Union[str, BalanceStrategy]) -> BalanceStrategy:
+    """Return a strategy instance from a strategy or one of ``STRATEGIES``.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(strategy, BalanceStrategy):
+        return strategy
+    try:
+        return STRATEGIES[strategy]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown balance strategy: {strategy}, "
+            f"expected one of {', '.join(STRATEGIES)}"
+        ) from None
@@ -1,15 +1,284 @@
 """Cache implementations with TTL (Time To Live) support."""
 
+import asyncio
+import atexit
+import copy
+import hashlib
+import heapq
 import json
+import logging
 import os
+import sys
+import tempfile
 import threading
 import time
-from typing import Any, Callable, Optional
+import weakref
+from functools import partial
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from ._filelock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class _ExpiryIndex:
+    """Min-heap of ``(deadline, key)`` pairs ordered by expiry.
+
+    Entries are invalidated lazily: overwriting or deleting a key leaves its
+    old pair in the heap, and callers must check a popped pair against the
+    live entry before removing anything.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, deadline: float, key: str) -> None:
+        """Track ``key`` as expiring at ``deadline``."""
+        heapq.heappush(self._heap, (deadline, key))
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> Iterator[str]:
+        """Pop keys whose deadline is at or before ``now``.
+
+        Args:
+            now: Current time on the same clock as the pushed deadlines.
+            limit: Maximum number of pairs to pop. None pops all due pairs.
+
+        Yields:
+            Keys that may have expired (stale pairs are included).
+        """
+        heap = self._heap
+        popped = 0
+        while heap and heap[0][0] <= now and (limit is None or popped < limit):
+            popped += 1
+            yield heapq.heappop(heap)[1]
+
+    def is_stale(self, live: int) -> bool:
+        """Return whether stale pairs outnumber the ``live`` expiring keys."""
+        return len(self._heap) > 2 * live + 64
+
+    def rebuild(self, pairs: List[Tuple[float, str]]) -> None:
+        """Replace the heap contents, dropping every stale pair."""
+        self._heap = pairs
+        heapq.heapify(self._heap)
+
+    def clear(self) -> None:
+        """Remove all tracked deadlines."""
+        self._heap = []
+
+
+class _CacheEntry:
+    """A cached value and its expiry deadline.
+
+    Slotted to keep per-key overhead well below that of a two-item dict.
+    """
+
+    __slots__ = ("value", "expires")
+
+    def __init__(self, value: Any, expires: Optional[float]) -> None:
+        self.value = value
+        self.expires = expires
+
+
+class _SharedEntry(_CacheEntry):
+    """A cache entry whose value is a blob shared through the content store."""
+
+    __slots__ = ("digest",)
+
+    def __init__(self, value: Any, expires: Optional[float], digest: bytes) -> None:
+        super().__init__(value, expires)
+        self.digest = digest
+
+
+class _Blob:
+    """A content-store payload and the number of entries referencing it."""
+
+    __slots__ = ("value", "refs", "size")
+
+    def __init__(self, value: Any, size: int) -> None:
+        self.value = value
+        self.refs = 0
+        self.size = size
+
+
+def _default_stats_prefix(key: str) -> str:
+    """Group keys by the text before the first ``#``.
+
+    For config keys (``data_id#group#tenant``) this is the data ID.
+    """
+    return key.split("#", 1)[0]
+
+
+def _detached(value: Any) -> Any:
+    """Copy a parsed JSON value unless it is immutable.
+
+    Callers may mutate what a read returns, which must not change the value
+    later reads see.
+    """
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _remaining(expires: Optional[float], now: float) -> Optional[float]:
+    """Return the seconds left until a monotonic deadline, None if there is none."""
+    return None if expires is None else max(expires - now, 0.0)
+
+
+def _value_size(value: Any) -> int:
+    """Estimate the number of bytes a cached value occupies."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class CacheStats:
+    """Counters describing how a cache is used.
+
+    Recording an event costs a few attribute increments, so caches update
+    the counters inline on every operation. Breakdowns per key prefix are
+    only kept once enabled with ``BaseCache.enable_prefix_stats``.
+
+    Attributes:
+        hits: ``get`` calls that found a live entry.
+        misses: ``get`` calls that found nothing or an expired entry.
+        expirations: Entries found expired, on access or by a sweep.
+        evictions: Entries dropped to make room rather than by request.
+        sets: Values written.
+        bytes: Estimated bytes of the values written.
+    """
+
+    __slots__ = (
+        "hits",
+        "misses",
+        "expirations",
+        "evictions",
+        "sets",
+        "bytes",
+        "prefix_func",
+        "prefixes",
+    )
+
+    _COUNTERS = ("hits", "misses", "expirations", "evictions", "sets", "bytes")
+
+    def __init__(self) -> None:
+        self.prefix_func: Optional[Callable[[str], str]] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every counter, keeping prefix tracking enabled if it was."""
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.sets = 0
+        self.bytes = 0
+        self.prefixes: Dict[str, Dict[str, int]] = {}
+
+    def _prefix(self, key: str) -> Dict[str, int]:
+        prefix = self.prefix_func(key)  # type: ignore[misc]
+        counters = self.prefixes.get(prefix)
+        if counters is None:
+            counters = self.prefixes[prefix] = dict.fromkeys(self._COUNTERS, 0)
+        return counters
+
+    def hit(self, key: str) -> None:
+        self.hits += 1
+        if self.prefix_func is not None:
+            self._prefix(key)["hits"] += 1
+
+    def miss(self, key: str) -> None:
+        self.misses += 1
+        if self.prefix_func is not None:
+            self._prefix(key)["misses"] += 1
+
+    def expired(self, key: str) -> None:
+        self.expirations += 1
+        if self.prefix_func is not None:
+            self._prefix(key)["expirations"] += 1
+
+    def evicted(self, key: str) -> None:
+        self.evictions += 1
+        if self.prefix_func is not None:
+            self._prefix(key)["evictions"] += 1
+
+    def stored(self, key: str, size: int) -> None:
+        self.sets += 1
+        self.bytes += size
+        if self.prefix_func is not None:
+            counters = self._prefix(key)
+            counters["sets"] += 1
+            counters["bytes"] += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters as a dict."""
+        lookups = self.hits + self.misses
+        snapshot: Dict[str, Any] = {
+            name: getattr(self, name) for name in self._COUNTERS
+        }
+        snapshot["hit_ratio"] = self.hits / lookups if lookups else 0.0
+        if self.prefix_func is not None:
+            snapshot["prefixes"] = {
+                prefix: dict(counters) for prefix, counters in self.prefixes.items()
+            }
+        return snapshot
 
 
 class BaseCache:
     """Base cache interface."""
 
+    #: Whether operations may block on I/O. Async code runs blocking caches
+    #: in a worker thread so the event loop never waits on them.
+    blocking: bool = False
+
+    def __init__(self) -> None:
+        self._stats = CacheStats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache's usage counters.
+
+        Returns:
+            A dict with ``hits``, ``misses``, ``hit_ratio``, ``expirations``,
+            ``evictions``, ``sets`` and ``bytes``, plus ``prefixes`` mapping
+            each key prefix to its own counters when prefix stats are enabled.
+
+        Example:
+            >>> cache.stats()["hit_ratio"]
+            0.75
+        """
+        return self._stats.snapshot()
+
+    def reset_stats(self) -> None:
+        """Zero the usage counters."""
+        self._stats.reset()
+
+    def enable_prefix_stats(
+        self, prefix_func: Optional[Callable[[str], str]] = None
+    ) -> None:
+        """Break the usage counters down by key prefix.
+
+        Args:
+            prefix_func: Maps a key to the prefix it is counted under.
+                Defaults to the text before the first ``#``. Pass e.g.
+                ``lambda key: key.rsplit("#", 1)[-1]`` to group config keys
+                by namespace.
+        """
+        self._stats.prefix_func = prefix_func or _default_stats_prefix
+        self._stats.prefixes = {}
+
     def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """Set a value with optional TTL in seconds."""
         raise NotImplementedError
@@ -30,38 +299,243 @@ class BaseCache:
         """Clear all cache entries."""
         raise NotImplementedError
 
-    def cleanup_expired(self) -> int:
-        """Remove expired entries. Returns number of entries removed."""
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values at once.
+
+        Implementations look all keys up under one lock acquisition; this
+        default falls back to one ``get`` per key.
+
+        Args:
+            keys: Keys to look up.
+
+        Returns:
+            A dict of the keys found. Missing and expired keys are left out.
+        """
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def exists_many(self, keys: Iterable[str]) -> List[str]:
+        """Check several keys at once.
+
+        Implementations check all keys under one lock acquisition; this
+        default falls back to one ``exists`` per key.
+
+        Returns:
+            The keys that exist and are not expired, in the given order.
+        """
+        return [key for key in keys if self.exists(key)]
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values at once.
+
+        Args:
+            items: Values to store, by key.
+            ttl: TTL in seconds applied to every value.
+        """
+        for key, value in items.items():
+            self.set(key, value, ttl)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys at once. Returns number of keys deleted."""
+        return sum(1 for key in keys if self.delete(key))
+
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed.
+
+        Args:
+            limit: Maximum number of entries to examine in one call, which
+                bounds how long the cache lock is held. None sweeps everything.
+        """
         raise NotImplementedError
 
+    def start_janitor(
+        self, interval: float = 1.0, batch_size: int = 100
+    ) -> threading.Event:
+        """Start a daemon thread that sweeps expired entries in small batches.
+
+        The cache lock is released between batches, so a sweep never blocks
+        readers for longer than one batch takes.
+
+        Args:
+            interval: Seconds to wait between sweeps. Defaults to 1.0.
+            batch_size: Maximum entries examined per lock acquisition.
+                Defaults to 100.
+
+        Returns:
+            A threading.Event object with a cancel() method to stop the janitor.
+
+        Example:
+            >>> stop_event = cache.start_janitor(interval=5)
+            >>> # Later, to stop:
+            >>> stop_event.cancel()
+        """
+        stop_event = threading.Event()
+        stop_event.cancel = stop_event.set  # type: ignore[attr-defined]
+
+        def _janitor() -> None:
+            while not stop_event.wait(interval):
+                try:
+                    while not stop_event.is_set() and self.cleanup_expired(
+                        limit=batch_size
+                    ):
+                        # Give waiting readers a chance at the lock
+                        time.sleep(0)
+                except Exception as exc:
+                    logger.error("Cache janitor error. error=%s", exc)
+
+        thread = threading.Thread(target=_janitor, daemon=True)
+        thread.start()
+        return stop_event
+
 
 class MemoryCache(BaseCache):
-    """Thread-safe in-memory cache with TTL support."""
+    """Thread-safe in-memory cache with TTL support.
+
+    Expiry deadlines are taken from ``time.monotonic()``, so wall-clock jumps
+    neither expire nor revive entries, and are indexed in a heap so that
+    ``cleanup_expired`` only touches entries that are actually due.
 
-    def __init__(self):
-        self.storage: dict[str, dict[str, Any]] = {}
+    With ``dedup=True``, string and bytes values are kept in a content store
+    addressed by their MD5 digest: entries with identical content, such as
+    the same base config in many namespaces, share one reference-counted
+    copy that is released with its last entry.
+    """
+
+    def __init__(self, dedup: bool = False):
+        """Initialize the cache.
+
+        Args:
+            dedup: Store identical string and bytes values once.
+                Defaults to False.
+        """
+        super().__init__()
+        self.storage: dict[str, _CacheEntry] = {}
         self.lock = threading.Lock()
+        self.dedup = dedup
+        self._expiry = _ExpiryIndex()
+        self._blobs: Dict[bytes, _Blob] = {}
+
+    def _entry(self, value: Any, expires: Optional[float]) -> _CacheEntry:
+        """Build an entry, sharing the value through the content store."""
+        if not self.dedup:
+            return _CacheEntry(value, expires)
+        # Tag the type so equal text and bytes never share a blob
+        if isinstance(value, str):
+            tag, data = b"s", value.encode("utf-8")
+        elif isinstance(value, bytes):
+            tag, data = b"b", value
+        else:
+            return _CacheEntry(value, expires)
+        key = hashlib.md5(tag + data).digest()
+        blob = self._blobs.get(key)
+        if blob is None:
+            blob = self._blobs[key] = _Blob(value, len(data))
+        elif blob.value != value:
+            # A digest collision: keep this value to itself
+            return _CacheEntry(value, expires)
+        blob.refs += 1
+        return _SharedEntry(blob.value, expires, key)
+
+    def _release(self, entry: _CacheEntry) -> None:
+        """Drop an entry's reference to its shared blob, if it has one."""
+        if type(entry) is _SharedEntry:
+            blob = self._blobs[entry.digest]
+            blob.refs -= 1
+            if not blob.refs:
+                del self._blobs[entry.digest]
+
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        """Remove and return the entry for ``key``. The caller holds the lock."""
+        entry = self.storage.pop(key, None)
+        if entry is not None:
+            self._release(entry)
+        return entry
 
     def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """Set a value with optional TTL in seconds."""
-        expiry_time = time.time() + ttl if ttl else None
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values with optional TTL in seconds under one lock."""
+        expiry_time = time.monotonic() + ttl if ttl else None
         with self.lock:
-            self.storage[key] = {"value": value, "expires": expiry_time}
+            for key, value in items.items():
+                previous = self.storage.get(key)
+                self.storage[key] = self._entry(value, expiry_time)
+                if previous is not None:
+                    self._release(previous)
+                self._stats.stored(key, _value_size(value))
+                if expiry_time is not None:
+                    self._track_expiry(expiry_time, key)
+
+    def _track_expiry(self, deadline: float, key: str) -> None:
+        """Index a deadline, compacting the heap once stale pairs dominate."""
+        self._expiry.push(deadline, key)
+        if self._expiry.is_stale(len(self.storage)):
+            self._expiry.rebuild(
+                [
+                    (entry.expires, k)
+                    for k, entry in self.storage.items()
+                    if entry.expires is not None
+                ]
+            )
+
+    def _lookup(self, key: str, now: float) -> Optional[_CacheEntry]:
+        """Return the live entry for ``key``. The caller must hold the lock."""
+        entry = self.storage.get(key)
+        if entry is None:
+            self._stats.miss(key)
+            return None
+
+        # Check if expired
+        if entry.expires is not None and now > entry.expires:
+            # Remove expired entry
+            self._remove(key)
+            self._stats.expired(key)
+            self._stats.miss(key)
+            return None
+
+        self._stats.hit(key)
+        return entry
 
     def get(self, key: str) -> Any:
         """Get a value by key. Returns None if key doesn't exist or expired."""
         with self.lock:
-            entry = self.storage.get(key)
-            if entry is None:
-                return None
+            entry = self._lookup(key, time.monotonic())
+            return None if entry is None else entry.value
 
-            # Check if expired
-            if entry["expires"] is not None and time.time() > entry["expires"]:
-                # Remove expired entry
-                del self.storage[key]
-                return None
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values under one lock. Missing keys are left out."""
+        found = {}
+        with self.lock:
+            now = time.monotonic()
+            for key in keys:
+                entry = self._lookup(key, now)
+                if entry is not None:
+                    found[key] = entry.value
+        return found
 
-            return entry["value"]
+    def get_many_with_ttl(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """Get several values with their remaining TTL in seconds.
+
+        Returns:
+            ``(value, ttl)`` pairs by key, where ``ttl`` is None for values
+            that never expire. Missing keys are left out.
+        """
+        found = {}
+        with self.lock:
+            now = time.monotonic()
+            for key in keys:
+                entry = self._lookup(key, now)
+                if entry is not None:
+                    found[key] = (entry.value, _remaining(entry.expires, now))
+        return found
 
     def exists(self, key: str) -> bool:
         """Check if key exists and is not expired."""
@@ -71,139 +545,1207 @@ class MemoryCache(BaseCache):
                 return False
 
             # Check if expired
-            if entry["expires"] is not None and time.time() > entry["expires"]:
-                del self.storage[key]
+            if entry.expires is not None and time.monotonic() > entry.expires:
+                self._remove(key)
+                self._stats.expired(key)
                 return False
 
             return True
 
     def delete(self, key: str) -> bool:
         """Delete a key. Returns True if key was deleted."""
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys under one lock. Returns number deleted."""
+        deleted = 0
         with self.lock:
-            if key in self.storage:
-                del self.storage[key]
-                return True
-            return False
+            for key in keys:
+                if self._remove(key) is not None:
+                    deleted += 1
+        return deleted
 
     def clear(self) -> None:
         """Clear all cache entries."""
         with self.lock:
             self.storage.clear()
+            self._expiry.clear()
+            self._blobs.clear()
 
-    def cleanup_expired(self) -> int:
-        """Remove expired entries. Returns number of entries removed."""
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed.
+
+        Args:
+            limit: Maximum number of heap entries to examine while holding
+                the lock. None sweeps everything that is due.
+        """
         with self.lock:
-            now = time.time()
-            expired_keys = [
-                key
-                for key, entry in self.storage.items()
-                if entry["expires"] is not None and now > entry["expires"]
-            ]
-            for key in expired_keys:
-                del self.storage[key]
-            return len(expired_keys)
+            now = time.monotonic()
+            removed = 0
+            for key in self._expiry.pop_due(now, limit):
+                entry = self.storage.get(key)
+                # Skip stale heap pairs left behind by overwrites and deletes
+                if entry is None or entry.expires is None:
+                    continue
+                if now > entry.expires:
+                    self._remove(key)
+                    self._stats.expired(key)
+                    removed += 1
+            return removed
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Report how much value storage deduplication saves.
+
+        Only string and bytes values are measured, as UTF-8 bytes.
+
+        Returns:
+            A dict with the number of ``entries`` and of ``unique_blobs``,
+            the ``logical_bytes`` the entries' values add up to, the
+            ``stored_bytes`` actually kept, and the ``dedup_ratio`` between
+            the two (1.0 when nothing is shared).
+
+        Example:
+            >>> cache = MemoryCache(dedup=True)
+            >>> cache.set("app#DEFAULT_GROUP#ns1", base_config)
+            >>> cache.set("app#DEFAULT_GROUP#ns2", base_config)
+            >>> cache.memory_report()["dedup_ratio"]
+            2.0
+        """
+        with self.lock:
+            logical = stored = 0
+            for entry in self.storage.values():
+                if type(entry) is _SharedEntry:
+                    logical += self._blobs[entry.digest].size
+                elif isinstance(entry.value, str):
+                    size = len(entry.value.encode("utf-8"))
+                    logical += size
+                    stored += size
+                elif isinstance(entry.value, bytes):
+                    logical += len(entry.value)
+                    stored += len(entry.value)
+            stored += sum(blob.size for blob in self._blobs.values())
+            return {
+                "entries": len(self.storage),
+                "unique_blobs": len(self._blobs),
+                "logical_bytes": logical,
+                "stored_bytes": stored,
+                "dedup_ratio": logical / stored if stored else 1.0,
+            }
+
+
+class _LogRecord:
+    """Location, expiry and parsed value of the live record for a key."""
+
+    __slots__ = ("offset", "length", "expires", "value")
+
+    def __init__(
+        self, offset: int, length: int, expires: Optional[float], value: Any
+    ) -> None:
+        self.offset = offset
+        self.length = length
+        self.expires = expires
+        self.value = value
 
 
 class FileCache(BaseCache):
-    """File-based cache with TTL support."""
+    """File-based cache with TTL support.
 
-    def __init__(self, file_path: Optional[str] = None):
+    Entries are stored in an append-only log of JSON lines, mirrored in memory
+    by an index holding each key's parsed value and record offset. Reads are
+    dict lookups and writes append one line, so neither depends on the total
+    cache size. Dict and list values are returned as copies, so callers may
+    mutate them without changing the cached value.
+
+    Before each operation the log's inode, size and mtime are checked;
+    records appended by other processes are indexed incrementally, and a
+    replaced or truncated log is reloaded.
+
+    Superseded records are reclaimed by compaction, which rewrites the live
+    records to a temporary file and atomically replaces the log, so readers
+    never observe a half-written file. A torn record left by a crash is
+    truncated on load.
+
+    Appends, compactions and recovery hold an advisory lock on
+    ``<file_path>.lock``, so many processes can safely share one cache file.
+
+    Expiry times are persisted as wall-clock timestamps, since monotonic
+    deadlines are meaningless once the process that wrote them has exited.
+    They are converted to monotonic deadlines when the log is indexed.
+    """
+
+    _HEADER = b'{"use_nacos_cache": 1}\n'
+
+    blocking = True
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        compact_ratio: float = 0.5,
+        compact_min_bytes: int = 64 * 1024,
+    ):
+        """Initialize the file cache.
+
+        Args:
+            file_path: Path of the cache log. Defaults to
+                "_nacos_config_cache.json" in the working directory.
+            compact_ratio: Fraction of the log that must be superseded
+                records before it is compacted. Defaults to 0.5.
+            compact_min_bytes: Minimum number of superseded bytes before the
+                log is compacted. Defaults to 64 KiB.
+        """
+        super().__init__()
         self.file_path = file_path or "_nacos_config_cache.json"
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
         self.lock = threading.Lock()
+        self.file_lock = FileLock(f"{self.file_path}.lock")
+        self._index: Dict[str, _LogRecord] = {}
+        self._expiry = _ExpiryIndex()
+        self._fh: Optional[BinaryIO] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._size = 0
+        self._dead_bytes = 0
 
         # Ensure parent directory exists
         parent_dir = os.path.dirname(self.file_path)
         if parent_dir and not os.path.exists(parent_dir):
             os.makedirs(parent_dir, exist_ok=True)
 
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump({}, f)
-
-    def _read_file(self) -> dict:
-        """Read and parse cache file."""
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return {k: v for k, v in data.items() if not self._is_expired(v)}
-
-    def _write_file(self, data: dict) -> None:
-        """Write cache data to file."""
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-
-    def _is_expired(self, entry: dict) -> bool:
-        """Check if a cache entry is expired."""
-        expiry = entry.get("expires")
-        if expiry is None:
-            return False
-        return time.time() > expiry
+        try:
+            with open(self.file_path, "xb") as f:
+                f.write(self._HEADER)
+        except FileExistsError:
+            pass
+
+    def _log(self) -> BinaryIO:
+        """Return the open log file, indexing it on first use."""
+        if self._fh is None:
+            self._fh = open(self.file_path, "a+b")
+            self._load()
+        return self._fh
+
+    def _remember_signature(self) -> None:
+        """Record the log's current identity so later syncs can skip it."""
+        st = os.fstat(self._fh.fileno())
+        self._signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _sync(self) -> BinaryIO:
+        """Bring the in-memory mirror up to date with the log on disk.
+
+        Returns:
+            The open log file.
+        """
+        fh = self._log()
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            return fh
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if signature == self._signature:
+            return fh
+        if st.st_ino != self._signature[0] or st.st_size < self._size:
+            # Replaced by another process's compaction, or truncated
+            fh.close()
+            self._fh = fh = open(self.file_path, "a+b")
+            self._load()
+            return fh
+        if st.st_size > self._size:
+            fh.seek(self._size)
+            self._size = self._scan(fh.read(), 0, self._size)
+        self._signature = signature
+        return fh
+
+    def _load(self) -> None:
+        """Rebuild the index from the log, recovering from torn writes.
+
+        Runs under the file lock, so an incomplete final record cannot be
+        another process's append in progress.
+        """
+        with self.file_lock:
+            fh = self._fh
+            fh.seek(0)
+            data = fh.read()
+            self._index.clear()
+            self._expiry.clear()
+            self._dead_bytes = 0
+            if not data.startswith(self._HEADER):
+                self._migrate_legacy(data)
+                return
+            good_end = self._scan(data, len(self._HEADER))
+            if good_end < len(data):
+                logger.warning(
+                    "Truncating torn cache log tail. file=%s, bytes=%d",
+                    self.file_path,
+                    len(data) - good_end,
+                )
+                fh.truncate(good_end)
+            self._size = good_end
+            self._remember_signature()
+
+    def _scan(self, data: bytes, offset: int, base: int = 0) -> int:
+        """Index the records in ``data`` starting at ``offset``.
+
+        Args:
+            data: Log contents read from file position ``base``.
+            offset: Position in ``data`` of the first record.
+            base: File position of ``data[0]``.
+
+        Returns:
+            File position just past the last complete record.
+        """
+        now, wall_now = time.monotonic(), time.time()
+        while True:
+            end = data.find(b"\n", offset)
+            if end < 0:
+                return base + offset
+            length = end + 1 - offset
+            try:
+                record = json.loads(data[offset:end])
+                key = record["k"]
+            except (ValueError, KeyError, TypeError):
+                # Skip a corrupt record rather than losing the whole log
+                self._dead_bytes += length
+            else:
+                self._apply(record, key, base + offset, length, now, wall_now)
+            offset = end + 1
+
+    def _apply(
+        self,
+        record: dict,
+        key: str,
+        offset: int,
+        length: int,
+        now: float,
+        wall_now: float,
+    ) -> None:
+        """Update the index with one record read from or written to the log."""
+        previous = self._index.pop(key, None)
+        if previous is not None:
+            self._dead_bytes += previous.length
+        wall_expiry = record.get("e")
+        if record.get("d") or (wall_expiry is not None and wall_expiry <= wall_now):
+            self._dead_bytes += length
+            return
+        expires = now + (wall_expiry - wall_now) if wall_expiry is not None else None
+        self._index[key] = _LogRecord(offset, length, expires, record.get("v"))
+        if expires is not None:
+            self._expiry.push(expires, key)
+            if self._expiry.is_stale(len(self._index)):
+                self._expiry.rebuild(
+                    [
+                        (e.expires, k)
+                        for k, e in self._index.items()
+                        if e.expires is not None
+                    ]
+                )
+
+    def _migrate_legacy(self, data: bytes) -> None:
+        """Convert a whole-file JSON cache into the log format."""
+        try:
+            legacy = json.loads(data) if data.strip() else {}
+        except ValueError:
+            logger.warning("Discarding unreadable cache file. file=%s", self.file_path)
+            legacy = {}
+        lines = [
+            self._encode({"k": key, "v": entry.get("value"), "e": entry.get("expires")})
+            for key, entry in legacy.items()
+            if isinstance(entry, dict)
+        ]
+        self._rewrite(lines)
+
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        """Encode a record as one JSON line."""
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _append(self, records: List[dict]) -> None:
+        """Append records to the log in one write and index them."""
+        lines = [self._encode(record) for record in records]
+        with self.file_lock:
+            fh = self._sync()
+            fh.seek(0, os.SEEK_END)
+            offset = fh.tell()
+            fh.write(b"".join(lines))
+            fh.flush()
+            self._size = offset + sum(len(line) for line in lines)
+            self._remember_signature()
+        now, wall_now = time.monotonic(), time.time()
+        for record, line in zip(records, lines):
+            if not record.get("d"):
+                self._stats.stored(record["k"], len(line))
+            self._apply(record, record["k"], offset, len(line), now, wall_now)
+            offset += len(line)
+
+    def _write(self, records: List[dict]) -> None:
+        """Append records and compact if needed. The caller holds the lock."""
+        if records:
+            self._append(records)
+            self._maybe_compact()
+
+    def _live_entry(self, key: str, now: float) -> Optional[_LogRecord]:
+        """Return the index entry for ``key`` unless it is missing or expired.
+
+        The caller syncs the mirror first.
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        if entry.expires is not None and now > entry.expires:
+            # Expired records carry their own deadline, so nothing is written
+            del self._index[key]
+            self._dead_bytes += entry.length
+            self._stats.expired(key)
+            return None
+        return entry
+
+    def _rewrite(self, lines: List[bytes]) -> None:
+        """Atomically replace the log with ``lines`` and re-index it."""
+        parent_dir, name = os.path.split(os.path.abspath(self.file_path))
+        with self.file_lock:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=parent_dir, prefix=f".{name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self._HEADER)
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.file_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if self._fh is not None:
+                self._fh.close()
+            self._fh = open(self.file_path, "a+b")
+        self._index.clear()
+        self._expiry.clear()
+        self._dead_bytes = 0
+        self._size = self._scan(self._HEADER + b"".join(lines), len(self._HEADER))
+        self._remember_signature()
+
+    def _maybe_compact(self) -> None:
+        """Compact the log once superseded records dominate it."""
+        if (
+            self._dead_bytes >= self.compact_min_bytes
+            and self._dead_bytes >= self.compact_ratio * self._size
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log keeping only live records."""
+        with self.file_lock:
+            fh = self._sync()
+            now = time.monotonic()
+            lines = []
+            for entry in self._index.values():
+                if entry.expires is not None and now > entry.expires:
+                    continue
+                fh.seek(entry.offset)
+                lines.append(fh.read(entry.length))
+            self._rewrite(lines)
+
+    def compact(self) -> None:
+        """Reclaim space held by superseded and expired records."""
+        with self.lock:
+            self._compact()
+
+    def lock_stats(self) -> Dict[str, float]:
+        """Return contention metrics of the cross-process file lock.
+
+        Returns:
+            A dict with ``acquisitions``, total ``wait_seconds`` and
+            ``hold_seconds``, and the longest single ``max_hold_seconds``.
+        """
+        return self.file_lock.stats()
+
+    def close(self) -> None:
+        """Close the log file. It is reopened on the next operation."""
+        with self.lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
 
     def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """Set a value with optional TTL in seconds."""
-        expiry_time = time.time() + ttl if ttl else None
-        entry = {"value": value, "expires": expiry_time}
+        self.set_many({key: value}, ttl)
 
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values with optional TTL in seconds.
+
+        All records are appended with a single write under one acquisition
+        of the file lock.
+        """
+        wall_expiry = time.time() + ttl if ttl else None
         with self.lock:
-            data = self._read_file()
-            data[key] = entry
-            self._write_file(data)
+            self._write(
+                [
+                    {"k": key, "v": value, "e": wall_expiry}
+                    for key, value in items.items()
+                ]
+            )
 
     def get(self, key: str) -> Any:
         """Get a value by key. Returns None if key doesn't exist or expired."""
         with self.lock:
-            data = self._read_file()
-            entry = data.get(key)
+            self._sync()
+            entry = self._live_entry(key, time.monotonic())
             if entry is None:
+                self._stats.miss(key)
                 return None
-            if self._is_expired(entry):
-                # Remove expired entry and rewrite file
-                del data[key]
-                self._write_file(data)
-                return None
-            return entry["value"]
+            self._stats.hit(key)
+            return _detached(entry.value)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values after one sync. Missing keys are left out."""
+        found = {}
+        with self.lock:
+            self._sync()
+            now = time.monotonic()
+            for key in keys:
+                entry = self._live_entry(key, now)
+                if entry is None:
+                    self._stats.miss(key)
+                else:
+                    self._stats.hit(key)
+                    found[key] = _detached(entry.value)
+        return found
+
+    def get_many_with_ttl(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """Get several values with their remaining TTL in seconds.
+
+        Returns:
+            ``(value, ttl)`` pairs by key, where ``ttl`` is None for values
+            that never expire. Missing keys are left out.
+        """
+        found = {}
+        with self.lock:
+            self._sync()
+            now = time.monotonic()
+            for key in keys:
+                entry = self._live_entry(key, now)
+                if entry is None:
+                    self._stats.miss(key)
+                else:
+                    self._stats.hit(key)
+                    found[key] = (
+                        _detached(entry.value),
+                        _remaining(entry.expires, now),
+                    )
+        return found
 
     def exists(self, key: str) -> bool:
         """Check if key exists and is not expired."""
         with self.lock:
-            data = self._read_file()
-            entry = data.get(key)
-            if entry is None:
-                return False
-            if self._is_expired(entry):
-                del data[key]
-                self._write_file(data)
-                return False
-            return True
+            self._sync()
+            return self._live_entry(key, time.monotonic()) is not None
+
+    def exists_many(self, keys: Iterable[str]) -> List[str]:
+        """Check several keys after one sync."""
+        with self.lock:
+            self._sync()
+            now = time.monotonic()
+            return [key for key in keys if self._live_entry(key, now) is not None]
 
     def delete(self, key: str) -> bool:
         """Delete a key. Returns True if key was deleted."""
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys with one write. Returns number deleted."""
         with self.lock:
-            data = self._read_file()
-            if key in data:
-                del data[key]
-                self._write_file(data)
-                return True
-            return False
+            self._sync()
+            now = time.monotonic()
+            tombstones = [
+                {"k": key, "d": True}
+                for key in dict.fromkeys(keys)
+                if self._live_entry(key, now) is not None
+            ]
+            self._write(tombstones)
+            return len(tombstones)
 
     def clear(self) -> None:
         """Clear all cache entries."""
         with self.lock:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump({}, f)
+            self._rewrite([])
 
-    def cleanup_expired(self) -> int:
-        """Remove expired entries. Returns number of entries removed."""
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed.
+
+        Expired entries are dropped from the index; their records are
+        reclaimed by the next compaction.
+
+        Args:
+            limit: Maximum number of heap entries to examine while holding
+                the lock. None sweeps everything that is due.
+        """
         with self.lock:
-            data = self._read_file()
-            expired_keys = [k for k, v in data.items() if self._is_expired(v)]
-            for key in expired_keys:
-                del data[key]
-            if expired_keys:
-                self._write_file(data)
-            return len(expired_keys)
+            self._sync()
+            now = time.monotonic()
+            removed = 0
+            for key in self._expiry.pop_due(now, limit):
+                entry = self._index.get(key)
+                if entry is None or entry.expires is None:
+                    continue
+                if now > entry.expires:
+                    del self._index[key]
+                    self._dead_bytes += entry.length
+                    self._stats.expired(key)
+                    removed += 1
+            if removed:
+                self._maybe_compact()
+            return removed
+
+
+#: Marker for a delete waiting in a write-behind buffer
+_PENDING_DELETE = object()
+
+
+#: Tiered caches not closed yet, flushed at interpreter exit
+_open_tiered_caches: "weakref.WeakSet[TieredCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_tiered_caches() -> None:
+    for cache in list(_open_tiered_caches):
+        cache.close()
+
+
+class TieredCache(BaseCache):
+    """Two-level cache: a fast L1 in front of a persistent L2.
+
+    Reads are served from L1 and fall back to L2; values found only in L2
+    are promoted into L1. Writes go to L1 immediately and are queued for a
+    background worker that applies them to L2 in batches, every
+    ``flush_interval`` seconds or once ``batch_size`` writes are pending.
+    The worker only runs while writes are pending, so an idle cache holds no
+    thread and can be garbage collected. Pending writes are flushed on
+    ``close()`` and at interpreter exit.
+
+    Example:
+        >>> cache = TieredCache(MemoryCache(), FileCache("/var/cache/nacos.json"))
+        >>> client.config.get("app.yaml", "DEFAULT_GROUP", cache=cache)
+    """
+
+    def __init__(
+        self,
+        l1: Optional[BaseCache] = None,
+        l2: Optional[BaseCache] = None,
+        flush_interval: float = 1.0,
+        batch_size: int = 100,
+        promote_ttl: Optional[float] = 60.0,
+    ) -> None:
+        """Initialize the tiered cache.
+
+        Args:
+            l1: Fast front cache. Defaults to a new ``MemoryCache``.
+            l2: Persistent back cache. Defaults to a ``FileCache`` at its
+                default path.
+            flush_interval: Seconds between write-behind flushes.
+                Defaults to 1.0.
+            batch_size: Number of pending writes that triggers an immediate
+                flush. Defaults to 100.
+            promote_ttl: Longest TTL in seconds of values promoted from L2
+                into L1; values expiring sooner in L2 keep their remaining
+                TTL. None keeps values without a TTL until overwritten.
+                Values are only promoted if L2 reports their remaining TTL
+                through ``get_many_with_ttl``. Defaults to 60.
+        """
+        super().__init__()
+        self.l1 = l1 or MemoryCache()
+        self.l2 = l2 or FileCache()
+        self.blocking = self.l1.blocking or self.l2.blocking
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.promote_ttl = promote_ttl
+        self._pending: Dict[str, Any] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        _open_tiered_caches.add(self)
+
+    def _write_behind(self) -> None:
+        """Flush pending writes until there are none left."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                logger.error("Failed to flush cache writes to L2. error=%s", exc)
+            with self._pending_lock:
+                if self._closed.is_set() or not self._pending:
+                    self._worker = None
+                    return
+
+    def _queue(self, items: Dict[str, Any]) -> None:
+        """Queue writes for L2, starting the worker or waking it when full."""
+        with self._pending_lock:
+            self._pending.update(items)
+            full = len(self._pending) >= self.batch_size
+            if self._worker is None and not self._closed.is_set():
+                self._worker = threading.Thread(
+                    target=self._write_behind,
+                    name="use-nacos-tiered-cache",
+                    daemon=True,
+                )
+                self._worker.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Apply every pending write to L2."""
+        # Serialize flushes so batches reach L2 in order
+        with self._flush_lock:
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+            try:
+                self._write_batch(batch)
+            except BaseException:
+                # Requeue whatever later writes have not superseded
+                with self._pending_lock:
+                    for key, pending in batch.items():
+                        self._pending.setdefault(key, pending)
+                raise
+
+    def _write_batch(self, batch: Dict[str, Any]) -> None:
+        """Write a batch to L2, grouping values that share a TTL."""
+        now = time.monotonic()
+        deletes = []
+        groups: Dict[Optional[float], Dict[str, Any]] = {}
+        deadlines: Dict[float, float] = {}
+        for key, pending in batch.items():
+            if pending is _PENDING_DELETE:
+                deletes.append(key)
+                continue
+            value, ttl, deadline = pending
+            if ttl is not None:
+                if deadline <= now:
+                    continue
+                # A group expires with its earliest member; expiring early
+                # only costs a refetch.
+                deadlines[ttl] = min(deadlines.get(ttl, deadline), deadline)
+            groups.setdefault(ttl, {})[key] = value
+        if deletes:
+            self.l2.delete_many(deletes)
+        for ttl, items in groups.items():
+            self.l2.set_many(items, None if ttl is None else deadlines[ttl] - now)
+
+    def _pending_delete(self, key: str) -> bool:
+        with self._pending_lock:
+            return self._pending.get(key) is _PENDING_DELETE
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values with optional TTL in seconds."""
+        self.l1.set_many(items, ttl)
+        ttl = ttl or None
+        deadline = time.monotonic() + ttl if ttl else None
+        self._queue({key: (value, ttl, deadline) for key, value in items.items()})
+        for key, value in items.items():
+            self._stats.stored(key, _value_size(value))
+
+    def get(self, key: str) -> Any:
+        """Get a value by key. Returns None if key doesn't exist or expired."""
+        value = self.l1.get(key)
+        if value is None and not self._pending_delete(key):
+            value = self._read_l2([key]).get(key)
+        if value is None:
+            self._stats.miss(key)
+        else:
+            self._stats.hit(key)
+        return value
+
+    def _read_l2(self, keys: List[str]) -> Dict[str, Any]:
+        """Read keys from L2, promoting the values found into L1.
+
+        A promoted value must not outlive its L2 record, so it is promoted
+        with the smaller of ``promote_ttl`` and its remaining TTL in L2, and
+        not at all if L2 cannot tell that TTL.
+        """
+        get_many_with_ttl = getattr(self.l2, "get_many_with_ttl", None)
+        if get_many_with_ttl is None:
+            return self.l2.get_many(keys)
+        found = {}
+        by_ttl: Dict[Optional[float], Dict[str, Any]] = {}
+        for key, (value, ttl) in get_many_with_ttl(keys).items():
+            found[key] = value
+            if ttl is None:
+                ttl = self.promote_ttl
+            elif self.promote_ttl is not None:
+                ttl = min(ttl, self.promote_ttl)
+            # A zero TTL would mean no expiry to L1, so such values stay in L2
+            if ttl is None or ttl > 0:
+                by_ttl.setdefault(ttl, {})[key] = value
+        for ttl, items in by_ttl.items():
+            self.l1.set_many(items, ttl)
+        return found
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values. Missing and expired keys are left out."""
+        keys = list(keys)
+        found = self.l1.get_many(keys)
+        with self._pending_lock:
+            missing = [
+                key
+                for key in keys
+                if key not in found and self._pending.get(key) is not _PENDING_DELETE
+            ]
+        if missing:
+            found.update(self._read_l2(missing))
+        for key in keys:
+            if key in found:
+                self._stats.hit(key)
+            else:
+                self._stats.miss(key)
+        return found
+
+    def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        if self.l1.exists(key):
+            return True
+        return not self._pending_delete(key) and self.l2.exists(key)
+
+    def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns number of keys deleted."""
+        keys = list(dict.fromkeys(keys))
+        found = set(self.l1.exists_many(keys))
+        with self._pending_lock:
+            rest = [
+                key
+                for key in keys
+                if key not in found and self._pending.get(key) is not _PENDING_DELETE
+            ]
+        if rest:
+            # One batch check, so L2 is synced once rather than per key
+            found.update(self.l2.exists_many(rest))
+        keys = [key for key in keys if key in found]
+        self.l1.delete_many(keys)
+        self._queue(dict.fromkeys(keys, _PENDING_DELETE))
+        return len(keys)
+
+    def clear(self) -> None:
+        """Clear both tiers, discarding pending writes."""
+        with self._flush_lock:
+            with self._pending_lock:
+                self._pending.clear()
+            self.l1.clear()
+            self.l2.clear()
+
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries from both tiers.
+
+        Returns:
+            Number of entries removed across both tiers.
+        """
+        return self.l1.cleanup_expired(limit) + self.l2.cleanup_expired(limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return usage counters, with each tier's own under ``l1`` and ``l2``.
+
+        The top-level ``hits`` count reads served by either tier.
+        """
+        snapshot = super().stats()
+        snapshot["l1"] = self.l1.stats()
+        snapshot["l2"] = self.l2.stats()
+        return snapshot
+
+    def reset_stats(self) -> None:
+        """Zero the usage counters of this cache and both tiers."""
+        super().reset_stats()
+        self.l1.reset_stats()
+        self.l2.reset_stats()
+
+    def close(self) -> None:
+        """Stop the write-behind worker, flush pending writes and close L2."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wakeup.set()
+        _open_tiered_caches.discard(self)
+        with self._pending_lock:
+            worker = self._worker
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+        self.flush()
+        close = getattr(self.l2, "close", None)
+        if callable(close):
+            close()
+
+
+class AsyncBaseCache:
+    """Base async cache interface.
+
+    Async endpoints await these methods directly, so implementations must
+    never block the event loop.
+    """
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Any:
+        """Get a value by key."""
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists."""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Clear all cache entries."""
+        raise NotImplementedError
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values. Missing and expired keys are left out."""
+        found = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def set_many(
+        self, items: Dict[str, Any], ttl: Optional[float] = None
+    ) -> None:
+        """Set several values with optional TTL in seconds."""
+        for key, value in items.items():
+            await self.set(key, value, ttl)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns number of keys deleted."""
+        deleted = 0
+        for key in keys:
+            deleted += await self.delete(key)
+        return deleted
+
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache's usage counters."""
+        raise NotImplementedError
+
+    def reset_stats(self) -> None:
+        """Zero the usage counters."""
+        raise NotImplementedError
+
+
+class AsyncCacheAdapter(AsyncBaseCache):
+    """Expose a sync ``BaseCache`` through the async interface.
+
+    Operations of caches flagged ``blocking`` run in the event loop's default
+    executor; non-blocking caches such as ``MemoryCache`` are called inline.
+
+    Example:
+        >>> cache = AsyncCacheAdapter(FileCache())
+        >>> await cache.set("config", {"timeout": 30})
+    """
+
+    def __init__(self, cache: BaseCache) -> None:
+        """Wrap a sync cache.
+
+        Args:
+            cache: The sync cache to adapt.
+        """
+        self.cache = cache
+
+    async def _call(self, method: Callable, *args: Any) -> Any:
+        """Run a cache method, off the event loop if it may block."""
+        if not self.cache.blocking:
+            return method(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(method, *args))
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        await self._call(self.cache.set, key, value, ttl)
+
+    async def get(self, key: str) -> Any:
+        """Get a value by key. Returns None if key doesn't exist or expired."""
+        return await self._call(self.cache.get, key)
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        return await self._call(self.cache.exists, key)
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        return await self._call(self.cache.delete, key)
+
+    async def clear(self) -> None:
+        """Clear all cache entries."""
+        await self._call(self.cache.clear)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values. Missing and expired keys are left out."""
+        return await self._call(self.cache.get_many, list(keys))
+
+    async def set_many(
+        self, items: Dict[str, Any], ttl: Optional[float] = None
+    ) -> None:
+        """Set several values with optional TTL in seconds."""
+        await self._call(self.cache.set_many, dict(items), ttl)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns number of keys deleted."""
+        return await self._call(self.cache.delete_many, list(keys))
+
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed."""
+        return await self._call(self.cache.cleanup_expired, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the wrapped cache's usage counters."""
+        return self.cache.stats()
+
+    def reset_stats(self) -> None:
+        """Zero the wrapped cache's usage counters."""
+        self.cache.reset_stats()
+
+
+class AsyncFileCache(AsyncBaseCache):
+    """Async file cache that keeps disk I/O off the event loop.
+
+    Reads run in a worker thread. Writes are buffered and flushed to the
+    underlying ``FileCache`` in batches, either after ``flush_interval``
+    seconds or once ``batch_size`` writes are pending. Buffered writes are
+    visible to reads immediately. Call ``flush()`` (or ``aclose()``) before
+    shutdown so nothing pending is lost.
+
+    Example:
+        >>> cache = AsyncFileCache("/path/to/cache.json")
+        >>> await client.config.get("app.yaml", "DEFAULT_GROUP", cache=cache)
+        >>> await cache.aclose()
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        flush_interval: float = 0.05,
+        batch_size: int = 100,
+        cache: Optional[FileCache] = None,
+    ) -> None:
+        """Initialize the async file cache.
+
+        Args:
+            file_path: Path of the cache log, as for ``FileCache``.
+            flush_interval: Seconds to buffer writes before flushing.
+                Defaults to 0.05.
+            batch_size: Number of pending writes that triggers an immediate
+                flush. Defaults to 100.
+            cache: An existing ``FileCache`` to wrap instead of opening
+                ``file_path``.
+        """
+        self.cache = cache or FileCache(file_path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[str, Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def _run(self, method: Callable, *args: Any) -> Any:
+        """Run a FileCache method in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(method, *args))
+
+    def _write_batch(self, batch: Dict[str, Any]) -> None:
+        """Append buffered writes to the file cache in one write.
+
+        Runs in a worker thread.
+        """
+        now, wall_now = time.monotonic(), time.time()
+        records = []
+        for key, pending in batch.items():
+            if pending is _PENDING_DELETE:
+                records.append({"k": key, "d": True})
+                continue
+            value, deadline = pending
+            if deadline is None:
+                records.append({"k": key, "v": value, "e": None})
+            elif deadline > now:
+                records.append({"k": key, "v": value, "e": wall_now + deadline - now})
+        with self.cache.lock:
+            self.cache._write(records)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write every buffered change to the file."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        # Serialize flushes so batches reach the file in order
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self._run(self._write_batch, batch)
+            except BaseException:
+                # Put the batch back behind any write buffered since, so
+                # the next flush retries it
+                self._pending = {**batch, **self._pending}
+                raise
+
+    def _buffer(self, key: str, pending: Any) -> None:
+        """Queue a write and make sure a flush is scheduled."""
+        self._pending[key] = pending
+        if len(self._pending) >= self.batch_size:
+            task = asyncio.ensure_future(self.flush())
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+        elif self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        self._buffer(key, (value, time.monotonic() + ttl if ttl else None))
+
+    async def get(self, key: str) -> Any:
+        """Get a value by key. Returns None if key doesn't exist or expired."""
+        pending = self._pending.get(key)
+        if pending is None:
+            return await self._run(self.cache.get, key)
+        # Reads served from the buffer are counted without taking the file
+        # cache's lock, which a flush in a worker thread may be holding
+        if pending is _PENDING_DELETE:
+            self.cache._stats.miss(key)
+            return None
+        value, deadline = pending
+        if deadline is not None and time.monotonic() > deadline:
+            self.cache._stats.miss(key)
+            return None
+        self.cache._stats.hit(key)
+        return value
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        pending = self._pending.get(key)
+        if pending is None:
+            return await self._run(self.cache.exists, key)
+        if pending is _PENDING_DELETE:
+            return False
+        return pending[1] is None or time.monotonic() <= pending[1]
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        existed = await self.exists(key)
+        if existed:
+            self._buffer(key, _PENDING_DELETE)
+        return existed
+
+    async def clear(self) -> None:
+        """Clear all cache entries."""
+        self._pending.clear()
+        await self._run(self.cache.clear)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values. Missing and expired keys are left out.
+
+        Keys not in the write buffer are read from the file in one call.
+        """
+        found = {}
+        unbuffered = []
+        for key in keys:
+            if key not in self._pending:
+                unbuffered.append(key)
+                continue
+            value = await self.get(key)
+            if value is not None:
+                found[key] = value
+        if unbuffered:
+            found.update(await self._run(self.cache.get_many, unbuffered))
+        return found
+
+    async def set_many(
+        self, items: Dict[str, Any], ttl: Optional[float] = None
+    ) -> None:
+        """Set several values with optional TTL in seconds."""
+        deadline = time.monotonic() + ttl if ttl else None
+        for key, value in items.items():
+            self._buffer(key, (value, deadline))
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns number of keys deleted."""
+        keys = list(dict.fromkeys(keys))
+        unbuffered = [key for key in keys if key not in self._pending]
+        stored = await self._run(self.cache.get_many, unbuffered)
+        deleted = 0
+        for key in keys:
+            if key in stored or (key in self._pending and await self.exists(key)):
+                self._buffer(key, _PENDING_DELETE)
+                deleted += 1
+        return deleted
+
+    async def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed."""
+        await self.flush()
+        return await self._run(self.cache.cleanup_expired, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the usage counters.
+
+        Writes are counted once they are flushed to the file.
+        """
+        return self.cache.stats()
+
+    def reset_stats(self) -> None:
+        """Zero the usage counters."""
+        self.cache.reset_stats()
+
+    async def aclose(self) -> None:
+        """Flush buffered writes and close the file."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await self._run(self.cache.close)
+
+
+def as_async_cache(cache: Any) -> AsyncBaseCache:
+    """Return ``cache`` as an async cache.
+
+    Async caches are returned unchanged; sync caches are wrapped in an
+    ``AsyncCacheAdapter``.
+
+    Args:
+        cache: A ``BaseCache`` or ``AsyncBaseCache`` instance.
+
+    Returns:
+        An ``AsyncBaseCache`` instance.
+    """
+    if isinstance(cache, AsyncBaseCache):
+        return cache
+    return AsyncCacheAdapter(cache)
 
 
 # Global cache instances with TTL (default 5 minutes)
 DEFAULT_CACHE_TTL = 300  # 5 minutes in seconds
+# Configs the server reported missing (404) are remembered for a shorter time
+NEGATIVE_CACHE_TTL = 10  # seconds
 
-memory_cache = MemoryCache()
+# Configs shared by many namespaces are stored once
+memory_cache = MemoryCache(dedup=True)
@@ -0,0 +1,234 @@
+"""Transparent compression of large cached values.
+
+Config contents are text that compresses well, and large YAML or JSON
+configs dominate the memory of ``MemoryCache`` and the size of
+``FileCache`` logs. ``CompressedCache`` wraps any ``BaseCache`` and stores
+string and bytes values above a size threshold compressed, with lz4 when it
+is installed and zlib otherwise. Values stay compressed in the wrapped cache
+and are only decompressed when read.
+"""
+
+import base64
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .cache import BaseCache, MemoryCache
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+#: Codec name -> (compress, decompress)
+_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if lz4_frame is not None:
+    _CODECS["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+
+#: Key marking a compressed value stored as a JSON-compatible dict
+_MARKER = "__use_nacos_compressed__"
+
+
+class _Compressed:
+    """A compressed value held by an in-memory backend."""
+
+    __slots__ = ("codec", "data", "is_text")
+
+    def __init__(self, codec: str, data: bytes, is_text: bool) -> None:
+        self.codec = codec
+        self.data = data
+        self.is_text = is_text
+
+
+class CompressedCache(BaseCache):
+    """Wrap a cache so large string and bytes values are stored compressed.
+
+    Values shorter than ``threshold`` bytes, and values that do not shrink
+    below ``max_ratio`` of their size, are stored as they are, so small or
+    incompressible configs cost no CPU on read. Other values are compressed
+    on write and decompressed on each read.
+
+    In-memory backends hold compressed bytes directly. Other backends, such
+    as ``FileCache`` and ``MmapCache``, persist JSON, so compressed values
+    are stored base64 encoded in a small marker dict.
+
+    Example:
+        >>> cache = CompressedCache(FileCache("/var/cache/nacos.json"))
+        >>> client.config.get("large.yaml", "DEFAULT_GROUP", cache=cache)
+        >>> cache.stats()["compression"]["saved_bytes"]
+        181734
+    """
+
+    def __init__(
+        self,
+        cache: Optional[BaseCache] = None,
+        threshold: int = 1024,
+        codec: Optional[str] = None,
+        max_ratio: float = 0.9,
+    ) -> None:
+        """Initialize the compressing wrapper.
+
+        Args:
+            cache: The cache to store values in. Defaults to a new
+                ``MemoryCache``.
+            threshold: Size in bytes from which values are compressed.
+                Defaults to 1024.
+            codec: "lz4" or "zlib". Defaults to lz4 when installed, zlib
+                otherwise.
+            max_ratio: Compressed values larger than this fraction of the
+                original are stored uncompressed. Defaults to 0.9.
+
+        Raises:
+            ValueError: If the codec is unknown or not installed.
+        """
+        super().__init__()
+        codec = codec or ("lz4" if "lz4" in _CODECS else "zlib")
+        if codec not in _CODECS:
+            raise ValueError(f"Unavailable compression codec: {codec}")
+        self.cache = cache or MemoryCache()
+        self.blocking = self.cache.blocking
+        self.threshold = threshold
+        self.codec = codec
+        self.max_ratio = max_ratio
+        self._binary = isinstance(self.cache, MemoryCache)
+        self._lock = threading.Lock()
+        self._reset_compression_stats()
+
+    def _reset_compression_stats(self) -> None:
+        self._compressed = 0
+        self._bypassed = 0
+        self._raw_bytes = 0
+        self._stored_bytes = 0
+        self._compress_seconds = 0.0
+        self._decompress_seconds = 0.0
+
+    def _encode(self, value: Any) -> Any:
+        """Return the form of ``value`` to store in the wrapped cache."""
+        if isinstance(value, str):
+            raw, is_text = value.encode("utf-8"), True
+        elif isinstance(value, (bytes, bytearray)):
+            raw, is_text = bytes(value), False
+        else:
+            return value
+        if len(raw) < self.threshold:
+            return value
+
+        started = time.perf_counter()
+        data = _CODECS[self.codec][0](raw)
+        elapsed = time.perf_counter() - started
+        compressed = len(data) <= self.max_ratio * len(raw)
+        with self._lock:
+            self._compress_seconds += elapsed
+            self._raw_bytes += len(raw)
+            if compressed:
+                self._compressed += 1
+                self._stored_bytes += len(data)
+            else:
+                self._bypassed += 1
+                self._stored_bytes += len(raw)
+        if not compressed:
+            return value
+        if self._binary:
+            return _Compressed(self.codec, data, is_text)
+        return {
+            _MARKER: self.codec,
+            "data": base64.b64encode(data).decode("ascii"),
+            "text": is_text,
+        }
+
+    def _decode(self, stored: Any) -> Any:
+        """Return the original value of a stored value."""
+        if isinstance(stored, _Compressed):
+            codec, data, is_text = stored.codec, stored.data, stored.is_text
+        elif isinstance(stored, dict) and _MARKER in stored:
+            codec = stored[_MARKER]
+            data = base64.b64decode(stored["data"])
+            is_text = stored["text"]
+        else:
+            return stored
+
+        started = time.perf_counter()
+        raw = _CODECS[codec][1](data)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._decompress_seconds += elapsed
+        return raw.decode("utf-8") if is_text else raw
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        self.cache.set(key, self._encode(value), ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values with optional TTL in seconds."""
+        self.cache.set_many(
+            {key: self._encode(value) for key, value in items.items()}, ttl
+        )
+
+    def get(self, key: str) -> Any:
+        """Get a value by key. Returns None if key doesn't exist or expired."""
+        return self._decode(self.cache.get(key))
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values. Missing and expired keys are left out."""
+        return {
+            key: self._decode(value) for key, value in self.cache.get_many(keys).items()
+        }
+
+    def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        return self.cache.exists(key)
+
+    def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        return self.cache.delete(key)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns number of keys deleted."""
+        return self.cache.delete_many(keys)
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        self.cache.clear()
+
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed."""
+        return self.cache.cleanup_expired(limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the wrapped cache's usage counters plus compression counters.
+
+        Returns:
+            The wrapped cache's ``stats()``, with a ``compression`` dict
+            holding ``compressed`` and ``bypassed`` value counts, the
+            ``raw_bytes`` and ``stored_bytes`` of values at or above the
+            threshold, the resulting ``saved_bytes``, and the CPU time
+            spent in ``compress_seconds`` and ``decompress_seconds``.
+        """
+        snapshot = self.cache.stats()
+        with self._lock:
+            snapshot["compression"] = {
+                "codec": self.codec,
+                "compressed": self._compressed,
+                "bypassed": self._bypassed,
+                "raw_bytes": self._raw_bytes,
+                "stored_bytes": self._stored_bytes,
+                "saved_bytes": self._raw_bytes - self._stored_bytes,
+                "compress_seconds": self._compress_seconds,
+                "decompress_seconds": self._decompress_seconds,
+            }
+        return snapshot
+
+    def reset_stats(self) -> None:
+        """Zero the usage and compression counters."""
+        self.cache.reset_stats()
+        with self._lock:
+            self._reset_compression_stats()
+
+    def enable_prefix_stats(
+        self, prefix_func: Optional[Callable[[str], str]] = None
+    ) -> None:
+        """Break the wrapped cache's usage counters down by key prefix."""
+        self.cache.enable_prefix_stats(prefix_func)
@@ -8,14 +8,26 @@ import asyncio
 import hashlib
 import logging
 import threading
-from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
 
 import httpx
 
 from ..cache import (
     DEFAULT_CACHE_TTL,
+    NEGATIVE_CACHE_TTL,
+    AsyncBaseCache,
     BaseCache,
     MemoryCache,
+    as_async_cache,
     memory_cache,
 )
 from ..exception import HTTPResponseError
@@ -91,6 +103,46 @@ def _serialize_config(
 class _BaseConfigEndpoint(Endpoint):
     """Base configuration endpoint with common operations."""
 
+    def __init__(self, client: "BaseClient") -> None:
+        """Initialize the endpoint with a Nacos client.
+
+        Args:
+            client: The Nacos client instance for making API requests.
+        """
+        super().__init__(client)
+        # Keys of configs the server answered 404 for, so that optional
+        # configs requested with a default are not refetched on every call
+        self._not_found = MemoryCache()
+
+    def _remember_not_found(
+        self, config_key: str, negative_ttl: Optional[float]
+    ) -> None:
+        """Record a 404 for ``config_key`` for ``negative_ttl`` seconds."""
+        if negative_ttl:
+            self._not_found.set(config_key, True, ttl=negative_ttl)
+
+    def _known_not_found(
+        self,
+        data_ids: List[str],
+        group: str,
+        tenant: Optional[str],
+        default: Optional[str],
+    ) -> Dict[str, Any]:
+        """Map data IDs recently answered 404 to ``default``.
+
+        Returns an empty dict when there is no default to serve instead.
+        """
+        if default is None:
+            return {}
+        missing = self._not_found.get_many(
+            _get_config_key(data_id, group, tenant) for data_id in data_ids
+        )
+        return {
+            data_id: default
+            for data_id in data_ids
+            if _get_config_key(data_id, group, tenant) in missing
+        }
+
     def _get(
         self, data_id: str, group: str, tenant: Optional[str] = ""
     ) -> SyncAsync[Any]:
@@ -142,6 +194,7 @@ class _BaseConfigEndpoint(Endpoint):
             ...     type="yaml"
             ... )
         """
+        self._not_found.delete(_get_config_key(data_id, group, tenant))
         return self.client.request(
             "/nacos/v1/cs/configs",
             method="POST",
@@ -276,6 +329,7 @@ class ConfigOperationMixin:
         serializer: Optional[Union["Serializer", bool]] = None,
         cache: Optional[BaseCache] = None,
         default: Optional[str] = None,
+        negative_ttl: Optional[float] = NEGATIVE_CACHE_TTL,
     ) -> SyncAsync[Any]:
         """Get configuration content.
 
@@ -287,6 +341,10 @@ class ConfigOperationMixin:
                 or provide a Serializer instance.
             cache: Cache instance for fallback. Defaults to global memory_cache.
             default: Default value if configuration not found (404).
+            negative_ttl: Seconds to remember a 404, during which calls with
+                a default return it without asking the server. The entry is
+                dropped early once a subscription sees the config change or
+                it is published. None or 0 disables this. Defaults to 10.
 
         Returns:
             Configuration content (raw string or serialized based on serializer).
@@ -302,6 +360,8 @@ class ConfigOperationMixin:
         """
         cache = cache or memory_cache
         config_key = _get_config_key(data_id, group, tenant)
+        if default is not None and self._not_found.exists(config_key):
+            return default
         try:
             config = self._get(data_id, group, tenant)
             # Cache with TTL (default 5 minutes)
@@ -324,10 +384,98 @@ class ConfigOperationMixin:
                 group,
                 exc.status,
             )
-            if exc.status == 404 and default is not None:
-                return default
+            if exc.status == 404:
+                self._remember_not_found(config_key, negative_ttl)
+                if default is not None:
+                    return default
             raise
 
+    def get_many(
+        self,
+        data_ids: Iterable[str],
+        group: str,
+        tenant: Optional[str] = "",
+        *,
+        serializer: Optional[Union["Serializer", bool]] = None,
+        cache: Optional[BaseCache] = None,
+        default: Optional[str] = None,
+        negative_ttl: Optional[float] = NEGATIVE_CACHE_TTL,
+    ) -> Dict[str, Any]:
+        """Get several configurations of one group.
+
+        Fetched configurations are written to the cache in one batch, and
+        configurations the server could not be reached for are read from
+        the cache in one batch.
+
+        Args:
+            data_ids: Configuration data IDs.
+            group: Configuration group.
+            tenant: Namespace/tenant ID.
+            serializer: Serializer to parse the content. True for auto-detection,
+                or provide a Serializer instance.
+            cache: Cache instance for fallback. Defaults to global memory_cache.
+            default: Default value for configurations not found (404).
+            negative_ttl: Seconds to remember a 404, as for ``get``.
+
+        Returns:
+            A dict mapping each data ID to its configuration content.
+
+        Raises:
+            HTTPResponseError: If a configuration is not found and no default
+                is provided.
+
+        Example:
+            >>> configs = client.config.get_many(
+            ...     ["app.yaml", "db.yaml"], "DEFAULT_GROUP", serializer=True
+            ... )
+        """
+        cache = cache or memory_cache
+        data_ids = list(data_ids)
+        configs = self._known_not_found(data_ids, group, tenant, default)
+        fetched: Dict[str, Any] = {}
+        unreachable = []
+        try:
+            for data_id in data_ids:
+                if data_id in configs:
+                    continue
+                try:
+                    config = self._get(data_id, group, tenant)
+                except (httpx.ConnectError, httpx.TimeoutException) as exc:
+                    logger.error(
+                        "Failed to get config from server, trying cache. "
+                        "data_id=%s, group=%s, tenant=%s, error=%s",
+                        data_id,
+                        group,
+                        tenant,
+                        exc,
+                    )
+                    unreachable.append(data_id)
+                    continue
+                except HTTPResponseError as exc:
+                    if exc.status == 404:
+                        self._remember_not_found(
+                            _get_config_key(data_id, group, tenant), negative_ttl
+                        )
+                        if default is not None:
+                            configs[data_id] = default
+                            continue
+                    raise
+                fetched[_get_config_key(data_id, group, tenant)] = config
+                configs[data_id] = _serialize_config(config, serializer)
+        finally:
+            if fetched:
+                # Cache with TTL (default 5 minutes)
+                cache.set_many(fetched, ttl=DEFAULT_CACHE_TTL)
+        if unreachable:
+            cached = cache.get_many(
+                _get_config_key(data_id, group, tenant) for data_id in unreachable
+            )
+            for data_id in unreachable:
+                configs[data_id] = _serialize_config(
+                    cached.get(_get_config_key(data_id, group, tenant)), serializer
+                )
+        return {data_id: configs[data_id] for data_id in data_ids}
+
     def subscribe(
         self,
         data_id: str,
@@ -386,6 +534,7 @@ class ConfigOperationMixin:
                         group,
                         tenant,
                     )
+                    self._not_found.delete(config_key)
                     last_config = self._get(data_id, group, tenant)
                     last_md5 = _get_md5(last_config)
                     # Cache with TTL (default 5 minutes)
@@ -444,8 +593,9 @@ class ConfigAsyncOperationMixin:
         tenant: Optional[str] = "",
         *,
         serializer: Optional[Union["Serializer", bool]] = None,
-        cache: Optional[BaseCache] = None,
+        cache: Optional[Union[BaseCache, AsyncBaseCache]] = None,
         default: Optional[str] = None,
+        negative_ttl: Optional[float] = NEGATIVE_CACHE_TTL,
     ) -> SyncAsync[Any]:
         """Get configuration content asynchronously.
 
@@ -456,7 +606,13 @@ class ConfigAsyncOperationMixin:
             serializer: Serializer to parse the content. True for auto-detection,
                 or provide a Serializer instance.
             cache: Cache instance for fallback. Defaults to global memory_cache.
+                Async caches are awaited directly; sync caches that block on
+                I/O run in a worker thread.
             default: Default value if configuration not found (404).
+            negative_ttl: Seconds to remember a 404, during which calls with
+                a default return it without asking the server. The entry is
+                dropped early once a subscription sees the config change or
+                it is published. None or 0 disables this. Defaults to 10.
 
         Returns:
             Configuration content (raw string or serialized based on serializer).
@@ -470,12 +626,14 @@ class ConfigAsyncOperationMixin:
             >>> # Get as dict (auto-detect format)
             >>> config = await client.config.get("app.yaml", "DEFAULT_GROUP", serializer=True)
         """
-        cache = cache or memory_cache
+        cache = as_async_cache(cache or memory_cache)
         config_key = _get_config_key(data_id, group, tenant)
+        if default is not None and self._not_found.exists(config_key):
+            return default
         try:
             config = await self._get(data_id, group, tenant)
             # Cache with TTL (default 5 minutes)
-            cache.set(config_key, config, ttl=DEFAULT_CACHE_TTL)
+            await cache.set(config_key, config, ttl=DEFAULT_CACHE_TTL)
             return _serialize_config(config, serializer)
         except (httpx.ConnectError, httpx.TimeoutException) as exc:
             logger.error(
@@ -486,7 +644,7 @@ class ConfigAsyncOperationMixin:
                 tenant,
                 exc,
             )
-            return _serialize_config(cache.get(config_key), serializer)
+            return _serialize_config(await cache.get(config_key), serializer)
         except HTTPResponseError as exc:
             logger.debug(
                 "Failed to get config from server. " "data_id=%s, group=%s, status=%d",
@@ -494,10 +652,102 @@ class ConfigAsyncOperationMixin:
                 group,
                 exc.status,
             )
-            if exc.status == 404 and default is not None:
-                return default
+            if exc.status == 404:
+                self._remember_not_found(config_key, negative_ttl)
+                if default is not None:
+                    return default
             raise
 
+    async def get_many(
+        self,
+        data_ids: Iterable[str],
+        group: str,
+        tenant: Optional[str] = "",
+        *,
+        serializer: Optional[Union["Serializer", bool]] = None,
+        cache: Optional[Union[BaseCache, AsyncBaseCache]] = None,
+        default: Optional[str] = None,
+        negative_ttl: Optional[float] = NEGATIVE_CACHE_TTL,
+    ) -> Dict[str, Any]:
+        """Get several configurations of one group concurrently.
+
+        Fetched configurations are written to the cache in one batch, and
+        configurations the server could not be reached for are read from
+        the cache in one batch.
+
+        Args:
+            data_ids: Configuration data IDs.
+            group: Configuration group.
+            tenant: Namespace/tenant ID.
+            serializer: Serializer to parse the content. True for auto-detection,
+                or provide a Serializer instance.
+            cache: Cache instance for fallback. Defaults to global memory_cache.
+            default: Default value for configurations not found (404).
+            negative_ttl: Seconds to remember a 404, as for ``get``.
+
+        Returns:
+            A dict mapping each data ID to its configuration content.
+
+        Raises:
+            HTTPResponseError: If a configuration is not found and no default
+                is provided.
+
+        Example:
+            >>> configs = await client.config.get_many(
+            ...     ["app.yaml", "db.yaml"], "DEFAULT_GROUP", serializer=True
+            ... )
+        """
+        cache = as_async_cache(cache or memory_cache)
+        data_ids = list(data_ids)
+        configs = self._known_not_found(data_ids, group, tenant, default)
+        to_fetch = [data_id for data_id in data_ids if data_id not in configs]
+        results = await asyncio.gather(
+            *(self._get(data_id, group, tenant) for data_id in to_fetch),
+            return_exceptions=True,
+        )
+        fetched: Dict[str, Any] = {}
+        unreachable = []
+        error: Optional[BaseException] = None
+        for data_id, result in zip(to_fetch, results):
+            if isinstance(result, (httpx.ConnectError, httpx.TimeoutException)):
+                logger.error(
+                    "Failed to get config from server, trying cache. "
+                    "data_id=%s, group=%s, tenant=%s, error=%s",
+                    data_id,
+                    group,
+                    tenant,
+                    result,
+                )
+                unreachable.append(data_id)
+            elif isinstance(result, HTTPResponseError):
+                if result.status == 404:
+                    self._remember_not_found(
+                        _get_config_key(data_id, group, tenant), negative_ttl
+                    )
+                if result.status == 404 and default is not None:
+                    configs[data_id] = default
+                else:
+                    error = error or result
+            elif isinstance(result, BaseException):
+                error = error or result
+            else:
+                fetched[_get_config_key(data_id, group, tenant)] = result
+                configs[data_id] = _serialize_config(result, serializer)
+        if fetched:
+            # Cache with TTL (default 5 minutes)
+            await cache.set_many(fetched, ttl=DEFAULT_CACHE_TTL)
+        if error is not None:
+            raise error
+        if unreachable:
+            cached = await cache.get_many(
+                [_get_config_key(data_id, group, tenant) for data_id in unreachable]
+            )
+            for data_id in unreachable:
+                configs[data_id] = _serialize_config(
+                    cached.get(_get_config_key(data_id, group, tenant)), serializer
+                )
+        return {data_id: configs[data_id] for data_id in data_ids}
+
     async def subscribe(
         self,
         data_id: str,
@@ -505,7 +755,7 @@ class ConfigAsyncOperationMixin:
         tenant: Optional[str] = "",
         timeout: Optional[int] = 30_000,
         serializer: Optional[Union["Serializer", bool]] = None,
-        cache: Optional[BaseCache] = None,
+        cache: Optional[Union[BaseCache, AsyncBaseCache]] = None,
         callback: Optional[Callable] = None,
     ) -> SyncAsync[Any]:
         """Subscribe to configuration changes asynchronously.
@@ -535,9 +785,9 @@ class ConfigAsyncOperationMixin:
             >>> # Later, to stop:
             >>> stop_event.cancel()
         """
-        cache = cache or MemoryCache()
+        cache = as_async_cache(cache or MemoryCache())
         config_key = _get_config_key(data_id, group, tenant)
-        last_md5 = _get_md5(cache.get(config_key) or "")
+        last_md5 = _get_md5(await cache.get(config_key) or "")
         stop_event = asyncio.Event()
 
         async def _async_subscriber() -> None:
@@ -556,10 +806,11 @@ class ConfigAsyncOperationMixin:
                         group,
                         tenant,
                     )
+                    self._not_found.delete(config_key)
                     last_config = await self._get(data_id, group, tenant)
                     last_md5 = _get_md5(last_config)
                     # Cache with TTL (default 5 minutes)
-                    cache.set(config_key, last_config, ttl=DEFAULT_CACHE_TTL)
+                    await cache.set(config_key, last_config, ttl=DEFAULT_CACHE_TTL)
                     await self._config_callback(callback, last_config, serializer)
                 except asyncio.CancelledError:
                     break
@@ -600,4 +851,4 @@ class ConfigAsyncEndpoint(_BaseConfigEndpoint, ConfigAsyncOperationMixin):
     subscribing to configurations in Nacos.
     """
 
-    pass
\ No newline at end of file
+    pass
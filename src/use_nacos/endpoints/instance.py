@@ -9,13 +9,43 @@ import json
 import logging
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import asynccontextmanager, contextmanager
 from functools import partial
-from typing import TYPE_CHECKING, Any, List, Literal, Optional, TypedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import httpx
 
 from .._chooser import Chooser
+from .._heartbeat import (
+    AsyncHeartbeatHandle,
+    AsyncHeartbeatScheduler,
+    Beat,
+    HeartbeatHandle,
+    HeartbeatScheduler,
+)
+from .._push_receiver import AsyncPushReceiver, PushReceiver, local_ip, server_ips
+from .._resource_pool import ResourcePool, aclose_later
+from .._service_info import AsyncServiceInfoCache, ServiceInfo, ServiceInfoCache
+from ..affinity import Affinity
+from ..balancer import BalanceStrategy, address_of, get_strategy
 from ..exception import EmptyHealthyInstanceError
+from ..outlier import OutlierDetector
+from ..resilience import ResiliencePolicy
 from ..typings import BeatType, SyncAsync
 from .endpoint import Endpoint
 
@@ -47,11 +77,11 @@ class InstanceType(TypedDict):
     metadata: Optional[dict]
 
 
-def _choose_one_healthy(instances: List[InstanceType]) -> InstanceType:
+def _choose_one_healthy(chooser: Chooser) -> InstanceType:
     """Choose one healthy instance using weighted random selection.
 
     Args:
-        instances: List of instance dictionaries.
+        chooser: Refreshed chooser over the healthy instances.
 
     Returns:
         Selected instance dictionary.
@@ -59,20 +89,56 @@ def _choose_one_healthy(instances: List[InstanceType]) -> InstanceType:
     Raises:
         EmptyHealthyInstanceError: If no healthy instances are available.
     """
-    hosts = [(host, host.get("weight")) for host in instances]
-    if not hosts:
+    if not chooser.items:
         raise EmptyHealthyInstanceError("No healthy instance found")
-    chooser = Chooser(hosts)
-    chooser.refresh()
     return chooser.random_with_weight()
 
 
+def _choose_other(
+    strategy: BalanceStrategy, info: ServiceInfo, tried: List[InstanceType]
+) -> Optional[InstanceType]:
+    """Pick an instance not tried yet, the strategy's pick if it offers one.
+
+    Returns:
+        The instance, or None if every healthy instance was tried.
+    """
+    seen = {address_of(instance) for instance in tried}
+    if info.chooser.items:
+        for _ in range(3):
+            instance = strategy.choose(info)
+            if address_of(instance) not in seen:
+                return instance
+    for instance in info.chooser.items:
+        if address_of(instance) not in seen:
+            return instance
+    return None
+
+
+def _run_now(fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+    """Run ``fn`` in this thread and return its outcome as a done future."""
+    future: "Future[Any]" = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _close_when_done(future: "Future[Any]") -> None:
+    """Drop a request that lost the race, closing its response if it comes."""
+    if future.cancel():
+        return
+
+    def _close(done: "Future[Any]") -> None:
+        if not done.cancelled() and done.exception() is None:
+            done.result().close()
+
+    future.add_done_callback(_close)
+
+
 class InstanceOperationMixin:
     """Mixin for synchronous instance operations."""
 
-    # Simple client cache for instance requests
-    _client_cache: dict = {}
-
     def __getattr__(self, attr: str) -> SyncAsync[Any]:
         """Allow dynamic attribute access for service-based requests.
 
@@ -80,19 +146,38 @@ class InstanceOperationMixin:
         """
         return partial(self.request, service_name=attr)
 
-    def _get_client(self, instance: InstanceType) -> httpx.Client:
-        """Get or create a cached httpx client for the instance.
-
-        Args:
-            instance: Instance dictionary with ip and port.
-
-        Returns:
-            An httpx.Client for making requests to this instance.
-        """
-        cache_key = (instance["ip"], instance["port"])
-        if cache_key not in self._client_cache:
-            self._client_cache[cache_key] = httpx.Client()
-        return self._client_cache[cache_key]
+    def _shared_client(self) -> httpx.Client:
+        """Return the client shared by requests to every instance."""
+        http = self._http
+        if http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(**self._http_settings)
+                http = self._http
+        return http
+
+    def _close_http(self, http: httpx.Client) -> None:
+        http.close()
+
+    @contextmanager
+    def _host_slot(self, instance: InstanceType) -> Iterator[None]:
+        """Hold one of the connections allowed to the instance's host."""
+        if not self._max_connections_per_host:
+            yield
+            return
+        lease = self.host_pool.acquire(address_of(instance))
+        try:
+            if not lease.resource.acquire(timeout=self._pool_timeout):
+                raise httpx.PoolTimeout(
+                    f"No connection to {instance['ip']}:{instance['port']} "
+                    f"freed up within {self._pool_timeout}s"
+                )
+            try:
+                yield
+            finally:
+                lease.resource.release()
+        finally:
+            self.host_pool.release(lease)
 
     def request(
         self,
@@ -108,9 +193,11 @@ class InstanceOperationMixin:
         Args:
             method: HTTP method (GET, POST, etc.).
             path: Request path.
-            instance: Specific instance to use. If None, a healthy instance
-                will be selected from the service.
-            service_name: Service name for instance discovery.
+            instance: Specific instance to use. If None, an instance of the
+                service is picked by the service's balance strategy (see
+                ``set_strategy``).
+            service_name: Service name for instance discovery. The latency
+                and outcome of the request are reported to its strategy.
             *args: Additional positional arguments for httpx.request.
             **kwargs: Additional keyword arguments for httpx.request.
 
@@ -122,11 +209,122 @@ class InstanceOperationMixin:
         """
         if not any([instance, service_name]):
             raise ValueError("Either `instance` or `service_name` should be provided")
+        strategy = self._strategy_for(service_name) if service_name else None
         if not instance:
-            instance = self.get_one_healthy(service_name)  # type: ignore[assignment]
+            info = self._available(self._service_infos.get(service_name))
+            policy = self._resilience_for(service_name)  # type: ignore[arg-type]
+            if policy is not None and policy.applies_to(method):
+                return self._request_resilient(
+                    policy, info, strategy, method, path, args, kwargs
+                )
+            instance = strategy.choose(info)  # type: ignore[union-attr]
+        return self._send(strategy, instance, method, path, *args, **kwargs)
+
+    def _send(
+        self,
+        strategy: Optional[BalanceStrategy],
+        instance: InstanceType,
+        method: str,
+        path: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send one request to ``instance``, reporting it to the strategy."""
         url = f"http://{instance['ip']}:{instance['port']}{path}"  # noqa
-        client = self._get_client(instance)
-        return client.request(method=method, url=url, *args, **kwargs)
+        http = self._shared_client()
+        if strategy is not None:
+            strategy.on_start(instance)
+        started = time.perf_counter()
+        failed = True
+        try:
+            with self._host_slot(instance):
+                response = http.request(method=method, url=url, *args, **kwargs)
+            failed = getattr(response, "status_code", 200) >= 500
+            return response
+        finally:
+            if strategy is not None:
+                elapsed = time.perf_counter() - started
+                strategy.on_finish(instance, elapsed, failed=failed)
+            if self.outlier_detector is not None:
+                self.outlier_detector.record(instance, failed)
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        """Return the threads hedged calls are sent from."""
+        with self._http_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=self._http_settings["limits"].max_connections or 100,
+                    thread_name_prefix="nacos-hedge",
+                )
+            return self._hedge_pool
+
+    def _request_resilient(
+        self,
+        policy: ResiliencePolicy,
+        info: ServiceInfo,
+        strategy: BalanceStrategy,
+        method: str,
+        path: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+    ) -> httpx.Response:
+        """Send a call, retrying and hedging it on other instances.
+
+        Hedged calls are sent from worker threads. A blocking request cannot
+        be interrupted, so the losing request runs to completion in its
+        thread and its response is closed.
+        """
+        service_name = info.key[0]
+        policy.begin()
+
+        def attempt(instance: InstanceType) -> httpx.Response:
+            started = time.perf_counter()
+            response = self._send(strategy, instance, method, path, *args, **kwargs)
+            policy.record_latency(service_name, time.perf_counter() - started)
+            return response
+
+        delay = policy.delay_for(service_name)
+        submit = self._hedge_executor().submit if delay is not None else _run_now
+        tried = [strategy.choose(info)]
+        pending = {submit(attempt, tried[0])}
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, timeout=delay, return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    delay = None
+                    other = _choose_other(strategy, info, tried)
+                    if (
+                        other is not None
+                        and len(tried) < policy.max_attempts
+                        and policy.spend("hedges")
+                    ):
+                        tried.append(other)
+                        hedge = submit(attempt, other)
+                        pending.add(hedge)
+                    continue
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        if future is hedge:
+                            policy.count("hedge_wins")
+                        return future.result()
+                if (
+                    not pending
+                    and policy.retryable(error)  # type: ignore[arg-type]
+                    and len(tried) < policy.max_attempts
+                ):
+                    other = _choose_other(strategy, info, tried)
+                    if other is not None and policy.spend("retries"):
+                        tried.append(other)
+                        pending.add(submit(attempt, other))
+            raise error  # type: ignore[misc]
+        finally:
+            for future in pending:
+                _close_when_done(future)
 
     def heartbeat(
         self,
@@ -141,10 +339,14 @@ class InstanceOperationMixin:
         skip_exception: Optional[bool] = True,
         **kwargs: Any,
     ) -> SyncAsync[Any]:
-        """Start a background heartbeat thread for an ephemeral instance.
+        """Keep an ephemeral instance registered with periodic heartbeats.
 
-        This method starts a daemon thread that sends periodic heartbeats
-        to keep the ephemeral instance registered.
+        The beats of all instances of the endpoint are sent by a single
+        background thread, the first one at once. The thread keeps the
+        process alive while any heartbeat is running. The interval follows the
+        ``clientBeatInterval`` of the server's replies, later beats are
+        light when the server allows it, and an instance the server lost is
+        registered again.
 
         Args:
             service_name: Service name for the instance.
@@ -154,12 +356,16 @@ class InstanceOperationMixin:
             namespace_id: Namespace ID. Defaults to empty string.
             group_name: Group name for the service.
             ephemeral: Whether the instance is ephemeral. Defaults to True.
-            interval: Heartbeat interval in milliseconds. Defaults to 1000.
-            skip_exception: Whether to skip exceptions and continue. Defaults to True.
-            **kwargs: Additional parameters for the beat request.
+            interval: Heartbeat interval in milliseconds until the server
+                announces its own. Defaults to 1000.
+            skip_exception: Whether to keep beating after a failed beat.
+                Defaults to True.
+            **kwargs: Additional parameters for the beat request, such as
+                ``cluster`` and ``metadata``.
 
         Returns:
-            A threading.Event object with a cancel() method to stop heartbeats.
+            A ``HeartbeatHandle``, a threading.Event with a cancel() method
+            to stop heartbeats, set once they stopped.
 
         Example:
             >>> stop_event = client.instance.heartbeat(
@@ -168,37 +374,22 @@ class InstanceOperationMixin:
             >>> # Later, to stop:
             >>> stop_event.cancel()
         """
-        stop_event = threading.Event()
-        stop_event.cancel = stop_event.set  # type: ignore[attr-defined]
-
-        def _heartbeat() -> None:
-            while not stop_event.is_set():
-                time.sleep(interval / 1_000)
-                try:
-                    self.beat(
-                        service_name=service_name,
-                        ip=ip,
-                        port=port,
-                        weight=weight,
-                        namespace_id=namespace_id,
-                        group_name=group_name,
-                        ephemeral=ephemeral,
-                        **kwargs,
-                    )
-                except Exception as exc:
-                    logger.error(
-                        "Heartbeat error. " "service_name=%s, ip=%s, port=%d, error=%s",
-                        service_name,
-                        ip,
-                        port,
-                        exc,
-                    )
-                    if skip_exception:
-                        continue
-                    raise exc
-
-        thread = threading.Thread(target=_heartbeat)
-        thread.start()
+        stop_event = HeartbeatHandle(self.heartbeats)
+        self.heartbeats.add(
+            self._make_beat(
+                service_name,
+                ip,
+                port,
+                weight,
+                namespace_id,
+                group_name,
+                ephemeral,
+                interval,
+                stop_event,
+                skip_exception,
+                kwargs,
+            )
+        )
         return stop_event
 
     def get_one_healthy(
@@ -210,6 +401,9 @@ class InstanceOperationMixin:
     ) -> InstanceType:
         """Get a single healthy instance using weighted random selection.
 
+        The instance list is served from a local cache kept fresh in the
+        background for the ``cacheMillis`` announced by the server.
+
         Args:
             service_name: Service name to query.
             namespace_id: Namespace ID.
@@ -226,42 +420,162 @@ class InstanceOperationMixin:
             >>> instance = client.instance.get_one_healthy("my-service")
             >>> print(instance["ip"], instance["port"])
         """
-        instances = self.list(
-            service_name=service_name,
-            namespace_id=namespace_id,
-            group_name=group_name,
-            clusters=clusters,
-            healthy_only=True,
+        info = self._available(
+            self._service_infos.get(service_name, namespace_id, group_name, clusters)
         )
-        return _choose_one_healthy(instances["hosts"])
+        return _choose_one_healthy(info.chooser)
 
+    def choose_many(
+        self,
+        service_name: str,
+        k: int,
+        namespace_id: Optional[str] = None,
+        group_name: Optional[str] = None,
+        clusters: Optional[str] = None,
+    ) -> List[InstanceType]:
+        """Pick ``k`` healthy instances at once using weighted random selection.
 
-class InstanceAsyncOperationMixin:
-    """Mixin for asynchronous instance operations."""
+        Each pick is independent and follows the same distribution as
+        ``get_one_healthy``, without its per-call overhead, which suits
+        spreading large batches of tasks over a service.
+
+        Args:
+            service_name: Service name to query.
+            k: Number of picks.
+            namespace_id: Namespace ID.
+            group_name: Group name for the service.
+            clusters: Comma-separated list of cluster names.
 
-    # Simple client cache for instance requests
-    _client_cache: dict = {}
+        Returns:
+            The picked instances, one per task.
 
-    def __getattr__(self, attr: str) -> SyncAsync[Any]:
-        """Allow dynamic attribute access for service-based requests.
+        Raises:
+            ValueError: If ``k`` is negative.
+            EmptyHealthyInstanceError: If no healthy instances are available.
 
-        This enables syntax like: await client.instance.myservice.get("/api")
+        Example:
+            >>> tasks = load_tasks()
+            >>> instances = client.instance.choose_many("my-service", len(tasks))
+            >>> for task, instance in zip(tasks, instances):
+            ...     dispatch(task, instance)
         """
-        return partial(self.request, service_name=attr)
+        info = self._available(
+            self._service_infos.get(service_name, namespace_id, group_name, clusters)
+        )
+        chooser = info.chooser
+        if not chooser.items:
+            raise EmptyHealthyInstanceError("No healthy instance found")
+        return chooser.choose_many(k)
 
-    async def _get_client(self, instance: InstanceType) -> httpx.AsyncClient:
-        """Get or create a cached async httpx client for the instance.
+    def enable_push(
+        self,
+        port: int = 0,
+        client_ip: Optional[str] = None,
+        host: Optional[str] = None,
+        accept_from: Optional[Iterable[str]] = None,
+    ) -> PushReceiver:
+        """Receive instance changes pushed by the server over UDP.
+
+        Once enabled, ``list`` subscribes to pushes by announcing
+        ``udpPort`` and ``clientIP``, and pushed lists replace the cached
+        ones used by ``get_one_healthy`` as soon as they arrive. Cached
+        services are re-listed at once to subscribe them.
 
         Args:
-            instance: Instance dictionary with ip and port.
+            port: UDP port to receive on. Defaults to a free port.
+            client_ip: Address the server pushes to. Defaults to the local
+                address used to reach the server.
+            host: Address to bind. Defaults to the local address used to
+                reach the server; pass "0.0.0.0" to bind every interface.
+            accept_from: Source addresses to accept pushes from. Defaults
+                to the resolved addresses of the server; behind a load
+                balancer, pass the addresses of the Nacos nodes.
 
         Returns:
-            An httpx.AsyncClient for making requests to this instance.
+            The running receiver.
+
+        Example:
+            >>> client.instance.enable_push()
+            >>> client.instance.get_one_healthy("my-service")
         """
-        cache_key = (instance["ip"], instance["port"])
-        if cache_key not in self._client_cache:
-            self._client_cache[cache_key] = httpx.AsyncClient()
-        return self._client_cache[cache_key]
+        self.disable_push()
+        server_addr = self.client.server_addr
+        reach_ip = local_ip(server_addr)
+        self._push_receiver = PushReceiver(
+            self._service_infos.apply_push,
+            client_ip or reach_ip,
+            host or reach_ip,
+            port,
+            server_ips(server_addr) if accept_from is None else accept_from,
+        )
+        self._service_infos.refresh_soon()
+        return self._push_receiver
+
+    def disable_push(self) -> None:
+        """Stop receiving pushes and go back to polling only."""
+        if self._push_receiver is not None:
+            self._push_receiver.close()
+            self._push_receiver = None
+
+    def close(self) -> None:
+        """Stop heartbeats, refresh and pushes and close the HTTP client."""
+        self.heartbeats.close()
+        self.disable_push()
+        self._service_infos.close()
+        self.host_pool.close()
+        with self._http_lock:
+            http, self._http = self._http, None
+            hedge_pool, self._hedge_pool = self._hedge_pool, None
+        if hedge_pool is not None:
+            hedge_pool.shutdown(wait=False)
+        if http is not None:
+            http.close()
+
+
+class InstanceAsyncOperationMixin:
+    """Mixin for asynchronous instance operations."""
+
+    def __getattr__(self, attr: str) -> SyncAsync[Any]:
+        """Allow dynamic attribute access for service-based requests.
+
+        This enables syntax like: await client.instance.myservice.get("/api")
+        """
+        return partial(self.request, service_name=attr)
+
+    def _shared_client(self) -> httpx.AsyncClient:
+        """Return the client shared by requests to every instance."""
+        http = self._http
+        if http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.AsyncClient(**self._http_settings)
+                http = self._http
+        return http
+
+    def _close_http(self, http: httpx.AsyncClient) -> None:
+        aclose_later(http)
+
+    @asynccontextmanager
+    async def _host_slot(self, instance: InstanceType) -> AsyncIterator[None]:
+        """Hold one of the connections allowed to the instance's host."""
+        if not self._max_connections_per_host:
+            yield
+            return
+        lease = self.host_pool.acquire(address_of(instance))
+        try:
+            try:
+                await asyncio.wait_for(lease.resource.acquire(), self._pool_timeout)
+            except asyncio.TimeoutError:
+                raise httpx.PoolTimeout(
+                    f"No connection to {instance['ip']}:{instance['port']} "
+                    f"freed up within {self._pool_timeout}s"
+                ) from None
+            try:
+                yield
+            finally:
+                lease.resource.release()
+        finally:
+            self.host_pool.release(lease)
 
     async def request(
         self,
@@ -277,9 +591,11 @@ class InstanceAsyncOperationMixin:
         Args:
             method: HTTP method (GET, POST, etc.).
             path: Request path.
-            instance: Specific instance to use. If None, a healthy instance
-                will be selected from the service.
-            service_name: Service name for instance discovery.
+            instance: Specific instance to use. If None, an instance of the
+                service is picked by the service's balance strategy (see
+                ``set_strategy``).
+            service_name: Service name for instance discovery. The latency
+                and outcome of the request are reported to its strategy.
             *args: Additional positional arguments for httpx.request.
             **kwargs: Additional keyword arguments for httpx.request.
 
@@ -291,11 +607,113 @@ class InstanceAsyncOperationMixin:
         """
         if not any([instance, service_name]):
             raise ValueError("Either `instance` or `service_name` should be provided")
+        strategy = self._strategy_for(service_name) if service_name else None
         if not instance:
-            instance = await self.get_one_healthy(service_name)  # type: ignore[assignment,misc]
+            info = self._available(await self._service_infos.get(service_name))
+            policy = self._resilience_for(service_name)  # type: ignore[arg-type]
+            if policy is not None and policy.applies_to(method):
+                return await self._request_resilient(
+                    policy, info, strategy, method, path, args, kwargs
+                )
+            instance = strategy.choose(info)  # type: ignore[union-attr]
+        return await self._send(strategy, instance, method, path, *args, **kwargs)
+
+    async def _send(
+        self,
+        strategy: Optional[BalanceStrategy],
+        instance: InstanceType,
+        method: str,
+        path: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send one request to ``instance``, reporting it to the strategy."""
         url = f"http://{instance['ip']}:{instance['port']}{path}"  # noqa
-        client = await self._get_client(instance)
-        return await client.request(method=method, url=url, *args, **kwargs)
+        http = self._shared_client()
+        if strategy is not None:
+            strategy.on_start(instance)
+        started = time.perf_counter()
+        failed = True
+        cancelled = False
+        try:
+            async with self._host_slot(instance):
+                response = await http.request(method=method, url=url, *args, **kwargs)
+            failed = getattr(response, "status_code", 200) >= 500
+            return response
+        except asyncio.CancelledError:
+            # Lost a hedge race; the instance did nothing wrong
+            failed, cancelled = False, True
+            raise
+        finally:
+            if strategy is not None:
+                elapsed = time.perf_counter() - started
+                strategy.on_finish(instance, elapsed, failed=failed)
+            if self.outlier_detector is not None and not cancelled:
+                self.outlier_detector.record(instance, failed)
+
+    async def _request_resilient(
+        self,
+        policy: ResiliencePolicy,
+        info: ServiceInfo,
+        strategy: BalanceStrategy,
+        method: str,
+        path: str,
+        args: Any,
+        kwargs: Dict[str, Any],
+    ) -> httpx.Response:
+        """Send a call, retrying and hedging it on other instances."""
+        service_name = info.key[0]
+        policy.begin()
+
+        async def attempt(instance: InstanceType) -> httpx.Response:
+            started = time.perf_counter()
+            response = await self._send(
+                strategy, instance, method, path, *args, **kwargs
+            )
+            policy.record_latency(service_name, time.perf_counter() - started)
+            return response
+
+        delay = policy.delay_for(service_name)
+        tried = [strategy.choose(info)]
+        pending = {asyncio.ensure_future(attempt(tried[0]))}
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    delay = None
+                    other = _choose_other(strategy, info, tried)
+                    if (
+                        other is not None
+                        and len(tried) < policy.max_attempts
+                        and policy.spend("hedges")
+                    ):
+                        tried.append(other)
+                        hedge = asyncio.ensure_future(attempt(other))
+                        pending.add(hedge)
+                    continue
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            policy.count("hedge_wins")
+                        return task.result()
+                if (
+                    not pending
+                    and policy.retryable(error)  # type: ignore[arg-type]
+                    and len(tried) < policy.max_attempts
+                ):
+                    other = _choose_other(strategy, info, tried)
+                    if other is not None and policy.spend("retries"):
+                        tried.append(other)
+                        pending.add(asyncio.ensure_future(attempt(other)))
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def heartbeat(
         self,
@@ -310,10 +728,13 @@ class InstanceAsyncOperationMixin:
         skip_exception: Optional[bool] = True,
         **kwargs: Any,
     ) -> SyncAsync[Any]:
-        """Start a background heartbeat task for an ephemeral instance.
+        """Keep an ephemeral instance registered with periodic heartbeats.
 
-        This method creates an async task that sends periodic heartbeats
-        to keep the ephemeral instance registered.
+        The beats of all instances of the endpoint are sent by a single
+        background task, the first one at once, several at a time. The
+        interval follows the ``clientBeatInterval`` of the server's replies,
+        later beats are light when the server allows it, and an instance
+        the server lost is registered again.
 
         Args:
             service_name: Service name for the instance.
@@ -323,12 +744,16 @@ class InstanceAsyncOperationMixin:
             namespace_id: Namespace ID. Defaults to empty string.
             group_name: Group name for the service.
             ephemeral: Whether the instance is ephemeral. Defaults to True.
-            interval: Heartbeat interval in milliseconds. Defaults to 1000.
-            skip_exception: Whether to skip exceptions and continue. Defaults to True.
-            **kwargs: Additional parameters for the beat request.
+            interval: Heartbeat interval in milliseconds until the server
+                announces its own. Defaults to 1000.
+            skip_exception: Whether to keep beating after a failed beat.
+                Defaults to True.
+            **kwargs: Additional parameters for the beat request, such as
+                ``cluster`` and ``metadata``.
 
         Returns:
-            An asyncio.Task object that can be cancelled.
+            An ``AsyncHeartbeatHandle``, a future with a cancel() method to
+            stop heartbeats, done once they stopped.
 
         Example:
             >>> task = await client.instance.heartbeat(
@@ -337,38 +762,23 @@ class InstanceAsyncOperationMixin:
             >>> # Later, to stop:
             >>> task.cancel()
         """
-        stop_event = threading.Event()
-        stop_event.cancel = stop_event.set  # type: ignore[attr-defined]
-
-        async def _async_heartbeat() -> None:
-            while True:
-                await asyncio.sleep(interval / 1_000)
-                try:
-                    await self.beat(
-                        service_name=service_name,
-                        ip=ip,
-                        port=port,
-                        weight=weight,
-                        namespace_id=namespace_id,
-                        group_name=group_name,
-                        ephemeral=ephemeral,
-                        **kwargs,
-                    )
-                except asyncio.CancelledError:
-                    break
-                except Exception as exc:
-                    logger.error(
-                        "Heartbeat error. " "service_name=%s, ip=%s, port=%d, error=%s",
-                        service_name,
-                        ip,
-                        port,
-                        exc,
-                    )
-                    if skip_exception:
-                        continue
-                    raise exc
-
-        return asyncio.create_task(_async_heartbeat())
+        stop_event = AsyncHeartbeatHandle(loop=asyncio.get_running_loop())
+        self.heartbeats.add(
+            self._make_beat(
+                service_name,
+                ip,
+                port,
+                weight,
+                namespace_id,
+                group_name,
+                ephemeral,
+                interval,
+                stop_event,
+                skip_exception,
+                kwargs,
+            )
+        )
+        return stop_event
 
     async def get_one_healthy(
         self,
@@ -379,6 +789,9 @@ class InstanceAsyncOperationMixin:
     ) -> InstanceType:
         """Get a single healthy instance using weighted random selection.
 
+        The instance list is served from a local cache kept fresh in the
+        background for the ``cacheMillis`` announced by the server.
+
         Args:
             service_name: Service name to query.
             namespace_id: Namespace ID.
@@ -395,19 +808,327 @@ class InstanceAsyncOperationMixin:
             >>> instance = await client.instance.get_one_healthy("my-service")
             >>> print(instance["ip"], instance["port"])
         """
-        instances = await self.list(
-            service_name=service_name,
-            namespace_id=namespace_id,
-            group_name=group_name,
-            clusters=clusters,
-            healthy_only=True,
+        info = self._available(
+            await self._service_infos.get(
+                service_name, namespace_id, group_name, clusters
+            )
         )
-        return _choose_one_healthy(instances["hosts"])
+        return _choose_one_healthy(info.chooser)
+
+    async def choose_many(
+        self,
+        service_name: str,
+        k: int,
+        namespace_id: Optional[str] = None,
+        group_name: Optional[str] = None,
+        clusters: Optional[str] = None,
+    ) -> List[InstanceType]:
+        """Pick ``k`` healthy instances at once using weighted random selection.
+
+        Each pick is independent and follows the same distribution as
+        ``get_one_healthy``, without its per-call overhead, which suits
+        spreading large batches of tasks over a service.
+
+        Args:
+            service_name: Service name to query.
+            k: Number of picks.
+            namespace_id: Namespace ID.
+            group_name: Group name for the service.
+            clusters: Comma-separated list of cluster names.
+
+        Returns:
+            The picked instances, one per task.
+
+        Raises:
+            ValueError: If ``k`` is negative.
+            EmptyHealthyInstanceError: If no healthy instances are available.
+
+        Example:
+            >>> tasks = load_tasks()
+            >>> instances = await client.instance.choose_many("my-service", len(tasks))
+            >>> for task, instance in zip(tasks, instances):
+            ...     dispatch(task, instance)
+        """
+        info = self._available(
+            await self._service_infos.get(
+                service_name, namespace_id, group_name, clusters
+            )
+        )
+        chooser = info.chooser
+        if not chooser.items:
+            raise EmptyHealthyInstanceError("No healthy instance found")
+        return chooser.choose_many(k)
+
+    async def enable_push(
+        self,
+        port: int = 0,
+        client_ip: Optional[str] = None,
+        host: Optional[str] = None,
+        accept_from: Optional[Iterable[str]] = None,
+    ) -> AsyncPushReceiver:
+        """Receive instance changes pushed by the server over UDP.
+
+        Once enabled, ``list`` subscribes to pushes by announcing
+        ``udpPort`` and ``clientIP``, and pushed lists replace the cached
+        ones used by ``get_one_healthy`` as soon as they arrive. Cached
+        services are re-listed at once to subscribe them.
+
+        Args:
+            port: UDP port to receive on. Defaults to a free port.
+            client_ip: Address the server pushes to. Defaults to the local
+                address used to reach the server.
+            host: Address to bind. Defaults to the local address used to
+                reach the server; pass "0.0.0.0" to bind every interface.
+            accept_from: Source addresses to accept pushes from. Defaults
+                to the resolved addresses of the server; behind a load
+                balancer, pass the addresses of the Nacos nodes.
+
+        Returns:
+            The running receiver.
+
+        Example:
+            >>> await client.instance.enable_push()
+            >>> await client.instance.get_one_healthy("my-service")
+        """
+        self.disable_push()
+        server_addr = self.client.server_addr
+        reach_ip = local_ip(server_addr)
+        self._push_receiver = await AsyncPushReceiver.start(
+            self._service_infos.apply_push,
+            client_ip or reach_ip,
+            host or reach_ip,
+            port,
+            server_ips(server_addr) if accept_from is None else accept_from,
+        )
+        self._service_infos.refresh_soon()
+        return self._push_receiver
+
+    def disable_push(self) -> None:
+        """Stop receiving pushes and go back to polling only."""
+        if self._push_receiver is not None:
+            self._push_receiver.close()
+            self._push_receiver = None
+
+    async def aclose(self) -> None:
+        """Stop heartbeats, refresh and pushes and close the HTTP client."""
+        self.heartbeats.close()
+        self.disable_push()
+        self._service_infos.close()
+        self.host_pool.close()
+        with self._http_lock:
+            http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
 
 
 class _BaseInstanceEndpoint(Endpoint):
     """Base endpoint for instance management operations."""
 
+    def __init__(self, client: "BaseClient") -> None:
+        super().__init__(client)
+        self._strategy: BalanceStrategy = get_strategy("weighted_random")
+        self._service_strategies: Dict[str, BalanceStrategy] = {}
+        self._resilience: Optional[ResiliencePolicy] = None
+        self._service_resilience: Dict[str, Optional[ResiliencePolicy]] = {}
+        self.outlier_detector: Optional[OutlierDetector] = OutlierDetector()
+        self.affinity: Optional[Affinity] = None
+        self._http: Any = None
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._http_lock = threading.Lock()
+        self.configure_http()
+
+    def configure_http(
+        self,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        max_connections_per_host: Optional[int] = 20,
+        http2: bool = False,
+        **client_kwargs: Any,
+    ) -> None:
+        """Configure the HTTP client ``request`` sends instance requests with.
+
+        All instances are called through one shared client, so they share a
+        single connection pool, TLS context and set of settings. The client
+        is recreated with the new settings on the next request.
+
+        The defaults are stricter than a client per instance with httpx's
+        own limits: at most 100 connections over all instances instead of
+        100 per instance, and 20 concurrent requests per instance.
+
+        Args:
+            max_connections: Most open connections over all instances.
+                Defaults to 100.
+            max_keepalive_connections: Most idle connections kept open.
+                Defaults to 20.
+            keepalive_expiry: Seconds an idle connection is kept open.
+                Defaults to 5.
+            max_connections_per_host: Most concurrent requests to one
+                instance, so a slow instance cannot take the whole pool.
+                Requests over the limit wait up to the pool timeout, then
+                raise ``httpx.PoolTimeout``. None disables the limit.
+                Defaults to 20.
+            http2: Multiplex requests over HTTP/2 connections where the
+                instance supports it. Requires ``use-nacos[http2]``.
+                Defaults to False.
+            **client_kwargs: Other ``httpx.Client`` settings, such as
+                ``timeout``, ``verify``, ``cert`` or ``headers``.
+
+        Example:
+            >>> client.instance.configure_http(
+            ...     max_connections_per_host=8, http2=True, timeout=3.0
+            ... )
+        """
+        settings = {
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            "http2": http2,
+            **client_kwargs,
+        }
+        timeout = httpx.Timeout(client_kwargs.get("timeout", httpx.Timeout(5.0)))
+        with self._http_lock:
+            http, self._http = self._http, None
+            self._http_settings = settings
+            self._max_connections_per_host = max_connections_per_host
+            self._pool_timeout = timeout.pool
+        host_pool = self.__dict__.get("host_pool")
+        if host_pool is not None:
+            # New limiters get the new size; in-flight requests keep the old
+            host_pool.close()
+        if http is not None:
+            self._close_http(http)  # type: ignore[attr-defined]
+
+    def set_strategy(
+        self,
+        strategy: Union[str, BalanceStrategy],
+        service_name: Optional[str] = None,
+    ) -> BalanceStrategy:
+        """Set how ``request`` balances requests over a service's instances.
+
+        Args:
+            strategy: A ``BalanceStrategy`` or the name of a built-in one:
+                "weighted_random" (the default), "round_robin",
+                "least_outstanding" or "p2c" (power of two choices by
+                latency).
+            service_name: Service to use the strategy for. Defaults to
+                every service without a strategy of its own.
+
+        Returns:
+            The strategy, whose ``stats()`` report what it observed.
+
+        Raises:
+            ValueError: If the strategy name is unknown.
+
+        Example:
+            >>> client.instance.set_strategy("p2c")
+            >>> client.instance.set_strategy("round_robin", service_name="orders")
+        """
+        strategy = get_strategy(strategy)
+        if service_name is None:
+            self._strategy = strategy
+        else:
+            self._service_strategies[service_name] = strategy
+        return strategy
+
+    def _strategy_for(self, service_name: str) -> BalanceStrategy:
+        return self._service_strategies.get(service_name, self._strategy)
+
+    def set_resilience(
+        self,
+        policy: Optional[ResiliencePolicy],
+        service_name: Optional[str] = None,
+    ) -> Optional[ResiliencePolicy]:
+        """Set how ``request`` retries and hedges calls to a service.
+
+        Off by default. Only calls by ``service_name`` whose method the
+        policy covers (the idempotent ones unless configured otherwise) are
+        retried or hedged.
+
+        Args:
+            policy: The ``ResiliencePolicy``, or None to send every call once.
+            service_name: Service to use the policy for. Defaults to every
+                service without a policy of its own.
+
+        Returns:
+            The policy, whose ``stats()`` count the retries and hedges.
+
+        Example:
+            >>> client.instance.set_resilience(ResiliencePolicy())
+            >>> client.instance.set_resilience(
+            ...     ResiliencePolicy(hedge=True), service_name="orders"
+            ... )
+        """
+        if service_name is None:
+            self._resilience = policy
+        else:
+            self._service_resilience[service_name] = policy
+        return policy
+
+    def _resilience_for(self, service_name: str) -> Optional[ResiliencePolicy]:
+        return self._service_resilience.get(service_name, self._resilience)
+
+    def set_outlier_detector(
+        self, detector: Optional[OutlierDetector]
+    ) -> Optional[OutlierDetector]:
+        """Set how failing instances are ejected from the local picks.
+
+        ``request`` reports the outcome of every request to the detector,
+        and ``request``, ``get_one_healthy`` and ``choose_many`` skip the
+        instances it ejected, without waiting for Nacos to mark them
+        unhealthy. On by default with ``OutlierDetector()``.
+
+        Args:
+            detector: The ``OutlierDetector``, or None to pick from every
+                healthy instance.
+
+        Returns:
+            The detector, whose ``stats()`` list the ejected instances.
+
+        Example:
+            >>> client.instance.set_outlier_detector(
+            ...     OutlierDetector(consecutive_failures=3, base_ejection_time=10)
+            ... )
+        """
+        self.outlier_detector = detector
+        return detector
+
+    def set_affinity(self, affinity: Optional[Affinity]) -> Optional[Affinity]:
+        """Set which instances ``request`` and the pickers prefer.
+
+        ``request``, ``get_one_healthy`` and ``choose_many`` pick from the
+        caller's cluster, zone or host while enough of its instances are
+        healthy, and from every healthy instance otherwise. Off by default.
+
+        Args:
+            affinity: The ``Affinity`` rules, or None to pick from every
+                healthy instance.
+
+        Returns:
+            The rules, whose ``tiers()`` tell the tier each service is
+            picked from.
+
+        Example:
+            >>> client.instance.set_affinity(
+            ...     Affinity(cluster="hz-a", zone="cn-hangzhou-a", ip="10.0.0.7")
+            ... )
+        """
+        self.affinity = affinity
+        return affinity
+
+    def _available(self, info: ServiceInfo) -> ServiceInfo:
+        """Return the instances of ``info`` to pick from.
+
+        The affinity tier is taken first, then the instances ejected as
+        outliers are left out of it.
+        """
+        if self.affinity is not None:
+            info = self.affinity.select(info)
+        detector = self.outlier_detector
+        return info if detector is None else detector.available(info)
+
     def register(
         self,
         service_name: str,
@@ -535,16 +1256,19 @@ class _BaseInstanceEndpoint(Endpoint):
             >>> for host in result["hosts"]:
             ...     print(host["ip"], host["port"])
         """
-        return self.client.request(
-            "/nacos/v1/ns/instance/list",
-            query={
-                "serviceName": service_name,
-                "namespaceId": namespace_id,
-                "groupName": group_name,
-                "clusters": clusters,
-                "healthyOnly": healthy_only,
-            },
-        )
+        query: Dict[str, Any] = {
+            "serviceName": service_name,
+            "namespaceId": namespace_id,
+            "groupName": group_name,
+            "clusters": clusters,
+            "healthyOnly": healthy_only,
+        }
+        receiver = self._push_receiver
+        if receiver is not None:
+            # Subscribe to pushes of this service
+            query["udpPort"] = receiver.port
+            query["clientIP"] = receiver.client_ip
+        return self.client.request("/nacos/v1/ns/instance/list", query=query)
 
     def update(
         self,
@@ -683,6 +1407,27 @@ class _BaseInstanceEndpoint(Endpoint):
         Example:
             >>> client.instance.beat("my-service", "192.168.1.100", 8080)
         """
+        query, _ = self._beat_queries(
+            service_name, ip, port, weight, namespace_id, group_name, ephemeral, kwargs
+        )
+        return self._send_beat(query)
+
+    def _beat_queries(
+        self,
+        service_name: str,
+        ip: str,
+        port: int,
+        weight: Optional[float],
+        namespace_id: Optional[str],
+        group_name: Optional[str],
+        ephemeral: Optional[bool],
+        extra: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the queries of a full and of a light beat.
+
+        A light beat leaves out the ``beat`` JSON; the server finds the
+        instance by ``ip``, ``port`` and ``clusterName`` instead.
+        """
         # see: https://github.com/alibaba/nacos/issues/10448#issuecomment-1538178112
         serverName = f"{group_name}@@{service_name}" if group_name else service_name
         beat_params: BeatType = {
@@ -691,17 +1436,62 @@ class _BaseInstanceEndpoint(Endpoint):
             "port": port,
             "weight": weight,  # type: ignore[typeddict-item]
             "ephemeral": ephemeral,  # type: ignore[typeddict-item]
-            **kwargs,  # type: ignore[typeddict-item]
+            **extra,  # type: ignore[typeddict-item]
         }
+        light_query = {
+            "serviceName": serverName,
+            "namespaceId": namespace_id,
+            "groupName": group_name,
+            "ip": ip,
+            "port": port,
+            "clusterName": extra.get("cluster"),
+        }
+        return {**light_query, "beat": json.dumps(beat_params)}, light_query
+
+    def _send_beat(self, query: Dict[str, Any]) -> SyncAsync[Any]:
         return self.client.request(
-            "/nacos/v1/ns/instance/beat",
-            method="PUT",
-            query={
-                "serviceName": serverName,
-                "beat": json.dumps(beat_params),
-                "namespaceId": namespace_id,
-                "groupName": group_name,
-            },
+            "/nacos/v1/ns/instance/beat", method="PUT", query=query
+        )
+
+    def _make_beat(
+        self,
+        service_name: str,
+        ip: str,
+        port: int,
+        weight: Optional[float],
+        namespace_id: Optional[str],
+        group_name: Optional[str],
+        ephemeral: Optional[bool],
+        interval: Optional[int],
+        stop_event: Any,
+        skip_exception: Optional[bool],
+        extra: Dict[str, Any],
+    ) -> Beat:
+        """Build the heartbeat of an instance for the scheduler."""
+        query, light_query = self._beat_queries(
+            service_name, ip, port, weight, namespace_id, group_name, ephemeral, extra
+        )
+        metadata = extra.get("metadata")
+        if metadata is not None and not isinstance(metadata, str):
+            metadata = json.dumps(metadata)
+        registration = {
+            "service_name": service_name,
+            "ip": ip,
+            "port": port,
+            "namespace_id": namespace_id,
+            "weight": weight,
+            "metadata": metadata,
+            "cluster_name": extra.get("cluster"),
+            "group_name": group_name,
+            "ephemeral": ephemeral,
+        }
+        return Beat(
+            query,
+            light_query,
+            registration,
+            (interval or 1_000) / 1_000,
+            stop_event,
+            bool(skip_exception),
         )
 
     def update_health(
@@ -838,7 +1628,15 @@ class InstanceEndpoint(_BaseInstanceEndpoint, InstanceOperationMixin):
     and managing service instances.
     """
 
-    pass
+    def __init__(self, client: "BaseClient") -> None:
+        super().__init__(client)
+        self._service_infos = ServiceInfoCache(partial(self.list, healthy_only=False))
+        self._push_receiver: Optional[PushReceiver] = None
+        self.host_pool: ResourcePool[threading.BoundedSemaphore] = ResourcePool(
+            lambda: threading.BoundedSemaphore(self._max_connections_per_host)
+        )
+        self._service_infos.on_addresses_removed = self.host_pool.discard
+        self.heartbeats = HeartbeatScheduler(self._send_beat, self.register)
 
 
 class InstanceAsyncEndpoint(_BaseInstanceEndpoint, InstanceAsyncOperationMixin):
@@ -848,4 +1646,14 @@ class InstanceAsyncEndpoint(_BaseInstanceEndpoint, InstanceAsyncOperationMixin):
     and managing service instances.
     """
 
-    pass
\ No newline at end of file
+    def __init__(self, client: "BaseClient") -> None:
+        super().__init__(client)
+        self._service_infos = AsyncServiceInfoCache(
+            partial(self.list, healthy_only=False)
+        )
+        self._push_receiver: Optional[AsyncPushReceiver] = None
+        self.host_pool: ResourcePool[asyncio.Semaphore] = ResourcePool(
+            lambda: asyncio.Semaphore(self._max_connections_per_host)
+        )
+        self._service_infos.on_addresses_removed = self.host_pool.discard
+        self.heartbeats = AsyncHeartbeatScheduler(self._send_beat, self.register)
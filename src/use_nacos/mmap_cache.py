@@ -0,0 +1,496 @@
+"""Cross-process shared cache backed by a memory-mapped file.
+
+Pre-fork servers run one ``memory_cache`` per worker, so every worker keeps
+its own copy of each config. ``MmapCache`` lets all workers share one copy:
+the cache lives in a file mapped into every process, readers access it
+without locks or system calls, and writers are serialized by an advisory
+file lock.
+
+Layout of the mapped file::
+
+    header | slot table (open addressing) | value arena
+
+Each slot describes one key and points at its ``key + value`` bytes in the
+arena. Slots carry a sequence number that writers make odd while updating
+them, and readers retry when it is odd or changed (a seqlock). Compacting
+the arena moves data, so it is guarded by a second sequence number in the
+header.
+
+Writers only make a sequence number odd while holding the file lock, so a
+number still odd once the lock is taken was left by a writer that died
+mid-update; the reader that gives up on it takes the lock and repairs the
+slot, or clears the table if the writer died while compacting.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ._filelock import FileLock
+from .cache import BaseCache
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"UNMMAP01"
+_VERSION = 1
+
+# magic, version, slot count, arena size, arena sequence, arena bytes used
+_HEADER = struct.Struct("<8sIIQQQ")
+_HEADER_SIZE = 64
+_ARENA_SEQ_OFFSET = 24
+_ARENA_USED_OFFSET = 32
+_TOMBSTONES_OFFSET = 40
+
+# sequence, key hash, state, key length, arena offset, value length, expires
+_SLOT = struct.Struct("<QQB3xIQId4x")
+_U64 = struct.Struct("<Q")
+
+_EMPTY, _LIVE, _DELETED = 0, 1, 2
+
+#: Sentinel returned by a probe that raced with a writer
+_RETRY = object()
+
+
+def _hash_key(key: bytes) -> int:
+    """Hash a key identically in every process (unlike the builtin hash)."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class MmapCache(BaseCache):
+    """Cache shared between processes through a memory-mapped file.
+
+    Reads are lock-free and syscall-free: they decode values straight from
+    the mapping and use per-slot sequence numbers to detect concurrent
+    writes. Writes from any process are serialized by an advisory lock on
+    ``<file_path>.lock``. Capacity is fixed when the file is created; when a
+    write does not fit even after compaction it is dropped with a warning,
+    as a cache may always refuse to store a value.
+
+    Expiry times are wall-clock timestamps, since they are compared by
+    every process sharing the file.
+
+    Example:
+        >>> cache = MmapCache("/dev/shm/nacos_configs.mmap")
+        >>> client.config.get("app.yaml", "DEFAULT_GROUP", cache=cache)
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        capacity: int = 4096,
+        arena_size: int = 16 * 1024 * 1024,
+        max_retries: int = 1000,
+        max_tombstone_ratio: float = 0.25,
+    ) -> None:
+        """Open or create the shared cache file.
+
+        Args:
+            file_path: Path of the mapped file. Defaults to
+                "_nacos_config_cache.mmap" in the working directory.
+            capacity: Number of hash slots when creating the file.
+                Defaults to 4096.
+            arena_size: Bytes reserved for keys and values when creating the
+                file. Defaults to 16 MiB.
+            max_retries: Attempts a read makes while racing writers before
+                reporting a miss. Defaults to 1000.
+            max_tombstone_ratio: Share of the slots left marked deleted that
+                triggers a compaction, as they lengthen every probe.
+                Defaults to 0.25.
+        """
+        super().__init__()
+        self.file_path = file_path or "_nacos_config_cache.mmap"
+        self.max_retries = max_retries
+        self.max_tombstone_ratio = max_tombstone_ratio
+        self.lock = FileLock(f"{self.file_path}.lock")
+        self._sweep_cursor = 0
+
+        parent_dir = os.path.dirname(self.file_path)
+        if parent_dir and not os.path.exists(parent_dir):
+            os.makedirs(parent_dir, exist_ok=True)
+
+        with self.lock:
+            fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, _HEADER_SIZE + capacity * _SLOT.size + arena_size)
+                    self._mm = mmap.mmap(fd, 0)
+                    _HEADER.pack_into(
+                        self._mm, 0, _MAGIC, _VERSION, capacity, arena_size, 0, 0
+                    )
+                else:
+                    self._mm = mmap.mmap(fd, 0)
+            finally:
+                os.close(fd)
+
+        magic, version, capacity, arena_size, _, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a use-nacos mmap cache file: {self.file_path}")
+        self.capacity = capacity
+        self.arena_size = arena_size
+        self._arena_start = _HEADER_SIZE + capacity * _SLOT.size
+
+    @staticmethod
+    def _slot_offset(index: int) -> int:
+        return _HEADER_SIZE + index * _SLOT.size
+
+    def _probe(self, key: bytes, key_hash: int) -> Any:
+        """Find the live record for ``key`` in the slot table.
+
+        Returns:
+            ``(value_bytes, expires)``, None on a miss, or ``_RETRY`` if a
+            writer touched a slot while it was being read.
+        """
+        mm = self._mm
+        index = key_hash % self.capacity
+        for _ in range(self.capacity):
+            offset = self._slot_offset(index)
+            seq, slot_hash, state, key_len, data_offset, value_len, expires = (
+                _SLOT.unpack_from(mm, offset)
+            )
+            if seq & 1:
+                return _RETRY
+            if state == _EMPTY:
+                return None
+            if state == _LIVE and slot_hash == key_hash:
+                start = self._arena_start + data_offset
+                data = mm[start : start + key_len + value_len]
+                if _U64.unpack_from(mm, offset)[0] != seq:
+                    return _RETRY
+                if data[:key_len] == key:
+                    return data[key_len:], expires
+            index = (index + 1) % self.capacity
+        return None
+
+    def _lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Read the value and expiry of ``key`` without taking any lock."""
+        key_bytes = key.encode("utf-8")
+        key_hash = _hash_key(key_bytes)
+        found = self._read(key_bytes, key_hash)
+        if found is _RETRY and self._repair():
+            found = self._read(key_bytes, key_hash)
+        if found is _RETRY:
+            logger.warning("Gave up reading contended mmap cache key. key=%s", key)
+            return None
+        return found
+
+    def _read(self, key: bytes, key_hash: int) -> Any:
+        """Decode the record of ``key``, retrying while writers race.
+
+        Returns:
+            ``(value, expires)``, None on a miss, or ``_RETRY`` once
+            ``max_retries`` attempts raced with a writer.
+        """
+        mm = self._mm
+        for _ in range(self.max_retries):
+            arena_seq = _U64.unpack_from(mm, _ARENA_SEQ_OFFSET)[0]
+            if arena_seq & 1:
+                time.sleep(0)
+                continue
+            found = self._probe(key, key_hash)
+            if found is _RETRY:
+                continue
+            if _U64.unpack_from(mm, _ARENA_SEQ_OFFSET)[0] != arena_seq:
+                continue
+            if found is None:
+                return None
+            value, expires = found
+            try:
+                return json.loads(value), expires
+            except ValueError:
+                # Torn read that slipped past the sequence checks
+                continue
+        return _RETRY
+
+    def _repair(self) -> bool:
+        """Undo the updates of writers that died holding the write lock.
+
+        Returns:
+            Whether anything was repaired.
+        """
+        mm = self._mm
+        with self.lock:
+            if _U64.unpack_from(mm, _ARENA_SEQ_OFFSET)[0] & 1:
+                logger.warning(
+                    "Clearing mmap cache left mid-compaction. path=%s", self.file_path
+                )
+                self.clear()
+                return True
+            torn = [
+                index
+                for index in range(self.capacity)
+                if _U64.unpack_from(mm, self._slot_offset(index))[0] & 1
+            ]
+            for index in torn:
+                # The slot may be half written, so its record is dropped
+                self._write_slot(index, 0, _DELETED, 0, 0, 0, 0.0)
+            if torn:
+                logger.warning(
+                    "Dropped mmap cache slots left mid-update. path=%s, slots=%d",
+                    self.file_path,
+                    len(torn),
+                )
+                self._add_tombstones(len(torn))
+            return bool(torn)
+
+    def get(self, key: str) -> Any:
+        """Get a value by key. Returns None if key doesn't exist or expired."""
+        found = self._lookup(key)
+        if found is None:
+            self._stats.miss(key)
+            return None
+        value, expires = found
+        if expires and time.time() > expires:
+            self._stats.expired(key)
+            self._stats.miss(key)
+            return None
+        self._stats.hit(key)
+        return value
+
+    def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        found = self._lookup(key)
+        return found is not None and not (found[1] and time.time() > found[1])
+
+    def _write_slot(
+        self,
+        index: int,
+        key_hash: int,
+        state: int,
+        key_len: int,
+        data_offset: int,
+        value_len: int,
+        expires: float,
+    ) -> None:
+        """Rewrite a slot under its sequence number."""
+        mm = self._mm
+        offset = self._slot_offset(index)
+        seq = _U64.unpack_from(mm, offset)[0]
+        # Odd under the write lock: left by a dead writer
+        seq += seq & 1
+        _U64.pack_into(mm, offset, seq + 1)
+        _SLOT.pack_into(
+            mm,
+            offset,
+            seq + 1,
+            key_hash,
+            state,
+            key_len,
+            data_offset,
+            value_len,
+            expires,
+        )
+        _U64.pack_into(mm, offset, seq + 2)
+
+    def _find_slot(self, key: bytes, key_hash: int) -> Tuple[Optional[int], bool]:
+        """Find the slot to write ``key`` into.
+
+        Returns:
+            ``(index, live)`` where ``live`` tells whether the slot currently
+            holds ``key``. ``index`` is None when the table is full.
+        """
+        mm = self._mm
+        index = key_hash % self.capacity
+        reusable = None
+        for _ in range(self.capacity):
+            _, slot_hash, state, key_len, data_offset, _, _ = _SLOT.unpack_from(
+                mm, self._slot_offset(index)
+            )
+            if state == _EMPTY:
+                return (index if reusable is None else reusable), False
+            if state == _LIVE and slot_hash == key_hash:
+                start = self._arena_start + data_offset
+                if mm[start : start + key_len] == key:
+                    return index, True
+            elif state == _DELETED and reusable is None:
+                reusable = index
+            index = (index + 1) % self.capacity
+        return reusable, False
+
+    def _live_records(self) -> List[Tuple[bytes, bytes, int, float]]:
+        """Copy out every unexpired record as ``(key, value, hash, expires)``."""
+        mm = self._mm
+        now = time.time()
+        records = []
+        for index in range(self.capacity):
+            _, key_hash, state, key_len, data_offset, value_len, expires = (
+                _SLOT.unpack_from(mm, self._slot_offset(index))
+            )
+            if state != _LIVE or (expires and now > expires):
+                continue
+            start = self._arena_start + data_offset
+            records.append(
+                (
+                    mm[start : start + key_len],
+                    mm[start + key_len : start + key_len + value_len],
+                    key_hash,
+                    expires,
+                )
+            )
+        return records
+
+    def _compact(self) -> None:
+        """Rebuild the slot table and arena from the live records.
+
+        Readers spin on the odd arena sequence number until it finishes.
+        """
+        mm = self._mm
+        records = self._live_records()
+        arena_seq = _U64.unpack_from(mm, _ARENA_SEQ_OFFSET)[0]
+        arena_seq += arena_seq & 1
+        _U64.pack_into(mm, _ARENA_SEQ_OFFSET, arena_seq + 1)
+        try:
+            mm[_HEADER_SIZE : self._arena_start] = bytes(
+                self._arena_start - _HEADER_SIZE
+            )
+            used = 0
+            for key, value, key_hash, expires in records:
+                index, _ = self._find_slot(key, key_hash)
+                start = self._arena_start + used
+                mm[start : start + len(key) + len(value)] = key + value
+                self._write_slot(
+                    index, key_hash, _LIVE, len(key), used, len(value), expires
+                )
+                used += len(key) + len(value)
+            _U64.pack_into(mm, _ARENA_USED_OFFSET, used)
+            _U64.pack_into(mm, _TOMBSTONES_OFFSET, 0)
+        finally:
+            _U64.pack_into(mm, _ARENA_SEQ_OFFSET, arena_seq + 2)
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        """Write one entry. The caller must hold the write lock."""
+        key_bytes = key.encode("utf-8")
+        value_bytes = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        key_hash = _hash_key(key_bytes)
+        size = len(key_bytes) + len(value_bytes)
+        mm = self._mm
+
+        index, live = self._find_slot(key_bytes, key_hash)
+        used = _U64.unpack_from(mm, _ARENA_USED_OFFSET)[0]
+        if index is None or used + size > self.arena_size:
+            self._compact()
+            index, live = self._find_slot(key_bytes, key_hash)
+            used = _U64.unpack_from(mm, _ARENA_USED_OFFSET)[0]
+        if index is None or used + size > self.arena_size:
+            logger.warning(
+                "Mmap cache is full, dropping write. key=%s, bytes=%d", key, size
+            )
+            self._stats.evicted(key)
+            return
+
+        # New data goes to fresh arena space, so concurrent readers of the
+        # old record are never handed half-written bytes.
+        start = self._arena_start + used
+        mm[start : start + size] = key_bytes + value_bytes
+        _U64.pack_into(mm, _ARENA_USED_OFFSET, used + size)
+        if not live and _SLOT.unpack_from(mm, self._slot_offset(index))[2]:
+            self._add_tombstones(-1)
+        expires = time.time() + ttl if ttl else 0.0
+        self._write_slot(
+            index, key_hash, _LIVE, len(key_bytes), used, len(value_bytes), expires
+        )
+        self._stats.stored(key, len(value_bytes))
+
+    def _add_tombstones(self, count: int) -> None:
+        """Track slots marked deleted, compacting once there are too many.
+
+        Deleted slots keep probe chains intact, so they are only reclaimed
+        by a compaction. The caller must hold the write lock.
+        """
+        mm = self._mm
+        tombstones = _U64.unpack_from(mm, _TOMBSTONES_OFFSET)[0] + count
+        _U64.pack_into(mm, _TOMBSTONES_OFFSET, max(tombstones, 0))
+        if tombstones > self.max_tombstone_ratio * self.capacity:
+            self._compact()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Set several values under one acquisition of the write lock."""
+        with self.lock:
+            for key, value in items.items():
+                self._store(key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if key was deleted."""
+        return self.delete_many([key]) == 1
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys under one acquisition of the write lock."""
+        deleted = 0
+        with self.lock:
+            for key in keys:
+                key_bytes = key.encode("utf-8")
+                index, live = self._find_slot(key_bytes, _hash_key(key_bytes))
+                if live:
+                    self._write_slot(index, 0, _DELETED, 0, 0, 0, 0.0)
+                    deleted += 1
+            if deleted:
+                self._add_tombstones(deleted)
+        return deleted
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        mm = self._mm
+        with self.lock:
+            arena_seq = _U64.unpack_from(mm, _ARENA_SEQ_OFFSET)[0]
+            arena_seq += arena_seq & 1
+            _U64.pack_into(mm, _ARENA_SEQ_OFFSET, arena_seq + 1)
+            mm[_HEADER_SIZE : self._arena_start] = bytes(
+                self._arena_start - _HEADER_SIZE
+            )
+            _U64.pack_into(mm, _ARENA_USED_OFFSET, 0)
+            _U64.pack_into(mm, _TOMBSTONES_OFFSET, 0)
+            _U64.pack_into(mm, _ARENA_SEQ_OFFSET, arena_seq + 2)
+
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
+        """Remove expired entries. Returns number of entries removed.
+
+        Args:
+            limit: Maximum number of slots to examine while holding the
+                write lock; successive calls resume where the last one
+                stopped. None examines every slot.
+        """
+        mm = self._mm
+        count = self.capacity if limit is None else min(limit, self.capacity)
+        removed = 0
+        with self.lock:
+            now = time.time()
+            for _ in range(count):
+                index = self._sweep_cursor
+                self._sweep_cursor = (index + 1) % self.capacity
+                _, _, state, key_len, data_offset, _, expires = _SLOT.unpack_from(
+                    mm, self._slot_offset(index)
+                )
+                if state == _LIVE and expires and now > expires:
+                    if self._stats.prefix_func is None:
+                        self._stats.expirations += 1
+                    else:
+                        start = self._arena_start + data_offset
+                        self._stats.expired(mm[start : start + key_len].decode("utf-8"))
+                    self._write_slot(index, 0, _DELETED, 0, 0, 0, 0.0)
+                    removed += 1
+            if removed:
+                self._add_tombstones(removed)
+        return removed
+
+    def lock_stats(self) -> Dict[str, float]:
+        """Return contention metrics of the cross-process write lock.
+
+        Returns:
+            A dict with ``acquisitions``, total ``wait_seconds`` and
+            ``hold_seconds``, and the longest single ``max_hold_seconds``.
+        """
+        return self.lock.stats()
+
+    def close(self) -> None:
+        """Unmap the cache file."""
+        self._mm.close()
@@ -0,0 +1,245 @@
+"""Passive outlier ejection for ``instance.request``.
+
+Nacos learns that an instance is unhealthy seconds after its requests start
+failing. Meanwhile ``OutlierDetector`` watches the outcome of every request
+``instance.request`` sends and ejects instances that keep failing from the
+local picks, for ``base_ejection_time`` doubled on every repeated ejection.
+When the time is up the instance is let back in on probation: one more
+failure ejects it again at once.
+
+Example:
+    >>> detector = OutlierDetector(consecutive_failures=3)
+    >>> client.instance.set_outlier_detector(detector)
+    >>> detector.stats()
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from ._service_info import ServiceInfo, ServiceKey
+from .balancer import Address, address_of
+
+#: Buckets the sliding window is split into
+_BUCKETS = 10
+
+
+class _AddressHealth:
+    """Recent request outcomes of one instance."""
+
+    __slots__ = (
+        "epochs",
+        "requests",
+        "failures",
+        "consecutive",
+        "ejections",
+        "probing",
+        "restored_at",
+    )
+
+    def __init__(self) -> None:
+        self.epochs = [-1] * _BUCKETS
+        self.requests = [0] * _BUCKETS
+        self.failures = [0] * _BUCKETS
+        self.consecutive = 0
+        #: Times ejected, which doubles the next ejection time
+        self.ejections = 0
+        #: Back from an ejection and not yet answered successfully
+        self.probing = False
+        self.restored_at = 0.0
+
+    def reset_window(self) -> None:
+        self.epochs = [-1] * _BUCKETS
+        self.consecutive = 0
+
+
+class OutlierDetector:
+    """Eject instances whose requests fail from the local picks."""
+
+    def __init__(
+        self,
+        consecutive_failures: int = 5,
+        failure_ratio: float = 0.5,
+        min_requests: int = 10,
+        window: float = 10.0,
+        base_ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0,
+        max_ejection_percent: float = 50.0,
+    ) -> None:
+        """Initialize the detector.
+
+        Args:
+            consecutive_failures: Failures in a row that eject an instance.
+                Defaults to 5.
+            failure_ratio: Share of failed requests within ``window`` that
+                ejects an instance. Defaults to 0.5.
+            min_requests: Requests within ``window`` needed before
+                ``failure_ratio`` applies. Defaults to 10.
+            window: Seconds of requests the failure ratio is taken over.
+                Defaults to 10.
+            base_ejection_time: Seconds of the first ejection; each repeated
+                ejection doubles it. Defaults to 30.
+            max_ejection_time: Longest ejection in seconds. Defaults to 300.
+            max_ejection_percent: Most of a service's healthy instances left
+                out of the picks, so a service failing as a whole keeps
+                getting traffic. Defaults to 50.
+        """
+        self.consecutive_failures = consecutive_failures
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.window = window
+        self.base_ejection_time = base_ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.max_ejection_percent = max_ejection_percent
+        self._width = window / _BUCKETS
+        self._health: Dict[Address, _AddressHealth] = {}
+        #: Address -> monotonic time the ejection ends
+        self._ejected: Dict[Address, float] = {}
+        self._next_expiry = float("inf")
+        self._next_prune = time.monotonic() + window
+        #: Service -> (full list, list without the ejected instances)
+        self._views: Dict[ServiceKey, Tuple[ServiceInfo, ServiceInfo]] = {}
+        self._lock = threading.Lock()
+        self._ejections = 0
+
+    def record(self, instance: Dict[str, Any], failed: bool) -> None:
+        """Record the outcome of a request sent to ``instance``."""
+        address = address_of(instance)
+        now = time.monotonic()
+        epoch = int(now / self._width)
+        index = epoch % _BUCKETS
+        with self._lock:
+            if now >= self._next_prune:
+                self._prune(epoch, now)
+            health = self._health.get(address)
+            if health is None:
+                health = self._health[address] = _AddressHealth()
+            if health.epochs[index] != epoch:
+                health.epochs[index] = epoch
+                health.requests[index] = health.failures[index] = 0
+            health.requests[index] += 1
+            if not failed:
+                health.consecutive = 0
+                health.probing = False
+                if health.ejections and now - health.restored_at >= self.window:
+                    # Healthy for a while: forget one past ejection
+                    health.ejections -= 1
+                    health.restored_at = now
+                return
+            health.failures[index] += 1
+            health.consecutive += 1
+            if address in self._ejected:
+                return
+            if health.probing or health.consecutive >= self.consecutive_failures:
+                self._eject(address, health, now)
+                return
+            oldest = epoch - _BUCKETS + 1
+            requests = failures = 0
+            for bucket in range(_BUCKETS):
+                if health.epochs[bucket] >= oldest:
+                    requests += health.requests[bucket]
+                    failures += health.failures[bucket]
+            if requests >= self.min_requests and (
+                failures >= self.failure_ratio * requests
+            ):
+                self._eject(address, health, now)
+
+    def _prune(self, epoch: int, now: float) -> None:
+        """Forget instances with no recent requests and nothing to remember.
+
+        Must hold the lock.
+        """
+        self._next_prune = now + self.window
+        stale = [
+            address
+            for address, health in self._health.items()
+            if address not in self._ejected
+            and max(health.epochs) <= epoch - _BUCKETS
+            and (
+                not health.ejections
+                or now - health.restored_at > self.max_ejection_time
+            )
+        ]
+        for address in stale:
+            del self._health[address]
+
+    def _eject(self, address: Address, health: _AddressHealth, now: float) -> None:
+        """Leave ``address`` out of the picks. Must hold the lock."""
+        health.ejections += 1
+        health.probing = False
+        health.reset_window()
+        duration = min(
+            self.base_ejection_time * 2 ** (health.ejections - 1),
+            self.max_ejection_time,
+        )
+        self._ejected[address] = now + duration
+        self._next_expiry = min(self._next_expiry, now + duration)
+        self._ejections += 1
+        self._views.clear()
+
+    def _expire(self, now: float) -> None:
+        """Let instances whose ejection ended back in. Must hold the lock."""
+        for address, until in list(self._ejected.items()):
+            if until <= now:
+                del self._ejected[address]
+                health = self._health[address]
+                health.probing = True
+                health.restored_at = now
+        self._next_expiry = min(self._ejected.values(), default=float("inf"))
+        self._views.clear()
+
+    def available(self, info: ServiceInfo) -> ServiceInfo:
+        """Return ``info`` without its ejected instances.
+
+        The list is built once per list version and set of ejections, so
+        picks from it keep their constant cost. At most
+        ``max_ejection_percent`` of the healthy instances are left out,
+        those with the longest ejections first.
+        """
+        if not self._ejected:
+            return info
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_expiry:
+                self._expire(now)
+            if not self._ejected:
+                return info
+            cached = self._views.get(info.key)
+            if cached is not None and cached[0] is info:
+                return cached[1]
+            healthy = info.healthy_hosts
+            ejected: List[Tuple[float, Address]] = []
+            for host in healthy:
+                address = address_of(host)
+                until = self._ejected.get(address)
+                if until is not None:
+                    ejected.append((until, address))
+            ejected.sort(reverse=True)
+            limit = int(len(healthy) * self.max_ejection_percent / 100)
+            skip = {address for _, address in ejected[:limit]}
+            view = info
+            if skip:
+                view = ServiceInfo(
+                    info.key,
+                    [host for host in info.hosts if address_of(host) not in skip],
+                    info.version,
+                )
+            self._views[info.key] = (info, view)
+            return view
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the ejected instances and the number of ejections.
+
+        Returns:
+            ``ejected`` maps each ejected ``ip:port`` to the seconds left of
+            its ejection; ``ejections`` counts every ejection so far.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "ejected": {
+                    f"{ip}:{port}": max(until - now, 0.0)
+                    for (ip, port), until in self._ejected.items()
+                },
+                "ejections": self._ejections,
+            }
@@ -0,0 +1,212 @@
+"""Retries and hedged requests for idempotent ``instance.request`` calls.
+
+With a ``ResiliencePolicy`` set, a call that fails to connect is retried on
+another healthy instance, and a call that takes longer than most (the
+``hedge_percentile`` of recent latencies) can be hedged: the same request is
+sent to a second instance and whichever answers first wins, the other is
+cancelled. Every retry and hedge is paid for out of a ``RetryBudget``, so a
+struggling service does not get its traffic multiplied.
+
+Example:
+    >>> client.instance.set_resilience(ResiliencePolicy(hedge=True))
+    >>> client.instance.request("GET", "/api/orders/1", service_name="orders")
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple, Type
+
+import httpx
+
+#: Methods that can be sent twice without changing the result
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"])
+
+#: Errors raised before the request reached the instance
+CONNECT_ERRORS: Tuple[Type[BaseException], ...] = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+)
+
+
+class RetryBudget:
+    """Token bucket that caps retries and hedges to a share of the requests.
+
+    Every request deposits ``ratio`` tokens and every retry or hedge takes
+    one. On top of that ``min_per_second`` tokens trickle in, so services
+    with little traffic can still retry now and then.
+    """
+
+    def __init__(
+        self, ratio: float = 0.1, min_per_second: float = 1.0, burst: float = 10.0
+    ) -> None:
+        """Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per request. Defaults to 0.1 (10%).
+            min_per_second: Retries allowed per second regardless of the
+                traffic. Defaults to 1.
+            burst: Most retries that can be saved up. Defaults to 10.
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.burst = burst
+        self._tokens = min(min_per_second, burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.min_per_second
+        )
+        self._updated = now
+
+    def deposit(self) -> None:
+        """Record a request."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry, returning False if none is left."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class ResiliencePolicy:
+    """When ``instance.request`` retries and hedges a call.
+
+    Only calls with a ``service_name`` and no explicit ``instance`` are
+    retried or hedged, as there must be another instance to send them to.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_delay: Optional[float] = None,
+        min_hedge_delay: float = 0.005,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+        retry_on: Tuple[Type[BaseException], ...] = CONNECT_ERRORS,
+        budget: Optional[RetryBudget] = None,
+        window: int = 1_000,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_attempts: Most requests sent for one call, counting retries
+                and the hedge. Defaults to 3.
+            hedge: Send a second request to another instance when the first
+                is slow. Defaults to False.
+            hedge_percentile: Percentile of the service's recent latencies
+                after which a call is hedged. Defaults to 95.
+            hedge_delay: Fixed seconds after which a call is hedged, instead
+                of the percentile.
+            min_hedge_delay: Shortest delay before hedging, in seconds.
+                Defaults to 0.005.
+            methods: Methods to retry and hedge. Defaults to the idempotent
+                ones; only add others if the service deduplicates them.
+            retry_on: Errors retried on another instance. Defaults to errors
+                raised before the request was sent.
+            budget: Budget the retries and hedges are paid from. Defaults to
+                a ``RetryBudget()`` of this policy.
+            window: Latencies per service the percentile is taken over.
+                Defaults to 1000.
+        """
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.methods = frozenset(method.upper() for method in methods)
+        self.retry_on = retry_on
+        self.budget = budget or RetryBudget()
+        self.window = window
+        #: Service -> recent latencies
+        self._latencies: Dict[str, Deque[float]] = {}
+        #: Service -> (samples since computed, cached delay)
+        self._delays: Dict[str, Tuple[int, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0,
+        }
+
+    def begin(self) -> None:
+        """Record a call made under the policy."""
+        self.budget.deposit()
+        self.count("calls")
+
+    def applies_to(self, method: str) -> bool:
+        """Whether calls with ``method`` are retried and hedged."""
+        return method.upper() in self.methods
+
+    def retryable(self, error: BaseException) -> bool:
+        """Whether a failed request may be retried on another instance."""
+        return isinstance(error, self.retry_on)
+
+    def record_latency(self, service_name: str, elapsed: float) -> None:
+        """Record the latency of a request that got a response."""
+        with self._lock:
+            samples = self._latencies.get(service_name)
+            if samples is None:
+                samples = self._latencies[service_name] = deque(maxlen=self.window)
+            samples.append(elapsed)
+            stale, delay = self._delays.get(service_name, (0, None))
+            self._delays[service_name] = (stale + 1, delay)
+
+    def delay_for(self, service_name: str) -> Optional[float]:
+        """Return the seconds after which a call is hedged, None to not hedge.
+
+        The percentile is recomputed every 32 new latencies; until a
+        service has 20 latencies its calls are not hedged.
+        """
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return max(self.hedge_delay, self.min_hedge_delay)
+        with self._lock:
+            stale, delay = self._delays.get(service_name, (0, None))
+            if delay is None or stale >= 32:
+                samples = sorted(self._latencies.get(service_name, ()))
+                if len(samples) < 20:
+                    return None
+                rank = math.ceil(self.hedge_percentile / 100 * len(samples)) - 1
+                delay = max(samples[max(rank, 0)], self.min_hedge_delay)
+                self._delays[service_name] = (0, delay)
+            return delay
+
+    def spend(self, kind: str) -> bool:
+        """Take a retry or hedge (``kind``) from the budget if it allows."""
+        if self.budget.withdraw():
+            self.count(kind)
+            return True
+        self.count("budget_exhausted")
+        return False
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters of calls, retries and hedges.
+
+        Returns:
+            ``calls`` made under the policy, ``retries`` and ``hedges``
+            sent, ``hedge_wins`` where the hedge answered first, and
+            retries or hedges skipped because the budget ran out
+            (``budget_exhausted``).
+        """
+        with self._lock:
+            return dict(self._counters)
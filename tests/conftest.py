@@ -2,6 +2,8 @@ import os
 
 import pytest
 
+from use_nacos._service_info import ServiceInfo
+
 # 检查是否有可用的 Nacos 服务器
 HAS_NACOS_SERVER = bool(
     os.environ.get("SERVER_ADDR") or os.environ.get("NACOS_SERVER_ADDR")
@@ -26,3 +28,64 @@ def pytest_collection_modifyitems(config, items):
             keyword in item.name for keyword in ["register", "beat", "publish"]
         ):
             item.add_marker(skip_nacos)
+
+
+def _host(ip="10.0.0.1", port=80, weight=1.0, healthy=True, cluster=None, zone=None):
+    """实例列表中的一个实例"""
+    host = {"ip": ip, "port": port, "weight": weight, "healthy": healthy}
+    if cluster is not None:
+        host["clusterName"] = cluster
+    if zone is not None:
+        host["metadata"] = {"zone": zone}
+    return host
+
+
+def _service_info(*hosts, weights=(), count=0, version=1):
+    """demo 服务的实例列表
+
+    除 hosts 外，weights 为每个权重添加一个 10.0.0.1:8000+i 的实例，
+    count 添加 10.0.0.1 到 10.0.0.<count> 的 80 端口实例。
+    """
+    hosts = list(hosts)
+    hosts += [_host(port=8000 + i, weight=weight) for i, weight in enumerate(weights)]
+    hosts += [_host(f"10.0.0.{i}") for i in range(1, count + 1)]
+    return ServiceInfo(("demo", None, None, None), hosts, version)
+
+
+def _chosen_ips(info):
+    """可被选中的实例 IP，已排序"""
+    return sorted(host["ip"] for host in info.chooser.items)
+
+
+def _nacos_reply(*ports, cache_millis=10_000, last_ref_time=0, healthy=True):
+    """demo 服务的 instance/list 响应（也是推送内容）"""
+    return {
+        "name": "DEFAULT_GROUP@@demo",
+        "clusters": "",
+        "cacheMillis": cache_millis,
+        "lastRefTime": last_ref_time,
+        "hosts": [
+            dict(_host("127.0.0.1", port, healthy=healthy), enabled=True)
+            for port in ports
+        ],
+    }
+
+
+@pytest.fixture
+def make_host():
+    return _host
+
+
+@pytest.fixture
+def make_service_info():
+    return _service_info
+
+
+@pytest.fixture
+def chosen_ips():
+    return _chosen_ips
+
+
+@pytest.fixture
+def nacos_reply():
+    return _nacos_reply
@@ -0,0 +1,69 @@
+"""Test cluster, zone and co-location affinity."""
+
+from use_nacos.affinity import Affinity
+from use_nacos.client import NacosClient
+
+
+def test_tiers_fall_back_in_order(make_host, make_service_info, chosen_ips):
+    affinity = Affinity(cluster="a", zone="z1", ip="10.0.0.9")
+    info = make_service_info(
+        make_host("10.0.0.1", cluster="a", zone="z1"),
+        make_host("10.0.0.2", cluster="b", zone="z1"),
+        make_host("10.0.0.9", cluster="c", zone="z2"),
+    )
+    assert chosen_ips(affinity.select(info)) == ["10.0.0.1"]
+    assert affinity.tiers() == {"demo": "cluster"}
+
+    # Half of cluster a is down: spill over to zone z1
+    info = make_service_info(
+        make_host("10.0.0.1", cluster="a", zone="z1", healthy=False),
+        make_host("10.0.0.3", cluster="a", zone="z1", healthy=False),
+        make_host("10.0.0.4", cluster="a", zone="z1"),
+        make_host("10.0.0.2", cluster="b", zone="z1"),
+        make_host("10.0.0.9", cluster="c", zone="z2"),
+        version=2,
+    )
+    assert chosen_ips(affinity.select(info)) == ["10.0.0.2", "10.0.0.4"]
+    assert affinity.tiers() == {"demo": "zone"}
+
+    info = make_service_info(
+        make_host("10.0.0.2", cluster="b", zone="z3"),
+        make_host("10.0.0.9", cluster="c", zone="z2"),
+        version=3,
+    )
+    assert chosen_ips(affinity.select(info)) == ["10.0.0.9"]
+    assert affinity.tiers() == {"demo": "ip"}
+
+    info = make_service_info(make_host("10.0.0.2", cluster="b", zone="z3"), version=4)
+    assert affinity.select(info) is info
+    assert affinity.tiers() == {"demo": "all"}
+
+
+def test_tier_is_resolved_once_per_version(make_host, make_service_info, chosen_ips):
+    affinity = Affinity(zone="z1", min_healthy_share=0.3)
+    info = make_service_info(
+        make_host("10.0.0.1", cluster="a", zone="z1", healthy=False),
+        make_host("10.0.0.2", cluster="a", zone="z1"),
+        make_host("10.0.0.3", cluster="a", zone="z1", healthy=False),
+        make_host("10.0.0.4", cluster="a", zone="z2"),
+    )
+    view = affinity.select(info)
+    assert chosen_ips(view) == ["10.0.0.2"]
+    assert affinity.select(info) is view
+
+
+def test_endpoint_picks_from_the_affinity_tier(mocker, make_host):
+    client = NacosClient()
+    hosts = [
+        make_host(f"10.0.0.{i}", cluster="a" if i < 3 else "b", zone="z1")
+        for i in range(1, 6)
+    ]
+    client.instance._service_infos.fetch = mocker.Mock(return_value={"hosts": hosts})
+    client.instance.set_affinity(Affinity(cluster="a"))
+
+    picks = {client.instance.get_one_healthy("demo")["ip"] for _ in range(200)}
+    assert picks == {"10.0.0.1", "10.0.0.2"}
+
+    client.instance.set_affinity(None)
+    picks = {i["ip"] for i in client.instance.choose_many("demo", 200)}
+    assert len(picks) == 5
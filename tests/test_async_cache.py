@@ -0,0 +1,153 @@
+"""Test the async cache interface."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from use_nacos import NacosAsyncClient
+from use_nacos.cache import (
+    AsyncBaseCache,
+    AsyncCacheAdapter,
+    AsyncFileCache,
+    FileCache,
+    MemoryCache,
+    as_async_cache,
+)
+from use_nacos.endpoints import ConfigAsyncEndpoint
+
+
+@pytest.fixture
+def async_config():
+    return ConfigAsyncEndpoint(NacosAsyncClient())
+
+
+def test_as_async_cache(tmp_path):
+    memory = MemoryCache()
+    adapted = as_async_cache(memory)
+    assert isinstance(adapted, AsyncCacheAdapter)
+    assert adapted.cache is memory
+
+    native = AsyncFileCache(str(tmp_path / "cache.json"))
+    assert as_async_cache(native) is native
+
+
+@pytest.mark.asyncio
+async def test_adapter_offloads_blocking_caches(tmp_path):
+    threads = []
+
+    class RecordingFileCache(FileCache):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return super().get(key)
+
+    adapter = AsyncCacheAdapter(RecordingFileCache(str(tmp_path / "cache.json")))
+    await adapter.set("key1", "value1")
+    assert await adapter.get("key1") == "value1"
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_async_file_cache_batches_writes(tmp_path, mocker):
+    file_cache = FileCache(str(tmp_path / "cache.json"))
+    cache = AsyncFileCache(cache=file_cache, flush_interval=60, batch_size=3)
+    write_batch = mocker.spy(cache, "_write_batch")
+
+    await cache.set("key1", "value1")
+    await cache.set("key2", "value2", ttl=60)
+    # Buffered writes are readable before they reach the file
+    assert await cache.get("key1") == "value1"
+    assert file_cache.get("key1") is None
+
+    assert await cache.delete("key1") is True
+    assert await cache.exists("key1") is False
+    await cache.set("key3", "value3")
+    await asyncio.sleep(0.05)
+
+    write_batch.assert_called_once()
+    assert file_cache.get("key1") is None
+    assert file_cache.get("key2") == "value2"
+    assert file_cache.get("key3") == "value3"
+
+
+@pytest.mark.asyncio
+async def test_async_file_cache_aclose_flushes(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = AsyncFileCache(path, flush_interval=60)
+    await cache.set("key1", "value1")
+    await cache.aclose()
+
+    assert FileCache(path).get("key1") == "value1"
+
+
+@pytest.mark.asyncio
+async def test_async_file_cache_keeps_batch_when_write_fails(tmp_path, mocker):
+    file_cache = FileCache(str(tmp_path / "cache.json"))
+    cache = AsyncFileCache(cache=file_cache, flush_interval=60)
+    await cache.set("key1", "value1")
+    await cache.set("key2", "old")
+    failing = mocker.patch.object(cache, "_write_batch", side_effect=OSError("full"))
+
+    with pytest.raises(OSError):
+        await cache.flush()
+    await cache.set("key2", "new")
+    assert await cache.get("key1") == "value1"
+
+    mocker.stop(failing)
+    await cache.aclose()
+    assert file_cache.get("key1") == "value1"
+    assert file_cache.get("key2") == "new"
+
+
+@pytest.mark.asyncio
+async def test_async_config_get_uses_async_cache(async_config, mocker):
+    class RecordingCache(AsyncBaseCache):
+        def __init__(self):
+            self.data = {}
+
+        async def set(self, key, value, ttl=None):
+            self.data[key] = value
+
+        async def get(self, key):
+            return self.data.get(key)
+
+    cache = RecordingCache()
+    mocker.patch.object(
+        ConfigAsyncEndpoint, "_get", mocker.AsyncMock(return_value="content")
+    )
+    assert await async_config.get("app", "DEFAULT_GROUP", cache=cache) == "content"
+    assert cache.data == {"app#DEFAULT_GROUP#": "content"}
+
+    mocker.patch.object(ConfigAsyncEndpoint, "_get", side_effect=httpx.ConnectError(""))
+    assert await async_config.get("app", "DEFAULT_GROUP", cache=cache) == "content"
+
+
+@pytest.mark.asyncio
+async def test_async_file_cache_batch_operations(tmp_path):
+    cache = AsyncFileCache(str(tmp_path / "cache.json"), flush_interval=60)
+    await cache.set_many({"key1": 1, "key2": 2})
+    await cache.aclose()
+
+    assert await cache.get_many(["key1", "key2", "missing"]) == {"key1": 1, "key2": 2}
+    await cache.set("key3", 3)
+    assert await cache.delete_many(["key1", "key3", "missing"]) == 2
+    assert await cache.get_many(["key1", "key2", "key3"]) == {"key2": 2}
+
+
+@pytest.mark.asyncio
+async def test_async_config_get_many(async_config, mocker):
+    cache = MemoryCache()
+    cache.set("b#DEFAULT_GROUP#", "cached")
+
+    async def _get(data_id, group, tenant):
+        if data_id == "b":
+            raise httpx.ConnectError("")
+        return f"{data_id}-content"
+
+    mocker.patch.object(ConfigAsyncEndpoint, "_get", side_effect=_get)
+    assert await async_config.get_many(["a", "b"], "DEFAULT_GROUP", cache=cache) == {
+        "a": "a-content",
+        "b": "cached",
+    }
+    assert cache.get("a#DEFAULT_GROUP#") == "a-content"
@@ -36,3 +36,26 @@ async def test_async_subscribe_cancel(async_config):
 
     # The task should be cancelled without errors
     assert True  # If we reach here, cancellation worked
+
+
+@pytest.mark.asyncio
+async def test_async_subscribe_forgets_not_found(async_config, mocker):
+    """Test that a change seen by a subscription drops a remembered 404."""
+    async_config._not_found.set("created#DEFAULT_GROUP#", True, ttl=60)
+    mocker.patch.object(
+        ConfigAsyncEndpoint,
+        "subscriber",
+        mocker.AsyncMock(side_effect=["created", asyncio.CancelledError()]),
+    )
+    mocker.patch.object(
+        ConfigAsyncEndpoint, "_get", mocker.AsyncMock(return_value="content")
+    )
+    stop_event = await async_config.subscribe("created", "DEFAULT_GROUP")
+    for _ in range(100):
+        if not async_config._not_found.exists("created#DEFAULT_GROUP#"):
+            break
+        await asyncio.sleep(0.01)
+    stop_event.cancel()
+
+    assert async_config._not_found.exists("created#DEFAULT_GROUP#") is False
+    assert await async_config.get("created", "DEFAULT_GROUP", default="{}") == "content"
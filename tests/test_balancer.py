@@ -0,0 +1,152 @@
+"""Test the load-balancing strategies of instance.request."""
+
+import heapq
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+
+from use_nacos.balancer import (
+    LeastOutstandingStrategy,
+    PowerOfTwoChoicesStrategy,
+    RoundRobinStrategy,
+    WeightedRandomStrategy,
+    get_strategy,
+)
+from use_nacos.client import NacosAsyncClient, NacosClient
+from use_nacos.exception import EmptyHealthyInstanceError
+
+
+def _ports(instances):
+    return [instance["port"] - 8000 for instance in instances]
+
+
+def test_round_robin_is_smooth_and_weighted(make_service_info):
+    """Test the nginx smooth weighted round-robin sequence."""
+    strategy = RoundRobinStrategy()
+    info = make_service_info(weights=(5, 1, 1))
+    assert _ports(strategy.choose(info) for _ in range(7)) == [0, 0, 1, 0, 2, 0, 0]
+
+    # A new list version restarts the cycle
+    info = make_service_info(weights=(1, 1), version=2)
+    assert _ports(strategy.choose(info) for _ in range(4)) == [0, 1, 0, 1]
+
+
+def test_least_outstanding_avoids_busy_instances(make_service_info):
+    """Test that in-flight requests steer picks to idle instances."""
+    strategy = LeastOutstandingStrategy()
+    info = make_service_info(weights=(1, 1))
+    busy = info.hosts[0]
+    strategy.on_start(busy)
+    assert all(strategy.choose(info) is info.hosts[1] for _ in range(20))
+
+    strategy.on_finish(busy, 0.01)
+    assert set(_ports(strategy.choose(info) for _ in range(50))) == {0, 1}
+
+
+def test_p2c_prefers_low_latency(make_service_info):
+    """Test that power of two choices routes around a slow instance."""
+    strategy = PowerOfTwoChoicesStrategy()
+    info = make_service_info(weights=(1, 1))
+    strategy.on_start(info.hosts[0])
+    strategy.on_finish(info.hosts[0], 0.5)
+    strategy.on_start(info.hosts[1])
+    strategy.on_finish(info.hosts[1], 0.01)
+
+    counts = Counter(_ports(strategy.choose(info) for _ in range(1_000)))
+    # The slow one only wins when drawn twice
+    assert counts[0] == pytest.approx(250, abs=60)
+
+
+def test_failures_count_as_slow(make_service_info):
+    """Test that failed requests are recorded with the error penalty."""
+    strategy = PowerOfTwoChoicesStrategy()
+    instance = make_service_info(weights=(1,)).hosts[0]
+    strategy.on_start(instance)
+    strategy.on_finish(instance, 0.001, failed=True)
+
+    stats = strategy.stats()["10.0.0.1:8000"]
+    assert stats == {"outstanding": 0, "latency": 1.0, "requests": 1, "failures": 1}
+
+
+def test_strategies_raise_without_healthy_instances(make_service_info):
+    for name in ("weighted_random", "round_robin", "least_outstanding", "p2c"):
+        with pytest.raises(EmptyHealthyInstanceError):
+            get_strategy(name).choose(make_service_info(weights=(0,)))
+    with pytest.raises(ValueError):
+        get_strategy("fastest")
+
+
+def test_request_feeds_strategy(mocker, make_service_info):
+    """Test that request times calls and reports them per service."""
+    client = NacosClient()
+    client.instance._service_infos.fetch = mocker.Mock(
+        return_value={"hosts": make_service_info(weights=(1,)).hosts}
+    )
+    http = MagicMock()
+    http.request.return_value = MagicMock(status_code=503)
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+
+    default = client.instance._strategy
+    orders = client.instance.set_strategy("round_robin", service_name="orders")
+    assert isinstance(default, WeightedRandomStrategy)
+    assert isinstance(orders, RoundRobinStrategy)
+
+    client.instance.request("GET", "/health", service_name="demo")
+    client.instance.request("GET", "/health", service_name="orders")
+    http.request.side_effect = ConnectionError
+    with pytest.raises(ConnectionError):
+        client.instance.request("GET", "/health", service_name="orders")
+
+    assert default.stats()["10.0.0.1:8000"]["requests"] == 1
+    orders_stats = orders.stats()["10.0.0.1:8000"]
+    assert orders_stats["requests"] == 2
+    assert orders_stats["failures"] == 2
+    assert orders_stats["outstanding"] == 0
+    client.instance._service_infos.close()
+
+
+@pytest.mark.asyncio
+async def test_async_request_feeds_strategy(mocker, make_service_info):
+    client = NacosAsyncClient()
+    client.instance._service_infos.fetch = mocker.AsyncMock(
+        return_value={"hosts": make_service_info(weights=(1, 1)).hosts}
+    )
+    http = MagicMock()
+    http.request = mocker.AsyncMock(return_value=MagicMock(status_code=200))
+    mocker.patch("use_nacos.endpoints.instance.httpx.AsyncClient", return_value=http)
+    strategy = client.instance.set_strategy("least_outstanding")
+
+    for _ in range(4):
+        await client.instance.request("GET", "/health", service_name="demo")
+
+    stats = strategy.stats()
+    assert sum(address["requests"] for address in stats.values()) == 4
+    client.instance._service_infos.close()
+
+
+def test_strategy_simulation(make_service_info):
+    """Test that latency-aware strategies avoid an instance 10x slower.
+
+    Requests arrive every 4ms, so several are in flight at once.
+    """
+    latency = {8000: 0.01, 8001: 0.01, 8002: 0.1}
+    results = {}
+    for name in ("weighted_random", "round_robin", "least_outstanding", "p2c"):
+        strategy = get_strategy(name)
+        info = make_service_info(weights=(1, 1, 1))
+        in_flight = []
+        total = 0.0
+        for tick in range(3_000):
+            now = tick * 0.004
+            while in_flight and in_flight[0][0] <= now:
+                _, _, instance = heapq.heappop(in_flight)
+                strategy.on_finish(instance, latency[instance["port"]])
+            instance = strategy.choose(info)
+            strategy.on_start(instance)
+            elapsed = latency[instance["port"]]
+            heapq.heappush(in_flight, (now + elapsed, tick, instance))
+            total += elapsed
+        results[name] = total / 3_000
+    assert results["p2c"] < results["weighted_random"]
+    assert results["least_outstanding"] < results["round_robin"]
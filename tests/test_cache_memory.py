@@ -0,0 +1,108 @@
+"""Memory benchmark for MemoryCache entries."""
+
+import gc
+import tracemalloc
+
+from use_nacos.cache import MemoryCache
+
+ENTRIES = 10_000
+
+
+def _bytes_per_entry(fill) -> float:
+    """Measure the traced allocation per entry made by ``fill``."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        holder = fill()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert holder
+    return (after - before) / ENTRIES
+
+
+def test_memory_cache_bytes_per_entry():
+    """Test that slotted entries take less memory than dict entries."""
+    keys = [f"data_id_{i}#DEFAULT_GROUP#" for i in range(ENTRIES)]
+    value = "shared config content"
+
+    def fill_dict_entries():
+        # Entry layout used before entries were slotted
+        return {key: {"value": value, "expires": 1.0} for key in keys}
+
+    def fill_memory_cache():
+        cache = MemoryCache()
+        for key in keys:
+            cache.set(key, value)
+        return cache.storage
+
+    before = _bytes_per_entry(fill_dict_entries)
+    after = _bytes_per_entry(fill_memory_cache)
+    assert after < before
+
+
+def test_memory_cache_dedup_shares_identical_content():
+    """Test that identical values share one reference-counted blob."""
+    cache = MemoryCache(dedup=True)
+    base = "server:\n  port: 8080\n" * 100
+    for namespace in range(10):
+        cache.set(f"app.yaml#DEFAULT_GROUP#ns{namespace}", base.encode().decode())
+    cache.set("other#DEFAULT_GROUP#", "unique")
+    cache.set("bytes#DEFAULT_GROUP#", base.encode())
+
+    values = {id(cache.get(f"app.yaml#DEFAULT_GROUP#ns{i}")) for i in range(10)}
+    assert len(values) == 1
+    report = cache.memory_report()
+    assert report["entries"] == 12
+    assert report["unique_blobs"] == 3
+    assert report["dedup_ratio"] > 5
+
+    cache.delete_many([f"app.yaml#DEFAULT_GROUP#ns{i}" for i in range(9)])
+    cache.set("app.yaml#DEFAULT_GROUP#ns9", "changed")
+    assert cache.memory_report()["unique_blobs"] == 3
+    cache.clear()
+    assert cache.memory_report() == {
+        "entries": 0,
+        "unique_blobs": 0,
+        "logical_bytes": 0,
+        "stored_bytes": 0,
+        "dedup_ratio": 1.0,
+    }
+
+
+def test_memory_cache_dedup_survives_digest_collisions(mocker):
+    """Test that values whose digests collide are not shared."""
+    digest = mocker.Mock()
+    digest.digest.return_value = b"0" * 16
+    mocker.patch("use_nacos.cache.hashlib.md5", return_value=digest)
+    cache = MemoryCache(dedup=True)
+    cache.set("first", "value1")
+    cache.set("second", "value2")
+
+    assert cache.get("first") == "value1"
+    assert cache.get("second") == "value2"
+    assert cache.memory_report()["unique_blobs"] == 1
+    cache.delete("first")
+    assert cache.memory_report()["unique_blobs"] == 0
+    assert cache.get("second") == "value2"
+
+
+def test_memory_cache_dedup_bytes_per_entry():
+    """Test memory of 500 namespaces sharing one base config."""
+    base = "spring:\n  datasource:\n    url: jdbc:mysql://db:3306/app\n" * 50
+    keys = [f"application.yaml#DEFAULT_GROUP#ns{i}" for i in range(500)]
+
+    def fill(dedup):
+        def _fill():
+            cache = MemoryCache(dedup=dedup)
+            for key in keys:
+                # Each response from the server is a new string
+                cache.set(key, base.encode().decode())
+            return cache.storage
+
+        return _fill
+
+    plain = _bytes_per_entry(fill(False)) * ENTRIES / len(keys)
+    deduped = _bytes_per_entry(fill(True)) * ENTRIES / len(keys)
+    assert deduped < plain / 5
@@ -0,0 +1,91 @@
+"""Test cache usage statistics."""
+
+import time
+
+import pytest
+
+from use_nacos.cache import AsyncFileCache, FileCache, MemoryCache
+from use_nacos.mmap_cache import MmapCache
+
+
+@pytest.fixture(params=["memory", "file", "mmap"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache()
+    if request.param == "file":
+        return FileCache(file_path=str(tmp_path / "cache.json"))
+    return MmapCache(
+        file_path=str(tmp_path / "cache.mmap"), capacity=16, arena_size=4096
+    )
+
+
+def test_stats_count_hits_misses_and_sets(cache):
+    """Test the basic counters of every cache implementation."""
+    cache.set("key1", "value1")
+    cache.set("key2", "value2", ttl=0.01)
+    assert cache.get("key1") == "value1"
+    assert cache.get("missing") is None
+    time.sleep(0.02)
+    assert cache.get("key2") is None
+
+    stats = cache.stats()
+    assert stats["sets"] == 2
+    assert stats["bytes"] > 0
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expirations"] == 1
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+    assert "prefixes" not in stats
+
+    cache.reset_stats()
+    assert cache.stats()["hits"] == 0
+
+
+def test_stats_count_expirations_on_sweep(cache):
+    """Test that entries removed by cleanup_expired are counted."""
+    cache.set("key1", "value1", ttl=0.01)
+    cache.set("key2", "value2", ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.cleanup_expired() == 2
+    assert cache.stats()["expirations"] == 2
+
+
+def test_prefix_stats(cache):
+    """Test the per-prefix breakdown, by data ID and by a custom prefix."""
+    cache.enable_prefix_stats()
+    cache.set("app.yaml#DEFAULT_GROUP#dev", "a")
+    cache.get("app.yaml#DEFAULT_GROUP#dev")
+    cache.get("db.yaml#DEFAULT_GROUP#prod")
+
+    prefixes = cache.stats()["prefixes"]
+    assert prefixes["app.yaml"]["hits"] == 1
+    assert prefixes["app.yaml"]["sets"] == 1
+    assert prefixes["db.yaml"]["misses"] == 1
+
+    cache.enable_prefix_stats(lambda key: key.rsplit("#", 1)[-1])
+    cache.get("app.yaml#DEFAULT_GROUP#dev")
+    assert set(cache.stats()["prefixes"]) == {"dev"}
+
+
+def test_mmap_cache_counts_dropped_writes_as_evictions(tmp_path):
+    """Test that writes refused for lack of space are counted."""
+    cache = MmapCache(file_path=str(tmp_path / "cache.mmap"), capacity=4, arena_size=64)
+    cache.set("key", "x" * 100)
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["sets"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_file_cache_counts_buffered_reads(tmp_path):
+    """Test that reads served from the write buffer are counted."""
+    cache = AsyncFileCache(str(tmp_path / "cache.json"), flush_interval=60)
+    await cache.set("key1", "value1")
+    assert await cache.get("key1") == "value1"
+    await cache.delete("key1")
+    assert await cache.get("key1") is None
+    await cache.aclose()
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
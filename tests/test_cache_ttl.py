@@ -102,6 +102,62 @@ def test_memory_cache_cleanup_expired(memory_cache):
     assert memory_cache.get("persistent") == "value3"
 
 
+def test_memory_cache_ignores_wall_clock_jumps(memory_cache, mocker):
+    """Test that expiry is tracked on the monotonic clock."""
+    memory_cache.set("clock_key", "clock_value", ttl=60)
+
+    # Jump the wall clock one day ahead
+    mocker.patch("use_nacos.cache.time.time", return_value=time.time() + 86400)
+
+    assert memory_cache.get("clock_key") == "clock_value"
+    assert memory_cache.cleanup_expired() == 0
+
+
+def test_memory_cache_cleanup_expired_limit(memory_cache):
+    """Test that cleanup_expired sweeps in bounded batches."""
+    for i in range(5):
+        memory_cache.set(f"expiring{i}", i, ttl=0.05)
+    memory_cache.set("persistent", "value", ttl=None)
+    # Overwritten keys leave stale heap entries that must be skipped
+    memory_cache.set("expiring0", "renewed", ttl=60)
+
+    time.sleep(0.1)
+
+    assert memory_cache.cleanup_expired(limit=2) == 1
+    assert memory_cache.cleanup_expired(limit=2) == 2
+    assert memory_cache.cleanup_expired() == 1
+    assert memory_cache.cleanup_expired() == 0
+    assert memory_cache.get("expiring0") == "renewed"
+    assert memory_cache.get("persistent") == "value"
+
+
+def test_memory_cache_janitor(memory_cache):
+    """Test that the background janitor removes expired entries."""
+    for i in range(10):
+        memory_cache.set(f"expiring{i}", i, ttl=0.05)
+
+    stop_event = memory_cache.start_janitor(interval=0.05, batch_size=3)
+    try:
+        deadline = time.monotonic() + 2
+        while memory_cache.storage and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert memory_cache.storage == {}
+    finally:
+        stop_event.cancel()
+
+
+def test_file_cache_cleanup_expired(tmp_path):
+    """Test that FileCache.cleanup_expired reports removed entries."""
+    cache_instance = FileCache(file_path=str(tmp_path / "cache.json"))
+    cache_instance.set("expiring", "value", ttl=0.05)
+    cache_instance.set("persistent", "value")
+
+    time.sleep(0.1)
+
+    assert cache_instance.cleanup_expired() == 1
+    assert cache_instance.get("persistent") == "value"
+
+
 def test_file_cache_ttl(file_cache, tmp_path):
     """Test FileCache TTL."""
     import os
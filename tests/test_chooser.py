@@ -0,0 +1,158 @@
+"""Test weighted instance selection."""
+
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from use_nacos import _chooser
+from use_nacos._chooser import Chooser
+from use_nacos._service_info import ServiceInfo
+from use_nacos.client import NacosClient
+from use_nacos.exception import EmptyHealthyInstanceError
+
+
+def test_chooser_follows_weights():
+    """Test that picks follow the weights, skipping non-positive ones."""
+    random.seed(0)
+    chooser = Chooser([("a", 1.0), ("b", 2.0), ("c", 7.0), ("d", 0.0), ("e", -1)])
+    chooser.refresh()
+
+    counts = Counter(chooser.random_with_weight() for _ in range(100_000))
+    assert set(counts) == {"a", "b", "c"}
+    for item, weight in (("a", 0.1), ("b", 0.2), ("c", 0.7)):
+        assert counts[item] / 100_000 == pytest.approx(weight, abs=0.01)
+
+
+def test_chooser_refresh_rebuilds_tables():
+    """Test that refresh resets the items and handles invalid weights."""
+    chooser = Chooser([("a", float("nan")), ("b", None), ("c", float("inf"))])
+    chooser.refresh()
+    chooser.refresh()
+
+    assert chooser.items == ["a", "b", "c"]
+    assert chooser.weights[-1] == pytest.approx(1.0)
+    assert chooser.weights[0] == pytest.approx(1 / 10002)
+
+    chooser.host_with_weight = [("d", 1.0)]
+    chooser.refresh()
+    assert chooser.items == ["d"]
+    assert chooser.random_with_weight() == "d"
+
+
+def test_service_info_builds_chooser_once_per_version():
+    """Test that the selector is reused until the instance list changes."""
+    hosts = [{"ip": "127.0.0.1", "port": 1, "weight": 1.0, "healthy": True}]
+    info = ServiceInfo(("demo", None, None, None), hosts, version=1)
+    assert info.chooser is info.chooser
+    assert info.chooser.random_with_weight() is hosts[0]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def choose_many_backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(_chooser, "np", None)
+    return request.param
+
+
+def test_choose_many_matches_single_pick_distribution(choose_many_backend):
+    """Test that bulk picks follow the same weights as single picks."""
+    chooser = Chooser([("a", 1.0), ("b", 2.0), ("c", 7.0), ("d", 0.0)])
+    chooser.refresh()
+
+    picks = chooser.choose_many(100_000)
+    assert len(picks) == 100_000
+    counts = Counter(picks)
+    assert set(counts) == {"a", "b", "c"}
+    for item, weight in (("a", 0.1), ("b", 0.2), ("c", 0.7)):
+        assert counts[item] / 100_000 == pytest.approx(weight, abs=0.01)
+
+    with pytest.raises(IndexError):
+        Chooser([]).choose_many(1)
+
+
+def test_choose_many_rejects_negative_k(choose_many_backend):
+    """Test that both backends reject a negative number of picks."""
+    chooser = Chooser([("a", 1.0)])
+    chooser.refresh()
+    assert chooser.choose_many(0) == []
+    with pytest.raises(ValueError):
+        chooser.choose_many(-1)
+    with pytest.raises(ValueError):
+        Chooser([]).choose_many(-1)
+
+
+def test_endpoint_choose_many(mocker):
+    """Test bulk picks through the instance endpoint."""
+    client = NacosClient()
+    hosts = [
+        {"ip": "127.0.0.1", "port": port, "weight": 1.0, "healthy": True}
+        for port in (1, 2)
+    ]
+    fetch = mocker.Mock(return_value={"hosts": hosts})
+    client.instance._service_infos.fetch = fetch
+
+    picks = client.instance.choose_many("demo", 1_000)
+    assert {instance["port"] for instance in picks} == {1, 2}
+    assert client.instance.choose_many("demo", 0) == []
+    fetch.assert_called_once()
+
+    hosts[0]["healthy"] = hosts[1]["healthy"] = False
+    client.instance._service_infos.update(("other", None, None, None), {"hosts": hosts})
+    with pytest.raises(EmptyHealthyInstanceError):
+        client.instance.choose_many("other", 10)
+    client.instance._service_infos.close()
+
+
+def test_choose_many_benchmark(choose_many_backend, mocker):
+    """Test that one choose_many beats a dispatch loop of get_one_healthy."""
+    client = NacosClient()
+    rng = random.Random(0)
+    hosts = [
+        {
+            "ip": f"10.0.{i // 256}.{i % 256}",
+            "port": 8080,
+            "weight": rng.uniform(0.1, 10),
+        }
+        for i in range(1_000)
+    ]
+    client.instance._service_infos.fetch = mocker.Mock(return_value={"hosts": hosts})
+    k = 100_000
+
+    start = time.perf_counter()
+    single = [client.instance.get_one_healthy("demo") for _ in range(k)]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk = client.instance.choose_many("demo", k)
+    batch = time.perf_counter() - start
+
+    assert len(single) == len(bulk) == k
+    assert batch < loop
+    client.instance._service_infos.close()
+
+
+@pytest.mark.parametrize("size", [10, 1_000, 10_000])
+def test_chooser_benchmark(size):
+    """Test that a cached alias table picks faster than a rebuild per pick."""
+    rng = random.Random(size)
+    hosts = [(f"10.0.{i // 256}.{i % 256}", rng.uniform(0.1, 10)) for i in range(size)]
+    rounds = max(10, 10_000 // size)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        chooser = Chooser(hosts)
+        chooser.refresh()
+        chooser.random_with_weight()
+    rebuild = (time.perf_counter() - start) / rounds
+
+    chooser = Chooser(hosts)
+    chooser.refresh()
+    start = time.perf_counter()
+    for _ in range(100_000):
+        chooser.random_with_weight()
+    cached = (time.perf_counter() - start) / 100_000
+    assert cached < rebuild
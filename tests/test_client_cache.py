@@ -1,7 +1,8 @@
-"""Test instance client caching."""
+"""Test the HTTP client shared by instance requests."""
 
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
 from use_nacos import NacosAsyncClient, NacosClient
@@ -29,41 +30,36 @@ def async_instance(async_client):
 
 
 def test_client_caching(instance):
-    """Test that httpx.Client instances are cached."""
-    # Create a mock client that tracks creation
-    client_creation_count = 0
-    original_client_init = None
-    created_clients = []
-
-    def mock_client_init(*args, **kwargs):
-        nonlocal client_creation_count
-        client_creation_count += 1
-        mock_client = MagicMock()
-        mock_client.request = MagicMock(return_value="response")
-        return mock_client
-
-    # Patch httpx.Client to track creations
+    """Test that every instance is called through one shared httpx.Client."""
     with patch("use_nacos.endpoints.instance.httpx.Client") as mock_client_class:
-        mock_client_class.side_effect = mock_client_init
+        mock_client_class.return_value.request = MagicMock(return_value="response")
 
-        # First request should create a client
         instance.request("GET", "/test", instance={"ip": "127.0.0.1", "port": 8000})
-        assert client_creation_count == 1
-
-        # Second request to same instance should reuse client
         instance.request("GET", "/test2", instance={"ip": "127.0.0.1", "port": 8000})
-        assert client_creation_count == 1
-
-        # Request to different instance should create new client
         instance.request("GET", "/test3", instance={"ip": "127.0.0.1", "port": 8001})
-        assert client_creation_count == 2
+        assert mock_client_class.call_count == 1
+
+        settings = mock_client_class.call_args.kwargs
+        assert settings["http2"] is False
+        assert settings["limits"] == httpx.Limits(
+            max_connections=100, max_keepalive_connections=20, keepalive_expiry=5.0
+        )
+
+        # New settings take effect on the next request
+        instance.configure_http(max_connections=10, http2=True, timeout=3.0)
+        mock_client_class.return_value.close.assert_called_once()
+        instance.request("GET", "/test4", instance={"ip": "127.0.0.1", "port": 8000})
+        assert mock_client_class.call_count == 2
+        settings = mock_client_class.call_args.kwargs
+        assert settings["http2"] is True
+        assert settings["timeout"] == 3.0
+        assert settings["limits"].max_connections == 10
 
 
 @pytest.mark.asyncio
 async def test_async_client_caching(async_instance):
-    """Test that httpx.AsyncClient instances are cached."""
+    """Test that every instance is called through one shared httpx.AsyncClient."""
     client_creation_count = 0
-    created_clients = {}
 
     def mock_client_class(*args, **kwargs):
         nonlocal client_creation_count
@@ -76,30 +72,13 @@ async def test_async_client_caching(async_instance):
         mock_client.request = mock_request
         return mock_client
 
-    # Patch httpx.AsyncClient to track creations
     with patch(
         "use_nacos.endpoints.instance.httpx.AsyncClient", side_effect=mock_client_class
     ):
-        # First request should create a client
-        await async_instance.request(
-            "GET",
-            "/test",
-            instance={"ip": "127.0.0.1", "port": 8000},
-        )
+        for port in (8000, 8000, 8001):
+            await async_instance.request(
+                "GET",
+                "/test",
+                instance={"ip": "127.0.0.1", "port": port},
+            )
         assert client_creation_count == 1
-
-        # Second request to same instance should reuse client
-        await async_instance.request(
-            "GET",
-            "/test2",
-            instance={"ip": "127.0.0.1", "port": 8000},
-        )
-        assert client_creation_count == 1
-
-        # Request to different instance should create new client
-        await async_instance.request(
-            "GET",
-            "/test3",
-            instance={"ip": "127.0.0.1", "port": 8001},
-        )
-        assert client_creation_count == 2
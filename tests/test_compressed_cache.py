@@ -0,0 +1,122 @@
+"""Test transparent compression of cached values."""
+
+import gc
+import os
+import random
+import tracemalloc
+
+import pytest
+
+from use_nacos.cache import FileCache, MemoryCache
+from use_nacos.compressed_cache import CompressedCache
+
+
+def _yaml_config(size: int) -> str:
+    """Build a YAML config of roughly ``size`` bytes."""
+    rng = random.Random(size)
+    lines = []
+    length = 0
+    while length < size:
+        service = f"service-{rng.randrange(100)}"
+        block = (
+            f"{service}:\n"
+            f"  host: {service}.svc.cluster.local\n"
+            f"  port: {rng.randrange(1024, 65535)}\n"
+            f"  timeout: {rng.randrange(1, 60)}s\n"
+            f"  retries: {rng.randrange(5)}\n"
+        )
+        lines.append(block)
+        length += len(block)
+    return "".join(lines)[:size]
+
+
+@pytest.mark.parametrize("backend", ["memory", "file"])
+def test_compressed_cache_round_trip(backend, tmp_path):
+    inner = (
+        MemoryCache()
+        if backend == "memory"
+        else FileCache(file_path=str(tmp_path / "cache.json"))
+    )
+    cache = CompressedCache(inner, threshold=100)
+    large = _yaml_config(10_000)
+    cache.set("large", large, ttl=60)
+    cache.set("small", "a: 1")
+    cache.set("binary", large.encode("utf-8"))
+    cache.set_many({"dict": {"a": 1}, "again": large})
+
+    assert cache.get("large") == large
+    assert cache.get("small") == "a: 1"
+    assert cache.get("binary") == large.encode("utf-8")
+    assert cache.get_many(["dict", "again", "missing"]) == {
+        "dict": {"a": 1},
+        "again": large,
+    }
+    # Values stay compressed in the wrapped cache
+    assert inner.get("small") == "a: 1"
+    assert inner.get("large") != large
+
+    compression = cache.stats()["compression"]
+    assert compression["compressed"] == 3
+    assert compression["saved_bytes"] > 0
+
+
+def test_compressed_cache_bypasses_incompressible_values():
+    cache = CompressedCache(MemoryCache(), threshold=100)
+    noise = os.urandom(4096)
+    cache.set("noise", noise)
+
+    assert cache.cache.get("noise") == noise
+    assert cache.get("noise") == noise
+    assert cache.stats()["compression"]["bypassed"] == 1
+
+
+def test_compressed_cache_rejects_unknown_codec():
+    with pytest.raises(ValueError):
+        CompressedCache(codec="brotli")
+
+
+def _traced_bytes(fill) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        holder = fill()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert holder
+    return after - before
+
+
+@pytest.mark.parametrize("size", [2_000, 10_000, 100_000])
+def test_compressed_cache_benchmark(size, tmp_path):
+    """Test memory and disk savings of compressed configs per size."""
+    configs = {f"config-{i}#DEFAULT_GROUP#": _yaml_config(size) for i in range(50)}
+
+    def fill(cache):
+        def _fill():
+            # Each response from the server is a new string
+            cache.set_many(
+                {key: value.encode().decode() for key, value in configs.items()}
+            )
+            return cache
+
+        return _fill
+
+    plain_memory = _traced_bytes(fill(MemoryCache()))
+    compressed = CompressedCache(MemoryCache())
+    compressed_memory = _traced_bytes(fill(compressed))
+
+    plain_file = FileCache(file_path=str(tmp_path / "plain.json"))
+    plain_file.set_many(configs)
+    compressed_file = CompressedCache(
+        FileCache(file_path=str(tmp_path / "compressed.json"))
+    )
+    compressed_file.set_many(configs)
+
+    assert compressed.get_many(configs) == configs
+    assert compressed.stats()["compression"]["compressed"] == len(configs)
+    assert compressed_memory < plain_memory
+    assert os.path.getsize(compressed_file.cache.file_path) < os.path.getsize(
+        plain_file.file_path
+    )
@@ -56,6 +56,43 @@ def test_config_get_not_found_default_value(config, mocker):
     )
 
 
+def test_config_get_not_found_is_cached(config, mocker):
+    _get = mocker.patch.object(
+        ConfigEndpoint,
+        "_get",
+        side_effect=HTTPResponseError(response=httpx.Response(404)),
+    )
+    for _ in range(3):
+        assert config.get("optional", "DEFAULT_GROUP", default="{}") == "{}"
+    assert _get.call_count == 1
+    assert config.get_many(["optional"], "DEFAULT_GROUP", default="{}") == {
+        "optional": "{}"
+    }
+    assert _get.call_count == 1
+
+    # Without a default the 404 is still raised
+    with pytest.raises(HTTPResponseError):
+        config.get("optional", "DEFAULT_GROUP")
+
+    # Publishing the config forgets the 404
+    mocker.patch.object(config.client, "request", return_value=True)
+    config.publish("optional", "DEFAULT_GROUP", "content")
+    _get.side_effect = None
+    _get.return_value = "content"
+    assert config.get("optional", "DEFAULT_GROUP", default="{}") == "content"
+
+
+def test_config_get_not_found_cache_disabled(config, mocker):
+    _get = mocker.patch.object(
+        ConfigEndpoint,
+        "_get",
+        side_effect=HTTPResponseError(response=httpx.Response(404)),
+    )
+    for _ in range(2):
+        config.get("optional", "DEFAULT_GROUP", default="{}", negative_ttl=None)
+    assert _get.call_count == 2
+
+
 @pytest.mark.parametrize(
     "data_id, group",
     [
@@ -222,3 +259,36 @@ def test_config_from_cache(config, mocker):
 )
 def test_config_serializer(conf_str, serializer, expected):
     assert conf._serialize_config(conf_str, serializer) == expected
+
+
+def test_config_get_many(config, mocker):
+    mc = MemoryCache()
+    set_many = mocker.spy(mc, "set_many")
+    mocker.patch.object(
+        ConfigEndpoint, "_get", side_effect=lambda data_id, *_: f"{data_id}-content"
+    )
+    assert config.get_many(["a", "b"], "DEFAULT_GROUP", cache=mc) == {
+        "a": "a-content",
+        "b": "b-content",
+    }
+    set_many.assert_called_once()
+    assert mc.get("b#DEFAULT_GROUP#") == "b-content"
+
+
+def test_config_get_many_falls_back_to_cache(config, mocker):
+    mc = MemoryCache()
+    mc.set("a#DEFAULT_GROUP#", "cached")
+
+    def _get(data_id, group, tenant):
+        if data_id == "a":
+            raise httpx.TimeoutException("")
+        if data_id == "missing":
+            raise HTTPResponseError(response=httpx.Response(404))
+        return '{"b": 1}'
+
+    mocker.patch.object(ConfigEndpoint, "_get", side_effect=_get)
+    assert config.get_many(
+        ["a", "b", "missing"], "DEFAULT_GROUP", cache=mc, default="{}"
+    ) == {"a": "cached", "b": '{"b": 1}', "missing": "{}"}
+    with pytest.raises(HTTPResponseError):
+        config.get_many(["b", "missing"], "DEFAULT_GROUP", cache=mc)
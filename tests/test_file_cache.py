@@ -0,0 +1,246 @@
+"""Test the log-structured FileCache."""
+
+import json
+import multiprocessing
+import sys
+import threading
+import time
+
+import pytest
+
+from use_nacos.cache import FileCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.json")
+
+
+def test_file_cache_persists_across_instances(cache_path):
+    """Test that entries survive reopening the log."""
+    cache = FileCache(file_path=cache_path)
+    cache.set("key1", {"a": 1})
+    cache.set("key2", "value2", ttl=60)
+    cache.set("key1", {"a": 2})
+    cache.delete("key2")
+    cache.close()
+
+    reopened = FileCache(file_path=cache_path)
+    assert reopened.get("key1") == {"a": 2}
+    assert reopened.exists("key2") is False
+
+
+def test_file_cache_recovers_from_torn_tail(cache_path):
+    """Test that a partially written record is truncated on load."""
+    cache = FileCache(file_path=cache_path)
+    cache.set("key1", "value1")
+    cache.close()
+    with open(cache_path, "ab") as f:
+        f.write(b'{"k":"key2","v":"val')
+
+    reopened = FileCache(file_path=cache_path)
+    assert reopened.get("key1") == "value1"
+    assert reopened.get("key2") is None
+    reopened.set("key3", "value3")
+    reopened.close()
+
+    assert FileCache(file_path=cache_path).get("key3") == "value3"
+
+
+def test_file_cache_migrates_legacy_json(cache_path):
+    """Test that a whole-file JSON cache is converted to the log format."""
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "live": {"value": "v1", "expires": None},
+                "expired": {"value": "v2", "expires": time.time() - 1},
+            },
+            f,
+        )
+
+    cache = FileCache(file_path=cache_path)
+    assert cache.get("live") == "v1"
+    assert cache.get("expired") is None
+    with open(cache_path, "rb") as f:
+        assert f.readline() == FileCache._HEADER
+
+
+def test_file_cache_compaction(cache_path):
+    """Test that superseded records are reclaimed."""
+    cache = FileCache(file_path=cache_path, compact_min_bytes=0)
+    for i in range(100):
+        cache.set("key", i)
+    cache.set("other", "value")
+
+    assert cache.get("key") == 99
+    assert cache.get("other") == "value"
+    with open(cache_path, "rb") as f:
+        assert len(f.readlines()) <= 4
+
+
+class _LegacyFileCache:
+    """Whole-file JSON cache that FileCache replaced, kept as a baseline."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+
+    def _read_file(self):
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_file(self, data):
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def set(self, key, value):
+        with self.lock:
+            data = self._read_file()
+            data[key] = {"value": value, "expires": None}
+            self._write_file(data)
+
+    def get(self, key):
+        with self.lock:
+            entry = self._read_file().get(key)
+            return entry["value"] if entry else None
+
+
+def _ops_per_second(cache, keys, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        key = keys[i * 7919 % len(keys)]
+        cache.set(key, f"updated-{i}")
+        assert cache.get(key) == f"updated-{i}"
+    return 2 * ops / (time.perf_counter() - start)
+
+
+def test_file_cache_throughput_benchmark(tmp_path):
+    """Test that get/set at 10k keys outpace the whole-file cache."""
+    keys = [f"data_id_{i}#DEFAULT_GROUP#" for i in range(10_000)]
+    value = "x" * 200
+
+    legacy_path = str(tmp_path / "legacy.json")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        json.dump({k: {"value": value, "expires": None} for k in keys}, f)
+    legacy = _ops_per_second(_LegacyFileCache(legacy_path), keys, 20)
+
+    cache = FileCache(file_path=str(tmp_path / "log.json"))
+    for key in keys:
+        cache.set(key, value)
+    log_ops = _ops_per_second(cache, keys, 2_000)
+    assert log_ops > legacy
+
+
+def test_file_cache_reads_from_mirror(cache_path, mocker):
+    """Test that reads of an unchanged log do not parse the file."""
+    cache = FileCache(file_path=cache_path)
+    cache.set("key1", "value1")
+    loads = mocker.patch("use_nacos.cache.json.loads")
+
+    for _ in range(10):
+        assert cache.get("key1") == "value1"
+    loads.assert_not_called()
+
+
+def test_file_cache_reads_are_copies(cache_path):
+    """Test that mutating a read value leaves the cached one intact."""
+    cache = FileCache(cache_path)
+    cache.set("key1", {"servers": ["a"]})
+    cache.get("key1")["servers"].append("b")
+    cache.get_many(["key1"])["key1"]["extra"] = 1
+
+    assert cache.get("key1") == {"servers": ["a"]}
+
+
+def test_file_cache_sees_other_writers(cache_path):
+    """Test that appends and compactions by another writer are picked up."""
+    reader = FileCache(file_path=cache_path)
+    writer = FileCache(file_path=cache_path)
+    reader.set("key1", "value1")
+    assert reader.get("key1") == "value1"
+
+    writer.set("key1", "value2")
+    writer.set("key2", "value3")
+    assert reader.get("key1") == "value2"
+    assert reader.get("key2") == "value3"
+
+    writer.delete("key2")
+    writer.compact()
+    assert reader.get("key1") == "value2"
+    assert reader.exists("key2") is False
+
+
+def _write_keys(cache_path, worker):
+    cache = FileCache(file_path=cache_path, compact_min_bytes=1024)
+    for i in range(100):
+        cache.set(f"worker{worker}-key{i}", i)
+        cache.set("shared", worker)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires fork and fcntl")
+def test_file_cache_shared_between_processes(cache_path):
+    """Test that concurrent writers neither corrupt the log nor lose updates."""
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=_write_keys, args=(cache_path, worker))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    cache = FileCache(file_path=cache_path)
+    for worker in range(4):
+        for i in range(100):
+            assert cache.get(f"worker{worker}-key{i}") == i
+    assert cache.get("shared") in range(4)
+    assert cache.lock_stats()["acquisitions"] >= 1
+
+
+def test_file_cache_batch_operations(cache_path, mocker):
+    """Test that batch writes append all records in one locked write."""
+    cache = FileCache(file_path=cache_path)
+    cache.get("key0")  # index the log
+    acquire = mocker.spy(cache.file_lock, "acquire")
+
+    cache.set_many({f"key{i}": i for i in range(10)}, ttl=60)
+    assert acquire.call_count == 1
+    assert cache.get_many(["key1", "key5", "missing"]) == {"key1": 1, "key5": 5}
+
+    assert cache.delete_many(["key1", "key2", "missing"]) == 2
+    cache.close()
+
+    reopened = FileCache(file_path=cache_path)
+    found = reopened.get_many(f"key{i}" for i in range(10))
+    assert sorted(found) == [f"key{i}" for i in range(10) if i not in (1, 2)]
+
+
+def _warm_seconds(tmp_path, name, warm):
+    """Return the best of several timings of ``warm`` on a fresh cache."""
+    best = float("inf")
+    for run in range(5):
+        cache = FileCache(file_path=str(tmp_path / f"{name}{run}.json"))
+        cache.get("")  # index the log outside the timing
+        start = time.perf_counter()
+        warm(cache)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_file_cache_warm_benchmark(tmp_path):
+    """Test that warming 500 configs in one batch beats one by one."""
+    configs = {f"data_id_{i}#DEFAULT_GROUP#": "x" * 200 for i in range(500)}
+
+    def warm_single(cache):
+        for key, value in configs.items():
+            cache.set(key, value, ttl=300)
+
+    def warm_batch(cache):
+        cache.set_many(configs, ttl=300)
+        assert len(cache.get_many(configs)) == len(configs)
+
+    single_seconds = _warm_seconds(tmp_path, "single", warm_single)
+    batch_seconds = _warm_seconds(tmp_path, "batch", warm_batch)
+    assert batch_seconds < single_seconds
@@ -0,0 +1,313 @@
+"""Test the heartbeat scheduler."""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from use_nacos.client import NacosAsyncClient, NacosClient
+
+
+class _FakeServer:
+    """Answers beats like Nacos, recording every request."""
+
+    def __init__(self, interval=30, light=True):
+        self.reply = {"clientBeatInterval": interval, "code": 10200}
+        self.reply["lightBeatEnabled"] = light
+        self.beats = []
+        self.registrations = []
+        self.lock = threading.Lock()
+
+    def request(self, path, method="GET", query=None, **kwargs):
+        with self.lock:
+            if path.endswith("/beat"):
+                self.beats.append((time.monotonic(), query))
+                return dict(self.reply)
+            self.registrations.append(query)
+            return "ok"
+
+    def beats_of(self, port):
+        with self.lock:
+            return [query for _, query in self.beats if query["port"] == port]
+
+
+def _client(mocker, server):
+    client = NacosClient()
+    mocker.patch.object(client, "request", side_effect=server.request)
+    return client
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_scheduler_follows_the_server_interval(mocker):
+    """Test the first beat, the interval and light beats."""
+    server = _FakeServer(interval=30)
+    client = _client(mocker, server)
+    started = time.monotonic()
+    stop = client.instance.heartbeat(
+        "demo", "10.0.0.1", 8080, interval=10_000, cluster="c1", metadata={"a": 1}
+    )
+
+    _wait_for(lambda: len(server.beats) >= 4)
+    stop.cancel()
+    times = [at for at, _ in server.beats]
+    # The first beat is sent at once, then every 30 ms as the server says
+    assert times[0] - started < 0.5
+    assert all(0.02 < later - earlier < 0.5 for earlier, later in zip(times, times[1:]))
+
+    first, light = server.beats[0][1], server.beats[1][1]
+    assert json.loads(first["beat"]) == {
+        "serviceName": "demo",
+        "ip": "10.0.0.1",
+        "port": 8080,
+        "weight": 1.0,
+        "ephemeral": True,
+        "cluster": "c1",
+        "metadata": {"a": 1},
+    }
+    assert "beat" not in light
+    assert light["ip"] == "10.0.0.1" and light["clusterName"] == "c1"
+
+    count = len(server.beats)
+    time.sleep(0.1)
+    assert len(server.beats) <= count + 1
+    client.instance.close()
+
+
+def test_lost_instances_are_added_back(mocker):
+    server = _FakeServer(interval=20)
+    server.reply["code"] = 20404
+    client = _client(mocker, server)
+    client.instance.heartbeat("demo", "10.0.0.1", 8080, group_name="g", cluster="c1")
+
+    _wait_for(lambda: server.registrations)
+    server.reply["code"] = 10200
+    registration = server.registrations[0]
+    assert registration["serviceName"] == "demo"
+    assert registration["groupName"] == "g"
+    assert registration["clusterName"] == "c1"
+    assert registration["ephemeral"] is True
+
+    # The beat after a re-registration carries the full beat again
+    _wait_for(lambda: len(server.beats) >= 2)
+    assert "beat" in server.beats[1][1]
+    client.instance.close()
+    assert client.instance.heartbeats.stats()["reregistered"] >= 1
+
+
+def test_one_thread_for_every_instance(mocker):
+    server = _FakeServer(interval=20)
+    client = _client(mocker, server)
+    threads = threading.active_count()
+    stops = [client.instance.heartbeat("demo", "10.0.0.1", port) for port in range(100)]
+
+    _wait_for(lambda: all(len(server.beats_of(port)) >= 2 for port in range(100)))
+    assert threading.active_count() == threads + 1
+    assert client.instance.heartbeats.stats()["instances"] >= 99
+
+    for stop in stops[:50]:
+        stop.cancel()
+    _wait_for(lambda: client.instance.heartbeats.stats()["instances"] <= 50)
+    client.instance.close()
+
+
+def test_scheduler_thread_lives_while_instances_do(mocker):
+    """Test that the thread keeps the process alive until the last cancel."""
+    server = _FakeServer(interval=20)
+    client = _client(mocker, server)
+    first = client.instance.heartbeat("demo", "10.0.0.1", 1)
+    second = client.instance.heartbeat("demo", "10.0.0.1", 2)
+    thread = client.instance.heartbeats._thread
+    assert thread is not None and not thread.daemon
+
+    first.cancel()
+    _wait_for(lambda: len(server.beats_of(2)) >= 3)
+    assert thread.is_alive()
+    second.cancel()
+    thread.join(2)
+    assert not thread.is_alive() and client.instance.heartbeats._thread is None
+
+    # A new heartbeat starts the thread again
+    third = client.instance.heartbeat("demo", "10.0.0.1", 3)
+    _wait_for(lambda: server.beats_of(3))
+    client.instance.close()
+    assert third.is_set()
+    _wait_for(lambda: client.instance.heartbeats._thread is None)
+
+
+def test_failures_are_retried_unless_told_otherwise(mocker):
+    calls = []
+
+    def request(path, method="GET", query=None, **kwargs):
+        calls.append(query["port"])
+        raise ConnectionError("down")
+
+    client = NacosClient()
+    mocker.patch.object(client, "request", side_effect=request)
+    keep = client.instance.heartbeat("demo", "10.0.0.1", 1, interval=20)
+    stop = client.instance.heartbeat(
+        "demo", "10.0.0.1", 2, interval=20, skip_exception=False
+    )
+
+    _wait_for(lambda: calls.count(1) >= 3)
+    assert calls.count(2) == 1
+    assert stop.is_set() and not keep.is_set()
+    client.instance.close()
+    assert keep.is_set()
+
+
+class _AsyncFakeServer(_FakeServer):
+    def __init__(self, interval=30, light=True, delay=0.0):
+        super().__init__(interval, light)
+        self.delay = delay
+        self.in_flight = self.most_in_flight = 0
+
+    async def request(self, path, method="GET", query=None, **kwargs):
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            reply = super().request(path, method, query)
+            if path.endswith("/beat"):
+                # Every instance gets its own interval: 10 ms per port
+                reply["clientBeatInterval"] = 10 * query["port"]
+            return reply
+        finally:
+            self.in_flight -= 1
+
+
+def _async_client(mocker, server):
+    client = NacosAsyncClient()
+    mocker.patch.object(client, "request", side_effect=server.request)
+    return client
+
+
+async def _async_wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_async_scheduler_follows_each_instance_interval(mocker):
+    server = _AsyncFakeServer()
+    client = _async_client(mocker, server)
+    fast = await client.instance.heartbeat("demo", "10.0.0.1", 2, interval=10_000)
+    await client.instance.heartbeat("demo", "10.0.0.1", 8, interval=10_000)
+
+    await asyncio.sleep(0.25)
+    fast.cancel()
+    fast_count, slow_count = len(server.beats_of(2)), len(server.beats_of(8))
+    # 20 ms against 80 ms, each after a first beat sent at once
+    assert fast_count >= 6 and 2 <= slow_count <= 5
+    assert "beat" in server.beats_of(2)[0] and "beat" not in server.beats_of(2)[1]
+
+    await asyncio.sleep(0.1)
+    assert len(server.beats_of(2)) <= fast_count + 1
+    await client.instance.aclose()
+    count = len(server.beats)
+    await asyncio.sleep(0.1)
+    assert len(server.beats) == count
+    assert client.instance.heartbeats.stats()["instances"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_scheduler_limits_concurrency(mocker):
+    server = _AsyncFakeServer(delay=0.02)
+    client = _async_client(mocker, server)
+    client.instance.heartbeats.max_concurrency = 4
+    for port in range(1, 21):
+        await client.instance.heartbeat("demo", "10.0.0.1", 100 + port)
+
+    await _async_wait_for(lambda: len(server.beats) >= 20)
+    assert server.most_in_flight == 4
+    stats = client.instance.heartbeats.stats()
+    assert stats["sent"] >= 20 and stats["failed"] == 0
+    await client.instance.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_lost_instances_are_added_back(mocker):
+    server = _AsyncFakeServer()
+    server.reply["code"] = 20404
+    client = _async_client(mocker, server)
+    await client.instance.heartbeat("demo", "10.0.0.1", 2, metadata={"v": "1"})
+
+    await _async_wait_for(lambda: server.registrations)
+    server.reply["code"] = 10200
+    assert server.registrations[0]["metadata"] == '{"v": "1"}'
+    await _async_wait_for(lambda: client.instance.heartbeats.stats()["reregistered"])
+    await client.instance.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_close_during_a_send_leaves_no_task(mocker):
+    server = _AsyncFakeServer(delay=0.2)
+    client = _async_client(mocker, server)
+    await client.instance.heartbeat("demo", "10.0.0.1", 2)
+    await _async_wait_for(lambda: server.in_flight)
+
+    client.instance.heartbeats.close()
+    await asyncio.sleep(0.05)
+    assert client.instance.heartbeats._task is None
+    assert not [task for task in asyncio.all_tasks() if "_scheduler" in repr(task)]
+    await client.instance.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_handles_are_futures(mocker):
+    """Test that handles can be awaited and cancelled like the old tasks."""
+    server = _AsyncFakeServer()
+    client = _async_client(mocker, server)
+    cancelled = await client.instance.heartbeat("demo", "10.0.0.1", 2)
+    closed = await client.instance.heartbeat("demo", "10.0.0.1", 3)
+    assert isinstance(cancelled, asyncio.Future) and not cancelled.is_set()
+
+    await _async_wait_for(lambda: server.beats_of(2) and server.beats_of(3))
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert cancelled.is_set()
+
+    failed = await client.instance.heartbeat(
+        "demo", "10.0.0.1", 4, skip_exception=False
+    )
+    mocker.patch.object(client, "request", side_effect=ConnectionError("down"))
+    with pytest.raises(ConnectionError):
+        await asyncio.wait_for(failed, 2)
+
+    await client.instance.aclose()
+    assert await asyncio.wait_for(closed, 1) is None
+    assert client.instance.heartbeats.stats()["instances"] == 0
+
+
+def test_close_stops_instances_with_a_send_in_flight(mocker):
+    sending = threading.Event()
+    finish = threading.Event()
+
+    def request(path, method="GET", query=None, **kwargs):
+        sending.set()
+        finish.wait(2)
+        return {"clientBeatInterval": 10}
+
+    client = NacosClient()
+    mocker.patch.object(client, "request", side_effect=request)
+    handle = client.instance.heartbeat("demo", "10.0.0.1", 1)
+    assert sending.wait(2)
+    thread = client.instance.heartbeats._thread
+
+    client.instance.heartbeats.close()
+    assert handle.is_set()
+    finish.set()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert client.instance.heartbeats.stats()["instances"] == 0
+    client.instance.close()
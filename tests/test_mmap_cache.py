@@ -0,0 +1,148 @@
+"""Test the memory-mapped cross-process cache."""
+
+import multiprocessing
+import sys
+import time
+
+import pytest
+
+from use_nacos.mmap_cache import (
+    _ARENA_SEQ_OFFSET,
+    _TOMBSTONES_OFFSET,
+    _U64,
+    MmapCache,
+    _hash_key,
+)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.mmap")
+
+
+@pytest.fixture
+def mmap_cache(cache_path):
+    cache = MmapCache(cache_path, capacity=64, arena_size=4096)
+    yield cache
+    cache.close()
+
+
+def test_mmap_cache_set_get(mmap_cache):
+    mmap_cache.set("key1", {"a": 1})
+    mmap_cache.set("key1", {"a": 2})
+    mmap_cache.set("key2", "value2")
+
+    assert mmap_cache.get("key1") == {"a": 2}
+    assert mmap_cache.get("key2") == "value2"
+    assert mmap_cache.get("missing") is None
+    assert mmap_cache.exists("key2") is True
+
+
+def test_mmap_cache_ttl(mmap_cache):
+    mmap_cache.set("ttl_key", "ttl_value", ttl=0.05)
+    assert mmap_cache.get("ttl_key") == "ttl_value"
+
+    time.sleep(0.1)
+
+    assert mmap_cache.get("ttl_key") is None
+    assert mmap_cache.exists("ttl_key") is False
+    assert mmap_cache.cleanup_expired() == 1
+
+
+def test_mmap_cache_delete_and_clear(mmap_cache):
+    mmap_cache.set("key1", "value1")
+    mmap_cache.set("key2", "value2")
+
+    assert mmap_cache.delete("key1") is True
+    assert mmap_cache.delete("key1") is False
+    assert mmap_cache.get("key1") is None
+    assert mmap_cache.get("key2") == "value2"
+
+    mmap_cache.clear()
+    assert mmap_cache.get("key2") is None
+
+
+def test_mmap_cache_compacts_full_arena(mmap_cache):
+    """Test that overwriting keys reclaims arena space."""
+    for i in range(500):
+        mmap_cache.set(f"key{i % 8}", "x" * 100 + str(i))
+
+    for i in range(492, 500):
+        assert mmap_cache.get(f"key{i % 8}") == "x" * 100 + str(i)
+
+
+def test_mmap_cache_drops_writes_when_full(mmap_cache):
+    mmap_cache.set("small", "value")
+    mmap_cache.set("huge", "x" * 8192)
+
+    assert mmap_cache.get("huge") is None
+    assert mmap_cache.get("small") == "value"
+
+
+def test_mmap_cache_repairs_slot_of_dead_writer(mmap_cache):
+    """Test that a sequence number left odd by a dead writer is repaired."""
+    mmap_cache.max_retries = 10
+    mmap_cache.set("key1", "value1")
+    mmap_cache.set("key2", "value2")
+    index, _ = mmap_cache._find_slot(b"key1", _hash_key(b"key1"))
+    offset = mmap_cache._slot_offset(index)
+    _U64.pack_into(
+        mmap_cache._mm, offset, _U64.unpack_from(mmap_cache._mm, offset)[0] + 1
+    )
+
+    assert mmap_cache.get("key1") is None
+    assert mmap_cache.get("key2") == "value2"
+    mmap_cache.set("key1", "again")
+    assert mmap_cache.get("key1") == "again"
+
+
+def test_mmap_cache_repairs_compaction_of_dead_writer(mmap_cache):
+    mmap_cache.max_retries = 10
+    mmap_cache.set("key1", "value1")
+    _U64.pack_into(mmap_cache._mm, _ARENA_SEQ_OFFSET, 1)
+
+    assert mmap_cache.get("key1") is None
+    mmap_cache.set("key1", "again")
+    assert mmap_cache.get("key1") == "again"
+
+
+def test_mmap_cache_compacts_tombstones(mmap_cache):
+    mmap_cache.max_tombstone_ratio = 0.25
+    mmap_cache.set_many({f"key{i}": i for i in range(40)})
+    mmap_cache.delete_many([f"key{i}" for i in range(16)])
+    assert _U64.unpack_from(mmap_cache._mm, _TOMBSTONES_OFFSET)[0] == 16
+
+    mmap_cache.delete("key16")
+    assert _U64.unpack_from(mmap_cache._mm, _TOMBSTONES_OFFSET)[0] == 0
+    assert mmap_cache.get("key16") is None
+    assert all(mmap_cache.get(f"key{i}") == i for i in range(17, 40))
+
+
+def test_mmap_cache_shared_between_instances(mmap_cache, cache_path):
+    other = MmapCache(cache_path)
+    try:
+        assert other.capacity == 64
+        mmap_cache.set("key1", "value1")
+        assert other.get("key1") == "value1"
+        other.delete("key1")
+        assert mmap_cache.get("key1") is None
+    finally:
+        other.close()
+
+
+def _write_in_child(cache_path):
+    cache = MmapCache(cache_path)
+    cache.set("from_child", {"pid": "child"})
+    cache.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires fork")
+def test_mmap_cache_shared_between_processes(mmap_cache, cache_path):
+    process = multiprocessing.get_context("fork").Process(
+        target=_write_in_child, args=(cache_path,)
+    )
+    process.start()
+    process.join(10)
+
+    assert process.exitcode == 0
+    assert mmap_cache.get("from_child") == {"pid": "child"}
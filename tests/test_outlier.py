@@ -0,0 +1,104 @@
+"""Test passive outlier ejection."""
+
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from use_nacos.client import NacosClient
+from use_nacos.outlier import OutlierDetector
+
+
+def test_consecutive_failures_eject(make_service_info, chosen_ips):
+    detector = OutlierDetector(consecutive_failures=3)
+    info = make_service_info(count=4)
+    bad = info.hosts[0]
+    for failed in (True, True, False, True, True):
+        detector.record(bad, failed)
+    assert detector.available(info) is info
+
+    detector.record(bad, True)
+    view = detector.available(info)
+    assert chosen_ips(view) == ["10.0.0.2", "10.0.0.3", "10.0.0.4"]
+    # The view is kept for the list version
+    assert detector.available(info) is view
+    assert detector.available(make_service_info(count=4, version=2)) is not view
+    assert list(detector.stats()["ejected"]) == ["10.0.0.1:80"]
+
+
+def test_failure_ratio_ejects(make_service_info, chosen_ips):
+    detector = OutlierDetector(failure_ratio=0.5, min_requests=10)
+    info = make_service_info(count=2)
+    flaky = info.hosts[0]
+    for i in range(9):
+        detector.record(flaky, failed=i % 2 == 0)
+    assert detector.stats()["ejections"] == 0
+
+    detector.record(flaky, True)
+    assert detector.stats()["ejections"] == 1
+    assert chosen_ips(detector.available(info)) == ["10.0.0.2"]
+
+
+def test_max_ejection_percent_keeps_traffic_flowing(make_service_info):
+    detector = OutlierDetector(consecutive_failures=1, max_ejection_percent=50)
+    info = make_service_info(count=3)
+    for host in info.hosts:
+        detector.record(host, True)
+
+    assert len(detector.stats()["ejected"]) == 3
+    assert len(detector.available(info).chooser.items) == 2
+    single = make_service_info(count=1, version=2)
+    assert detector.available(single) is single
+
+
+def test_ejection_time_doubles_and_probes_back_in(make_service_info):
+    detector = OutlierDetector(consecutive_failures=2, base_ejection_time=0.05)
+    info = make_service_info(count=2)
+    bad = info.hosts[0]
+    detector.record(bad, True)
+    detector.record(bad, True)
+    assert detector.stats()["ejected"]["10.0.0.1:80"] == pytest.approx(0.05, abs=0.02)
+
+    time.sleep(0.06)
+    assert detector.available(info) is info
+
+    # On probation a single failure ejects it again, for twice as long
+    detector.record(bad, True)
+    assert detector.stats()["ejected"]["10.0.0.1:80"] == pytest.approx(0.1, abs=0.02)
+    time.sleep(0.11)
+    assert detector.available(info) is info
+    detector.record(bad, False)
+    detector.record(bad, True)
+    assert detector.stats()["ejections"] == 2
+
+
+def test_endpoint_skips_ejected_instances(mocker, make_service_info):
+    """Test that failing requests take an instance out of every pick."""
+
+    def request(method, url, **kwargs):
+        if url.startswith("http://10.0.0.1:"):
+            raise httpx.ConnectError("refused")
+        return MagicMock(status_code=200)
+
+    http = MagicMock()
+    http.request.side_effect = request
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+    client = NacosClient()
+    client.instance._service_infos.fetch = mocker.Mock(
+        return_value={"hosts": make_service_info(count=3).hosts}
+    )
+    bad = {"ip": "10.0.0.1", "port": 80}
+    for _ in range(5):
+        with pytest.raises(httpx.ConnectError):
+            client.instance.request("GET", "/", instance=bad)
+
+    picks = {client.instance.get_one_healthy("demo")["ip"] for _ in range(200)}
+    assert picks == {"10.0.0.2", "10.0.0.3"}
+    assert "10.0.0.1" not in {i["ip"] for i in client.instance.choose_many("demo", 200)}
+    for _ in range(50):
+        client.instance.request("GET", "/", service_name="demo")
+
+    client.instance.set_outlier_detector(None)
+    picks = {client.instance.get_one_healthy("demo")["ip"] for _ in range(200)}
+    assert picks == {"10.0.0.1", "10.0.0.2", "10.0.0.3"}
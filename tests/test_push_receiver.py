@@ -0,0 +1,153 @@
+"""Test receiving instance changes pushed over UDP."""
+
+import asyncio
+import gzip
+import json
+import socket
+import time
+
+import pytest
+
+from use_nacos._push_receiver import decode_push, handle_push
+from use_nacos._service_info import ServiceInfoCache
+from use_nacos.client import NacosAsyncClient, NacosClient
+
+
+def _packet(data, push_type="dom", compress=True):
+    packet = json.dumps(
+        {"type": push_type, "lastRefTime": 42, "data": json.dumps(data)}
+    ).encode("utf-8")
+    return gzip.compress(packet) if compress else packet
+
+
+@pytest.fixture
+def nacos_server():
+    """A UDP socket standing in for the server's push sender."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    yield sock
+    sock.close()
+
+
+def _push(sock, port, packet):
+    """Send a push and return the decoded ack."""
+    sock.sendto(packet, ("127.0.0.1", port))
+    ack, _ = sock.recvfrom(1024)
+    return json.loads(ack)
+
+
+def test_handle_push_decodes_and_acks(nacos_reply):
+    """Test decoding of plain and gzipped pushes and the ack types."""
+    pushed = []
+    for compress in (True, False):
+        ack = json.loads(
+            handle_push(_packet(nacos_reply(1), compress=compress), pushed.append)
+        )
+        assert ack == {"type": "push-ack", "lastRefTime": 42, "data": ""}
+    assert pushed == [nacos_reply(1), nacos_reply(1)]
+
+    assert decode_push(_packet({}, push_type="dump"))["type"] == "dump"
+    assert json.loads(handle_push(_packet({}, "dump"), pushed.append))["type"] == (
+        "dump-ack"
+    )
+    assert json.loads(handle_push(_packet({}, "other"), pushed.append))["type"] == (
+        "unknown-ack"
+    )
+    assert len(pushed) == 2
+
+
+def test_push_updates_cached_instances(mocker, nacos_server, nacos_reply):
+    """Test that list subscribes and a push replaces the cached list."""
+    client = NacosClient()
+    request = mocker.patch.object(client, "request", return_value=nacos_reply(1))
+    receiver = client.instance.enable_push(client_ip="127.0.0.1", host="127.0.0.1")
+
+    assert client.instance.get_one_healthy("demo")["port"] == 1
+    query = request.call_args.kwargs["query"]
+    assert query["udpPort"] == receiver.port
+    assert query["clientIP"] == "127.0.0.1"
+
+    ack = _push(nacos_server, receiver.port, _packet(nacos_reply(2, last_ref_time=2)))
+    assert ack["type"] == "push-ack"
+    assert client.instance.get_one_healthy("demo")["port"] == 2
+    assert request.call_count == 1
+
+    # A push delivered out of order does not roll the list back
+    _push(nacos_server, receiver.port, _packet(nacos_reply(1, last_ref_time=1)))
+    assert client.instance.get_one_healthy("demo")["port"] == 2
+
+    client.instance.disable_push()
+    client.instance.list("demo")
+    assert "udpPort" not in request.call_args.kwargs["query"]
+    client.instance._service_infos.close()
+
+
+def test_push_is_not_applied_across_namespaces(mocker, nacos_reply):
+    """Test that a push matching several namespaces re-lists them instead."""
+    fetch = mocker.Mock(return_value=nacos_reply(1))
+    cache = ServiceInfoCache(fetch)
+    public = cache.get("demo")
+    same = cache.get("demo", "public", "DEFAULT_GROUP")
+    assert len(cache.apply_push(nacos_reply(2, last_ref_time=2))) == 2
+    assert cache.peek(public.key).hosts[0]["port"] == 2
+    assert cache.peek(same.key).hosts[0]["port"] == 2
+
+    dev = cache.get("demo", "dev")
+    fetch.reset_mock()
+    assert cache.apply_push(nacos_reply(3, last_ref_time=3)) == []
+    assert cache.peek(dev.key).hosts[0]["port"] == 1
+    deadline = time.monotonic() + 5
+    while fetch.call_count < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(call.args[1] or "" for call in fetch.call_args_list) == [
+        "",
+        "dev",
+        "public",
+    ]
+    cache.close()
+
+
+def test_push_only_accepted_from_the_server(mocker, nacos_server, nacos_reply):
+    """Test that pushes from other addresses are dropped unanswered."""
+    client = NacosClient(server_addr="http://127.0.0.1:8848")
+    mocker.patch.object(client, "request", return_value=nacos_reply(1))
+    receiver = client.instance.enable_push()
+    assert receiver.accept_from == {"127.0.0.1"}
+    assert receiver._socket.getsockname()[0] == "127.0.0.1"
+    receiver.accept_from = frozenset({"192.0.2.1"})
+
+    assert client.instance.get_one_healthy("demo")["port"] == 1
+    nacos_server.settimeout(0.3)
+    with pytest.raises(socket.timeout):
+        _push(nacos_server, receiver.port, _packet(nacos_reply(2, last_ref_time=2)))
+    assert client.instance.get_one_healthy("demo")["port"] == 1
+    client.instance.disable_push()
+    client.instance._service_infos.close()
+
+
+@pytest.mark.asyncio
+async def test_async_push_updates_cached_instances(mocker, nacos_server, nacos_reply):
+    """Test the asyncio datagram receiver."""
+    client = NacosAsyncClient()
+    mocker.patch.object(
+        client, "request", mocker.AsyncMock(return_value=nacos_reply(1))
+    )
+    receiver = await client.instance.enable_push(
+        client_ip="127.0.0.1", host="127.0.0.1"
+    )
+    assert (await client.instance.get_one_healthy("demo"))["port"] == 1
+
+    loop = asyncio.get_running_loop()
+    ack = await loop.run_in_executor(
+        None,
+        _push,
+        nacos_server,
+        receiver.port,
+        _packet(nacos_reply(2, last_ref_time=2)),
+    )
+    assert ack["type"] == "push-ack"
+    assert (await client.instance.get_one_healthy("demo"))["port"] == 2
+
+    client.instance.disable_push()
+    client.instance._service_infos.close()
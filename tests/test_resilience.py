@@ -0,0 +1,171 @@
+"""Test retries and hedged requests of instance.request."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from use_nacos.client import NacosAsyncClient, NacosClient
+from use_nacos.resilience import ResiliencePolicy, RetryBudget
+
+HOSTS = [
+    {"ip": f"10.0.0.{i}", "port": 80, "weight": 1.0, "healthy": True} for i in (1, 2, 3)
+]
+
+
+def _client(mocker, request, policy):
+    http = MagicMock()
+    http.request.side_effect = request
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+    client = NacosClient()
+    client.instance._service_infos.fetch = mocker.Mock(return_value={"hosts": HOSTS})
+    client.instance.set_resilience(policy)
+    return client
+
+
+def _async_client(mocker, request, policy):
+    http = MagicMock()
+    http.request = request
+    mocker.patch("use_nacos.endpoints.instance.httpx.AsyncClient", return_value=http)
+    client = NacosAsyncClient()
+
+    async def fetch(*key):
+        return {"hosts": HOSTS}
+
+    client.instance._service_infos.fetch = fetch
+    client.instance.set_resilience(policy)
+    return client
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, burst=2.0)
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_hedge_delay_follows_latency_percentile():
+    policy = ResiliencePolicy(hedge=True, hedge_percentile=90)
+    for latency in range(1, 20):
+        policy.record_latency("demo", latency / 100)
+    assert policy.delay_for("demo") is None
+
+    policy.record_latency("demo", 0.2)
+    assert policy.delay_for("demo") == pytest.approx(0.18)
+    assert ResiliencePolicy().delay_for("demo") is None
+
+
+def test_connect_errors_are_retried_on_another_instance(mocker):
+    """Test that a refused connection moves the call to the next instance."""
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(url)
+        if url == calls[0]:
+            raise httpx.ConnectError("refused")
+        return MagicMock(status_code=200)
+
+    policy = ResiliencePolicy()
+    client = _client(mocker, request, policy)
+    response = client.instance.request("GET", "/", service_name="demo")
+
+    assert response.status_code == 200
+    assert len(calls) == 2 and calls[0] != calls[1]
+    assert policy.stats()["retries"] == 1
+
+    # Non-idempotent calls, other errors and explicit instances are sent once
+    for method, instance in (("POST", None), ("GET", HOSTS[0])):
+        calls[:] = [f"http://{HOSTS[0]['ip']}:80/"] * (instance is not None)
+        with pytest.raises(httpx.ConnectError):
+            client.instance.request(method, "/", instance=instance, service_name="demo")
+        assert len(set(calls)) == 1
+
+
+def test_retries_stop_when_the_budget_runs_out(mocker):
+    def request(method, url, **kwargs):
+        raise httpx.ConnectError("refused")
+
+    policy = ResiliencePolicy(budget=RetryBudget(min_per_second=1.0, burst=1.0))
+    client = _client(mocker, request, policy)
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            client.instance.request("GET", "/", service_name="demo")
+
+    stats = policy.stats()
+    assert stats["calls"] == 2
+    assert stats["retries"] == 1
+    assert stats["budget_exhausted"] == 2
+
+
+def test_slow_calls_are_hedged(mocker):
+    """Test that the hedge answers for a slow instance."""
+    release = threading.Event()
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(url)
+        if url == calls[0]:
+            release.wait(5)
+            return MagicMock(status_code=200, slow=True)
+        return MagicMock(status_code=200, slow=False)
+
+    policy = ResiliencePolicy(hedge=True, hedge_delay=0.02)
+    client = _client(mocker, request, policy)
+    started = time.perf_counter()
+    response = client.instance.request("GET", "/", service_name="demo")
+
+    assert response.slow is False
+    assert time.perf_counter() - started < 1
+    assert policy.stats()["hedges"] == policy.stats()["hedge_wins"] == 1
+    release.set()
+    client.instance.close()
+
+
+@pytest.mark.asyncio
+async def test_async_hedge_cancels_the_loser(mocker):
+    cancelled = asyncio.Event()
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(url)
+        if url == calls[0]:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return MagicMock(status_code=200, url=url)
+
+    policy = ResiliencePolicy(hedge=True, hedge_delay=0.02)
+    client = _async_client(mocker, request, policy)
+    response = await client.instance.request("GET", "/", service_name="demo")
+
+    assert response.url == calls[1] != calls[0]
+    await asyncio.wait_for(cancelled.wait(), 1)
+    # The cancelled request is not held against its instance
+    stats = client.instance._strategy.stats()[calls[0][7:-1]]
+    assert stats["failures"] == 0 and stats["outstanding"] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_connect_errors_are_retried(mocker):
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(url)
+        if len(calls) < 3:
+            raise httpx.ConnectError("refused")
+        return MagicMock(status_code=200)
+
+    policy = ResiliencePolicy(budget=RetryBudget(min_per_second=2.0))
+    client = _async_client(mocker, request, policy)
+    response = await client.instance.request("GET", "/", service_name="demo")
+
+    assert response.status_code == 200
+    assert len(set(calls)) == 3
+    assert policy.stats()["retries"] == 2
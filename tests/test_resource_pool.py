@@ -0,0 +1,226 @@
+"""Test the per-endpoint pool of per-address resources."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from use_nacos._resource_pool import ResourcePool
+from use_nacos.client import NacosAsyncClient, NacosClient
+
+
+def _pool(**kwargs):
+    closed = []
+    pool = ResourcePool(MagicMock, closed.append, **kwargs)
+    return pool, closed
+
+
+def _use(pool, address):
+    pool.release(pool.acquire(address))
+
+
+def test_pool_evicts_least_recently_used():
+    """Test the size limit and the counters."""
+    pool, closed = _pool(max_size=2)
+    first = pool.acquire(("10.0.0.1", 80))
+    pool.release(first)
+    _use(pool, ("10.0.0.2", 80))
+    _use(pool, ("10.0.0.1", 80))
+    _use(pool, ("10.0.0.3", 80))
+
+    # 10.0.0.1 was used again, so 10.0.0.2 is the one closed
+    assert len(closed) == 1 and closed[0] is not first.resource
+    assert pool.stats() == {
+        "size": 2,
+        "max_size": 2,
+        "in_use": 0,
+        "created": 3,
+        "reused": 1,
+        "evicted_idle": 0,
+        "evicted_full": 1,
+        "removed": 0,
+    }
+
+
+def test_pool_pins_leased_resources():
+    """Test that a discarded resource is shared until its last release."""
+    pool, closed = _pool()
+    lease = pool.acquire(("10.0.0.1", 80))
+    assert pool.discard([("10.0.0.1", 80), ("10.0.0.9", 80)]) == 1
+    assert closed == []
+
+    # Requests still reaching the address share the pinned resource
+    other = pool.acquire(("10.0.0.1", 80))
+    assert other is lease
+    pool.release(lease)
+    assert closed == [] and pool.stats()["size"] == 1
+    pool.release(other)
+    assert pool.stats()["size"] == 0
+    assert closed == [lease.resource]
+
+    again = pool.acquire(("10.0.0.1", 80))
+    assert again is not lease
+    pool.release(again)
+    pool.close()
+    assert closed == [lease.resource, again.resource]
+
+
+def test_pool_never_evicts_leased_resources():
+    pool, closed = _pool(max_size=2)
+    busy = pool.acquire(("10.0.0.1", 80))
+    _use(pool, ("10.0.0.2", 80))
+    _use(pool, ("10.0.0.3", 80))
+
+    # 10.0.0.1 is the least recently used, but still leased
+    assert pool.acquire(("10.0.0.1", 80)) is busy
+    assert len(closed) == 1 and closed[0] is not busy.resource
+    other = pool.acquire(("10.0.0.4", 80))
+    assert pool.stats()["size"] == 2
+    pool.release(busy)
+    pool.release(busy)
+    pool.release(other)
+
+
+def test_pool_evicts_idle_clients():
+    pool, closed = _pool(idle_timeout=0.05)
+    _use(pool, ("10.0.0.1", 80))
+    time.sleep(0.1)
+    _use(pool, ("10.0.0.2", 80))
+
+    assert len(closed) == 1
+    assert pool.stats()["evicted_idle"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_pool_creates_one_client_per_address_across_threads():
+    pool, _ = _pool()
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        for _ in range(100):
+            _use(pool, ("10.0.0.1", 80))
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 1_599
+    assert stats["in_use"] == 0
+
+
+def test_endpoint_drops_limiters_of_removed_instances(mocker):
+    """Test that per-host limiters follow the instance cache, per endpoint."""
+    http = MagicMock()
+    http.request.return_value = MagicMock(status_code=200)
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+    hosts = [
+        {"ip": "10.0.0.1", "port": port, "weight": 1.0, "healthy": True}
+        for port in (80, 81)
+    ]
+    client = NacosClient()
+    infos = client.instance._service_infos
+    infos.fetch = mocker.Mock(return_value={"hosts": hosts})
+    client.instance.set_strategy("round_robin")
+    client.instance.request("GET", "/", service_name="demo")
+    client.instance.request("GET", "/", service_name="demo")
+    assert client.instance.host_pool.stats()["size"] == 2
+    assert NacosClient().instance.host_pool.stats()["size"] == 0
+
+    infos.update(("demo", None, None, None), {"hosts": hosts[:1]})
+    assert client.instance.host_pool.stats()["removed"] == 1
+
+    client.instance.close()
+    http.close.assert_called_once()
+
+
+def test_endpoint_limits_concurrent_requests_per_host(mocker):
+    """Test that a busy host makes its own callers wait, not everyone."""
+    started = threading.Event()
+    finish = threading.Event()
+
+    def request(method, url, **kwargs):
+        if url.startswith("http://10.0.0.1:80/slow"):
+            started.set()
+            finish.wait(5)
+        return MagicMock(status_code=200)
+
+    http = MagicMock()
+    http.request.side_effect = request
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+    client = NacosClient()
+    client.instance.configure_http(
+        max_connections_per_host=1, timeout=httpx.Timeout(5.0, pool=0.05)
+    )
+    busy = {"ip": "10.0.0.1", "port": 80}
+    worker = threading.Thread(
+        target=client.instance.request, args=("GET", "/slow"), kwargs={"instance": busy}
+    )
+    worker.start()
+    assert started.wait(5)
+
+    with pytest.raises(httpx.PoolTimeout):
+        client.instance.request("GET", "/", instance=busy)
+    client.instance.request("GET", "/", instance={"ip": "10.0.0.2", "port": 80})
+
+    finish.set()
+    worker.join()
+    client.instance.request("GET", "/", instance=busy)
+    client.instance.close()
+
+
+def test_endpoint_keeps_limiting_discarded_hosts(mocker):
+    """Test that a host leaving the cache mid-request keeps its limit."""
+    http = MagicMock()
+    http.request.return_value = MagicMock(status_code=200)
+    mocker.patch("use_nacos.endpoints.instance.httpx.Client", return_value=http)
+    client = NacosClient()
+    client.instance.configure_http(
+        max_connections_per_host=1, timeout=httpx.Timeout(5.0, pool=0.05)
+    )
+    busy = {"ip": "10.0.0.1", "port": 80}
+    with client.instance._host_slot(busy):
+        client.instance.host_pool.discard([("10.0.0.1", 80)])
+        with pytest.raises(httpx.PoolTimeout):
+            client.instance.request("GET", "/", instance=busy)
+    client.instance.request("GET", "/", instance=busy)
+    client.instance.close()
+
+
+@pytest.mark.asyncio
+async def test_async_endpoint_limits_and_closes(mocker):
+    gate = asyncio.Event()
+
+    async def request(method, url, **kwargs):
+        await gate.wait()
+        return MagicMock(status_code=200)
+
+    http = MagicMock()
+    http.request = request
+    http.aclose = mocker.AsyncMock()
+    mocker.patch("use_nacos.endpoints.instance.httpx.AsyncClient", return_value=http)
+    client = NacosAsyncClient()
+    client.instance.configure_http(
+        max_connections_per_host=1, timeout=httpx.Timeout(5.0, pool=0.05)
+    )
+    instance = {"ip": "10.0.0.1", "port": 80}
+
+    first = asyncio.ensure_future(
+        client.instance.request("GET", "/", instance=instance)
+    )
+    await asyncio.sleep(0.01)
+    with pytest.raises(httpx.PoolTimeout):
+        await client.instance.request("GET", "/", instance=instance)
+    gate.set()
+    await first
+    assert client.instance.host_pool.stats()["size"] == 1
+
+    await client.instance.aclose()
+    http.aclose.assert_awaited_once()
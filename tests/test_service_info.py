@@ -0,0 +1,157 @@
+"""Test the local service instance cache."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from use_nacos._service_info import AsyncServiceInfoCache, ServiceInfoCache
+from use_nacos.client import NacosAsyncClient, NacosClient
+from use_nacos.exception import EmptyHealthyInstanceError
+
+
+def test_get_one_healthy_serves_from_memory(mocker, nacos_reply):
+    """Test that repeated picks cost a single list request."""
+    client = NacosClient()
+    fetch = mocker.Mock(return_value=nacos_reply(1, 2))
+    client.instance._service_infos.fetch = fetch
+
+    picks = {client.instance.get_one_healthy("demo")["port"] for _ in range(100)}
+
+    assert picks == {1, 2}
+    fetch.assert_called_once_with("demo", None, None, None)
+    client.instance._service_infos.close()
+
+
+def test_get_one_healthy_filters_unhealthy_hosts(mocker, nacos_reply):
+    """Test that the full list is fetched and filtered locally."""
+    client = NacosClient()
+    reply = nacos_reply(1)
+    reply["hosts"] += nacos_reply(2, healthy=False)["hosts"]
+    client.instance._service_infos.fetch = mocker.Mock(return_value=reply)
+
+    assert client.instance.get_one_healthy("demo")["port"] == 1
+
+    client.instance._service_infos.fetch.return_value = nacos_reply(2, healthy=False)
+    client.instance._service_infos.invalidate(("demo", None, None, None))
+    with pytest.raises(EmptyHealthyInstanceError):
+        client.instance.get_one_healthy("demo")
+    client.instance._service_infos.close()
+
+
+def test_service_info_refreshes_before_expiry(mocker, nacos_reply):
+    """Test that lists are refreshed in the background and versioned."""
+    fetch = mocker.Mock(return_value=nacos_reply(1, cache_millis=1_000))
+    cache = ServiceInfoCache(fetch, refresh_ratio=0.1)
+    first = cache.get("demo")
+    assert first.version == 1
+
+    fetch.return_value = nacos_reply(1, 2, cache_millis=1_000)
+    deadline = time.monotonic() + 5
+    while cache.peek(first.key) is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    second = cache.get("demo")
+    assert second.version == 2
+    assert [host["port"] for host in second.healthy_hosts] == [1, 2]
+    assert fetch.call_count >= 2
+    cache.close()
+
+
+def test_service_info_serves_stale_list_on_failure(mocker, nacos_reply):
+    """Test that a failed refresh keeps the last known list."""
+    fetch = mocker.Mock(return_value=nacos_reply(1))
+    cache = ServiceInfoCache(fetch)
+    info = cache.get("demo")
+    info.expires = 0
+
+    fetch.side_effect = ConnectionError("nacos down")
+    assert cache.get("demo") is info
+
+    cache.invalidate(info.key)
+    with pytest.raises(ConnectionError):
+        cache.get("demo")
+    cache.close()
+
+
+def test_service_info_backs_off_failed_refreshes(mocker, caplog, nacos_reply):
+    """Test that retries back off up to cacheMillis and warn only once."""
+    fetch = mocker.Mock(return_value=nacos_reply(1, cache_millis=5_000))
+    cache = ServiceInfoCache(fetch)
+    info = cache.get("demo")
+    cache.close()
+
+    delays = []
+    with caplog.at_level(logging.DEBUG, logger="use_nacos._service_info"):
+        for _ in range(5):
+            cache._retry_later(info.key, ConnectionError("nacos down"))
+            delays.append(round(info.refresh_at - time.monotonic()))
+    assert delays == [1, 2, 4, 5, 5]
+    levels = [record.levelno for record in caplog.records]
+    assert levels == [logging.WARNING] + [logging.DEBUG] * 4
+
+    cache.update(info.key, nacos_reply(1, cache_millis=5_000))
+    assert info.failures == 0
+    cache.close()
+
+
+def test_service_info_keeps_version_when_hosts_unchanged(mocker, nacos_reply):
+    """Test that an identical reply does not create a new version."""
+    cache = ServiceInfoCache(mocker.Mock(return_value=nacos_reply(1)))
+    info = cache.get("demo", group_name="g")
+    assert cache.update(info.key, nacos_reply(1)) is info
+    assert cache.update(info.key, nacos_reply(2)).version == 2
+    cache.close()
+
+
+def test_service_info_restarts_refresher_after_close(mocker, nacos_reply):
+    """Test that one refresher runs at a time, also after a close."""
+    fetch = mocker.Mock(return_value=nacos_reply(1, cache_millis=1_000))
+    cache = ServiceInfoCache(fetch, refresh_ratio=0.1)
+    threads = threading.active_count()
+    workers = [threading.Thread(target=cache.get, args=(f"demo{i}",)) for i in range(8)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert threading.active_count() == threads + 1
+
+    cache.close()
+    first = cache.get("demo0")
+    fetch.return_value = nacos_reply(1, 2, cache_millis=1_000)
+    deadline = time.monotonic() + 5
+    while cache.peek(first.key) is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.peek(first.key).version == 2
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_async_get_one_healthy_serves_from_memory(mocker, nacos_reply):
+    """Test the async endpoint with its background refresh task."""
+    client = NacosAsyncClient()
+    fetch = mocker.AsyncMock(return_value=nacos_reply(1, 2))
+    client.instance._service_infos.fetch = fetch
+
+    for _ in range(10):
+        assert (await client.instance.get_one_healthy("demo"))["port"] in (1, 2)
+    fetch.assert_awaited_once_with("demo", None, None, None)
+    client.instance._service_infos.close()
+
+
+@pytest.mark.asyncio
+async def test_async_service_info_refreshes_before_expiry(mocker, nacos_reply):
+    """Test that the asyncio refresher replaces lists shortly before expiry."""
+    fetch = mocker.AsyncMock(return_value=nacos_reply(1, cache_millis=1_000))
+    cache = AsyncServiceInfoCache(fetch, refresh_ratio=0.1)
+    first = await cache.get("demo")
+
+    fetch.return_value = nacos_reply(2, cache_millis=1_000)
+    deadline = time.monotonic() + 5
+    while cache.peek(first.key) is first and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+    assert (await cache.get("demo")).healthy_hosts[0]["port"] == 2
+    cache.close()
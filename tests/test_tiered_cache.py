@@ -0,0 +1,150 @@
+"""Test the two-tier cache."""
+
+import gc
+import time
+import weakref
+
+import pytest
+
+from use_nacos.cache import FileCache, MemoryCache, TieredCache
+
+
+@pytest.fixture
+def tiers(tmp_path):
+    l1 = MemoryCache()
+    l2 = FileCache(file_path=str(tmp_path / "cache.json"))
+    cache = TieredCache(l1, l2, flush_interval=60)
+    yield cache, l1, l2
+    cache.close()
+
+
+def test_tiered_cache_writes_behind(tiers):
+    """Test that writes reach L1 at once and L2 on flush."""
+    cache, l1, l2 = tiers
+    cache.set("key1", "value1")
+    cache.set("key2", "value2", ttl=60)
+
+    assert l1.get("key1") == "value1"
+    assert l2.get("key1") is None
+
+    cache.flush()
+    assert l2.get_many(["key1", "key2"]) == {"key1": "value1", "key2": "value2"}
+
+
+def test_tiered_cache_reads_fall_back_to_l2(tiers):
+    """Test that L2 hits are promoted into L1."""
+    cache, l1, l2 = tiers
+    l2.set("key1", "value1")
+
+    assert cache.get("key1") == "value1"
+    assert l1.get("key1") == "value1"
+    assert cache.get_many(["key1", "missing"]) == {"key1": "value1"}
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_tiered_cache_promotes_with_remaining_ttl(tmp_path):
+    """Test that a promoted value expires with its L2 record."""
+    path = str(tmp_path / "cache.json")
+    FileCache(file_path=path).set_many({"key1": "value1", "key2": "value2"}, ttl=0.5)
+    FileCache(file_path=path).set("key3", "value3")
+    cache = TieredCache(MemoryCache(), FileCache(file_path=path), promote_ttl=60)
+
+    assert cache.get("key1") == "value1"
+    assert cache.get_many(["key2", "key3"]) == {"key2": "value2", "key3": "value3"}
+    l1 = cache.l1.get_many_with_ttl(["key1", "key2", "key3"])
+    assert l1["key1"][1] <= 0.5 and l1["key2"][1] <= 0.5
+    assert 59 < l1["key3"][1] <= 60
+
+    time.sleep(0.6)
+    assert cache.get("key1") is None
+    assert cache.get_many(["key2", "key3"]) == {"key3": "value3"}
+    cache.close()
+
+
+def test_tiered_cache_does_not_promote_without_l2_ttl(tmp_path, mocker):
+    """Test that values are not promoted when L2 cannot tell their TTL."""
+    l2 = FileCache(file_path=str(tmp_path / "cache.json"))
+    l2.set("key1", "value1", ttl=60)
+    mocker.patch.object(l2, "get_many_with_ttl", None)
+    cache = TieredCache(MemoryCache(), l2)
+
+    assert cache.get("key1") == "value1"
+    assert cache.get_many(["key1"]) == {"key1": "value1"}
+    assert cache.l1.get("key1") is None
+    cache.close()
+
+
+def test_tiered_cache_pending_delete_hides_l2(tiers):
+    """Test that a delete not yet flushed is not undone by an L2 read."""
+    cache, l1, l2 = tiers
+    l2.set("key1", "value1")
+    assert cache.delete("key1") is True
+
+    assert cache.get("key1") is None
+    assert cache.exists("key1") is False
+    assert l2.get("key1") == "value1"
+
+    cache.flush()
+    assert l2.get("key1") is None
+    assert cache.delete("key1") is False
+
+
+def test_tiered_cache_delete_many_checks_l2_once(tiers, mocker):
+    """Test that a batch delete syncs L2 once, not once per key."""
+    cache, l1, l2 = tiers
+    l2.set_many({"key1": 1, "key2": 2})
+    cache.set("key3", 3)
+    cache.delete("key4")
+    sync = mocker.spy(l2, "_sync")
+
+    assert cache.delete_many(["key1", "key2", "key3", "key4", "key5", "key1"]) == 3
+    assert sync.call_count == 1
+    assert cache.get_many(["key1", "key2", "key3"]) == {}
+
+    cache.flush()
+    assert l2.get_many(["key1", "key2"]) == {}
+
+
+def test_tiered_cache_flushes_full_batches(tmp_path):
+    """Test that the worker flushes once ``batch_size`` writes are pending."""
+    l2 = FileCache(file_path=str(tmp_path / "cache.json"))
+    cache = TieredCache(MemoryCache(), l2, flush_interval=60, batch_size=10)
+    cache.set_many({f"key{i}": i for i in range(10)}, ttl=60)
+
+    deadline = time.monotonic() + 5
+    while l2.get("key9") is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert l2.get("key9") == 9
+    cache.close()
+
+
+def test_tiered_cache_close_flushes_for_restart(tmp_path):
+    """Test that pending writes survive a restart."""
+    path = str(tmp_path / "cache.json")
+    cache = TieredCache(MemoryCache(), FileCache(file_path=path), flush_interval=60)
+    cache.set("key1", "value1", ttl=60)
+    cache.close()
+
+    restarted = TieredCache(MemoryCache(), FileCache(file_path=path))
+    assert restarted.get("key1") == "value1"
+    restarted.close()
+
+
+def test_tiered_cache_holds_no_thread_while_idle(tmp_path):
+    """Test that the worker only runs while writes are pending."""
+    l2 = FileCache(file_path=str(tmp_path / "cache.json"))
+    cache = TieredCache(MemoryCache(), l2, flush_interval=0.01)
+    assert cache._worker is None
+
+    cache.set("key1", "value1")
+    worker = cache._worker
+    worker.join(5)
+    assert not worker.is_alive() and cache._worker is None
+    assert l2.get("key1") == "value1"
+
+    # Nothing but the caller keeps an idle cache alive
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None